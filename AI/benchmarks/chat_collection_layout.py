@@ -0,0 +1,156 @@
+'''
+Compares the two chat attachment layouts of the vector DB:
+
+- per_chat: one collection per chat, searched without a filter
+- shared: a single collection with an indexed chat_id payload field, searched with a chat_id filter
+
+Both are filled with the same random chunks and report the indexing time, the search latency
+and the number of collections. The embedded Qdrant is used by default. Pass --url to run against
+a Qdrant server, which is where the payload index of the shared layout is used.
+
+Run it from the AI directory:
+
+    python -m benchmarks.chat_collection_layout --chats 200 --chunks 20 --queries 500
+    python -m benchmarks.chat_collection_layout --url http://localhost:6333
+'''
+import argparse
+import random
+import statistics
+import tempfile
+import time
+
+import numpy as np
+
+from stores.vectordb.providers import QdrantProvider
+
+
+COLLECTION_PREFIX = 'bench_layout_'
+
+
+def create_provider(args, db_path: str):
+    provider = QdrantProvider(
+        db_path=db_path,
+        distance_method='cosine',
+        url=args.url,
+        api_key=args.api_key,
+        prefer_grpc=bool(args.url),
+    )
+    provider.connect()
+    return provider
+
+
+def index_per_chat(provider, chats: dict, dim: int):
+    for chat_id, vectors in chats.items():
+        collection_name = f'{COLLECTION_PREFIX}{chat_id}'
+        provider.create_collection(collection_name=collection_name, embedding_dim=dim, do_reset=True)
+        provider.insert_batch(
+            collection_name=collection_name,
+            vectors=vectors,
+            texts=[f'chunk {idx}' for idx in range(len(vectors))],
+            metadata=['benchmark'] * len(vectors),
+        )
+
+
+def index_shared(provider, chats: dict, dim: int):
+    collection_name = f'{COLLECTION_PREFIX}shared'
+    provider.create_collection(collection_name=collection_name, embedding_dim=dim, do_reset=True)
+    provider.create_payload_index(collection_name=collection_name, field_name='chat_id')
+
+    for chat_id, vectors in chats.items():
+        provider.insert_batch(
+            collection_name=collection_name,
+            vectors=vectors,
+            texts=[f'chunk {idx}' for idx in range(len(vectors))],
+            metadata=['benchmark'] * len(vectors),
+            vector_ids=[f'{chat_id:08d}-0000-0000-0000-{idx:012d}' for idx in range(len(vectors))],
+            payloads=[{'chat_id': str(chat_id)}] * len(vectors),
+        )
+
+
+def search(provider, layout: str, chat_id: int, vector: list, top_k: int):
+    if layout == 'per_chat':
+        return provider.search_by_vector(
+            vector=vector, collection_name=f'{COLLECTION_PREFIX}{chat_id}', top_k=top_k)
+
+    return provider.search_by_vector(
+        vector=vector, collection_name=f'{COLLECTION_PREFIX}shared', top_k=top_k,
+        filters={'chat_id': str(chat_id)})
+
+
+def run_layout(args, layout: str, chats: dict, queries: list):
+    with tempfile.TemporaryDirectory() as db_path:
+        provider = create_provider(args, db_path=db_path)
+
+        started_at = time.perf_counter()
+        if layout == 'per_chat':
+            index_per_chat(provider, chats=chats, dim=args.dim)
+        else:
+            index_shared(provider, chats=chats, dim=args.dim)
+        index_time = time.perf_counter() - started_at
+
+        latencies = []
+        for chat_id, vector in queries:
+            started_at = time.perf_counter()
+            results = search(provider, layout=layout, chat_id=chat_id, vector=vector, top_k=args.top_k)
+            latencies.append(time.perf_counter() - started_at)
+
+            # Every result has to come from the chat that was searched
+            assert results and all(
+                (result.payload or {}).get('chat_id', str(chat_id)) == str(chat_id) for result in results)
+
+        collections = [collection.name for collection in provider.list_collections().collections
+                       if collection.name.startswith(COLLECTION_PREFIX)]
+
+        for collection_name in collections:
+            provider.delete_collection(collection_name=collection_name)
+        provider.disconnect()
+
+    latencies_ms = sorted(1000 * latency for latency in latencies)
+
+    return {
+        'collections': len(collections),
+        'index_s': index_time,
+        'mean_ms': statistics.fmean(latencies_ms),
+        'p50_ms': latencies_ms[len(latencies_ms) // 2],
+        'p95_ms': latencies_ms[int(len(latencies_ms) * 0.95) - 1],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--chats', type=int, default=200)
+    parser.add_argument('--chunks', type=int, default=20)
+    parser.add_argument('--dim', type=int, default=384)
+    parser.add_argument('--queries', type=int, default=500)
+    parser.add_argument('--top-k', type=int, default=5)
+    parser.add_argument('--url', type=str, default=None)
+    parser.add_argument('--api-key', type=str, default=None)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    chats = {
+        chat_id: rng.standard_normal((args.chunks, args.dim), dtype=np.float32).tolist()
+        for chat_id in range(1, args.chats + 1)
+    }
+
+    random.seed(args.seed)
+    queries = [
+        (random.choice(list(chats)), rng.standard_normal(args.dim, dtype=np.float32).tolist())
+        for _ in range(args.queries)
+    ]
+
+    print(f"{args.chats} chats x {args.chunks} chunks, dim {args.dim}, {args.queries} queries, "
+          f"{'server ' + args.url if args.url else 'embedded Qdrant'}")
+    print(f"{'layout':<10} {'collections':>11} {'index s':>9} {'mean ms':>9} {'p50 ms':>9} {'p95 ms':>9}")
+
+    for layout in ('per_chat', 'shared'):
+        result = run_layout(args, layout=layout, chats=chats, queries=queries)
+        print(
+            f"{layout:<10} {result['collections']:>11} {result['index_s']:>9.2f} "
+            f"{result['mean_ms']:>9.3f} {result['p50_ms']:>9.3f} {result['p95_ms']:>9.3f}"
+        )
+
+
+if __name__ == '__main__':
+    main()
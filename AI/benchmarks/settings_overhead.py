@@ -0,0 +1,45 @@
+'''
+Measures the per-request cost of loading the application Settings.
+
+Before the Settings were cached, every BaseController, DBController and ProcessController
+instantiation re-read and validated the .env file and re-exported the API keys.
+A /process request with an attachment built four of them.
+
+Run it from the AI directory so the .env file is found:
+
+    python -m benchmarks.settings_overhead --iterations 2000 --instances-per-request 4
+'''
+import argparse
+import timeit
+
+from helpers.config import Settings, get_settings, export_api_keys, reload_settings
+
+
+def load_uncached():
+    settings = Settings()
+    export_api_keys(settings)
+    return settings
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--iterations', type=int, default=2000)
+    parser.add_argument('--instances-per-request', type=int, default=4)
+    args = parser.parse_args()
+
+    reload_settings()
+
+    uncached = timeit.timeit(load_uncached, number=args.iterations) / args.iterations
+    cached = timeit.timeit(get_settings, number=args.iterations) / args.iterations
+
+    print(f"Settings() + env export : {uncached * 1e6:10.2f} us per call")
+    print(f"get_settings() (cached) : {cached * 1e6:10.2f} us per call")
+    print(
+        f"Per request ({args.instances_per_request} controllers): "
+        f"{uncached * args.instances_per_request * 1e3:.3f} ms -> "
+        f"{cached * args.instances_per_request * 1e3:.3f} ms"
+    )
+
+
+if __name__ == '__main__':
+    main()
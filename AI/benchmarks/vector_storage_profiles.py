@@ -0,0 +1,220 @@
+'''
+Recall and latency of the vector storage profiles, to pick the VECTOR_DB_STORAGE_PROFILES defaults.
+
+Every profile is compared with an exact float32 search (recall@k) and reports its vector memory per point.
+Without --url the quantization is emulated with NumPy the way Qdrant does it (int8 scalar quantization
+clipped at the quantile, or one bit per dimension, then `oversampling * top_k` candidates rescored with the
+original vectors), so only the recall is meaningful, the search stays exact and HNSW is not involved.
+With --url every profile is created on a Qdrant server, where the latency and the HNSW settings count too.
+
+Real embeddings give far more realistic numbers than the random clustered vectors used by default,
+export some with numpy.save and pass them with --vectors-file.
+
+Run it from the AI directory:
+
+    python -m benchmarks.vector_storage_profiles --points 20000 --dim 768
+    python -m benchmarks.vector_storage_profiles --url http://localhost:6333 --vectors-file embeddings.npy
+'''
+import argparse
+import statistics
+import time
+
+import numpy as np
+
+from helpers.config import get_settings
+from stores.vectordb.VectorDBEnums import QuantizationTypeEnum
+from stores.vectordb.providers import QdrantProvider
+
+
+COLLECTION_NAME = 'bench_storage_profile'
+
+# Variations around the configured profiles
+CANDIDATE_PROFILES = {
+    'float32': {'quantization': 'none'},
+    'scalar-os1': {'quantization': 'scalar', 'quantile': 0.99, 'oversampling': 1.0},
+    'scalar-os2': {'quantization': 'scalar', 'quantile': 0.99, 'oversampling': 2.0},
+    'binary-os2': {'quantization': 'binary', 'oversampling': 2.0},
+    'binary-os4': {'quantization': 'binary', 'oversampling': 4.0},
+    'binary-os8': {'quantization': 'binary', 'oversampling': 8.0},
+}
+
+
+def normalize(matrix: np.ndarray):
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return (matrix / np.where(norms == 0, 1, norms)).astype(np.float32)
+
+
+def load_vectors(args, rng):
+    if args.vectors_file:
+        vectors = np.load(args.vectors_file).astype(np.float32)
+    else:
+        # Points around a few hundred centers, closer to real embeddings than plain noise
+        centers = rng.standard_normal((max(1, args.points // 50), args.dim), dtype=np.float32)
+        vectors = centers[rng.integers(0, len(centers), args.points)] + \
+            0.5 * rng.standard_normal((args.points, args.dim), dtype=np.float32)
+
+    vectors = normalize(vectors)
+
+    picked = rng.choice(len(vectors), size=min(args.queries, len(vectors)), replace=False)
+    queries = normalize(
+        vectors[picked] + 0.1 * rng.standard_normal(vectors[picked].shape, dtype=np.float32))
+
+    return vectors, queries
+
+
+def get_exact_top_k(vectors: np.ndarray, queries: np.ndarray, top_k: int):
+    scores = queries @ vectors.T
+    top = np.argpartition(-scores, top_k - 1, axis=1)[:, :top_k]
+    return [set(row) for row in top]
+
+
+def get_vector_bytes(profile: dict, dim: int):
+    quantization = profile.get('quantization') or QuantizationTypeEnum.NONE.value
+
+    if quantization == QuantizationTypeEnum.SCALAR.value:
+        return dim
+    if quantization == QuantizationTypeEnum.BINARY.value:
+        return dim / 8
+    return 4 * dim
+
+
+def quantize(vectors: np.ndarray, profile: dict):
+    '''
+    Returns a function mapping vectors to what the quantized index compares them with
+    '''
+    quantization = profile.get('quantization') or QuantizationTypeEnum.NONE.value
+
+    if quantization == QuantizationTypeEnum.SCALAR.value:
+        quantile = profile.get('quantile') or 1.0
+        low, high = np.quantile(vectors, [1 - quantile, quantile])
+        step = (high - low) / 255
+
+        return lambda matrix: np.round((np.clip(matrix, low, high) - low) / step).astype(np.float32) * step + low
+
+    if quantization == QuantizationTypeEnum.BINARY.value:
+        return lambda matrix: np.where(matrix > 0, 1.0, -1.0).astype(np.float32)
+
+    return lambda matrix: matrix
+
+
+def emulate_profile(profile: dict, vectors: np.ndarray, queries: np.ndarray, top_k: int):
+    encode = quantize(vectors, profile)
+    is_quantized = (profile.get('quantization') or QuantizationTypeEnum.NONE.value) != QuantizationTypeEnum.NONE.value
+
+    encoded = encode(vectors)
+    encoded_queries = encode(queries)
+
+    candidates = int(top_k * (profile.get('oversampling') or 1.0)) if is_quantized else top_k
+
+    results, latencies = [], []
+    for query, encoded_query in zip(queries, encoded_queries):
+        started_at = time.perf_counter()
+
+        scores = encoded @ encoded_query
+        top = np.argpartition(-scores, candidates - 1)[:candidates]
+
+        if is_quantized and profile.get('rescore', True):
+            top = top[np.argsort(-(vectors[top] @ query))]
+        else:
+            top = top[np.argsort(-scores[top])]
+
+        results.append(set(top[:top_k]))
+        latencies.append(time.perf_counter() - started_at)
+
+    return results, latencies
+
+
+def wait_for_indexing(provider: QdrantProvider, timeout: float = 600):
+    started_at = time.time()
+
+    while time.time() - started_at < timeout:
+        info = provider.get_collection_info(collection_name=COLLECTION_NAME)
+        if info.status.value == 'green':
+            return
+        time.sleep(1)
+
+
+def run_on_server(args, profile_name: str, profile: dict, vectors: np.ndarray, queries: np.ndarray):
+    provider = QdrantProvider(
+        db_path=None,
+        distance_method='cosine',
+        url=args.url,
+        api_key=args.api_key,
+        prefer_grpc=True,
+        storage_profiles={profile_name: profile},
+        collection_profiles={COLLECTION_NAME: profile_name},
+    )
+    provider.connect()
+
+    try:
+        provider.create_collection(
+            collection_name=COLLECTION_NAME, embedding_dim=vectors.shape[1], do_reset=True)
+        provider.insert_batch(
+            collection_name=COLLECTION_NAME,
+            vectors=vectors.tolist(),
+            texts=[''] * len(vectors),
+            metadata=['benchmark'] * len(vectors),
+            batch_size=512
+        )
+        wait_for_indexing(provider)
+
+        results, latencies = [], []
+        for query in queries:
+            started_at = time.perf_counter()
+            documents = provider.search_by_vector(
+                vector=query.tolist(), collection_name=COLLECTION_NAME, top_k=args.top_k) or []
+            latencies.append(time.perf_counter() - started_at)
+
+            results.append({document.id for document in documents})
+
+        return results, latencies
+
+    finally:
+        provider.delete_collection(collection_name=COLLECTION_NAME)
+        provider.disconnect()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--points', type=int, default=20000)
+    parser.add_argument('--dim', type=int, default=768)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--top-k', type=int, default=10)
+    parser.add_argument('--vectors-file', type=str, default=None)
+    parser.add_argument('--url', type=str, default=None)
+    parser.add_argument('--api-key', type=str, default=None)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    vectors, queries = load_vectors(args, rng)
+    exact = get_exact_top_k(vectors, queries, args.top_k)
+
+    profiles = {
+        **CANDIDATE_PROFILES,
+        **{f'settings:{name}': profile for name, profile in get_settings().VECTOR_DB_STORAGE_PROFILES.items()},
+    }
+
+    print(f"{len(vectors)} vectors x {vectors.shape[1]} dims, {len(queries)} queries, recall@{args.top_k}, "
+          f"{'server ' + args.url if args.url else 'emulated quantization, exact search'}")
+    print(f"{'profile':<20} {'bytes/vector':>12} {'ratio':>6} {'recall':>7} {'mean ms':>8} {'p95 ms':>8}")
+
+    for name, profile in profiles.items():
+        if args.url:
+            results, latencies = run_on_server(args, name.replace(':', '-'), profile, vectors, queries)
+        else:
+            results, latencies = emulate_profile(profile, vectors, queries, args.top_k)
+
+        recall = statistics.fmean(
+            len(found & expected) / args.top_k for found, expected in zip(results, exact))
+        latencies_ms = sorted(1000 * latency for latency in latencies)
+        vector_bytes = get_vector_bytes(profile, vectors.shape[1])
+
+        print(
+            f"{name:<20} {vector_bytes:>12.0f} {4 * vectors.shape[1] / vector_bytes:>5.0f}x {recall:>7.3f} "
+            f"{statistics.fmean(latencies_ms):>8.3f} {latencies_ms[int(len(latencies_ms) * 0.95) - 1]:>8.3f}"
+        )
+
+
+if __name__ == '__main__':
+    main()
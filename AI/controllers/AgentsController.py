@@ -5,7 +5,9 @@ from crewai import Process, LLM
 from .BaseController import BaseController
 
 from stores.llm import LLMFactoryProvider
-from stores.agents import AgentBuilder, CrewAIBuilder, TaskBuilder
+from stores.agents import AgentBuilder, CrewAIBuilder, TaskBuilder, CrewPool
+
+from .Enums import EndpointEnum
 
 from models import *
 
@@ -13,16 +15,19 @@ from prompts import *
 
 from routes.schemas import QuizAgentInput
 
-from typing import List, Optional
+from typing import Callable, List, Optional
 
 from crewai.tools import BaseTool
 
 from logging import getLogger
 
+import json
+import re
+
 
 class AgentsController(BaseController):
 
-    def __init__(self):
+    def __init__(self, quiz_feedback_tools_factory: Optional[Callable[[], List[BaseTool]]] = None):
         super().__init__()
 
         self.llm = LLM(
@@ -30,13 +35,34 @@ class AgentsController(BaseController):
             temperature=self.app_settings.QUIZ_GENERATION_MODEL_TEMPERATURE,
         )
 
-        self.tags_suggestion_crew = self.create_tag_suggestion_crew()
+        # Tools of the feedback crew are built per crew, every pooled crew gets its own
+        self.quiz_feedback_tools_factory = quiz_feedback_tools_factory
 
-        self.quiz_generation_crew = self.create_quiz_generation_crew()
+        # A kicked off crew can't serve another request, so every endpoint gets as many crews as
+        # it may run concurrently. Crews are built on first use so that the application startup doesn't wait for them
+        limits = self.app_settings.ENDPOINT_CONCURRENCY_LIMITS
 
-        self.chat_title_generation_crew = self.create_chat_title_generation_crew()
+        self.tags_suggestion_crews = CrewPool(
+            factory=self.create_tag_suggestion_crew,
+            size=limits.get(EndpointEnum.QUIZ_TAGS.value, 1)
+        )
 
-        self.quiz_feedback_recommendation_crew = None
+        # The quiz pool generates quizzes with the same crew
+        self.quiz_generation_crews = CrewPool(
+            factory=self.create_quiz_generation_crew,
+            size=limits.get(EndpointEnum.QUIZ_GENERATION.value, 1) +
+            limits.get(EndpointEnum.QUIZ_POOL.value, 0)
+        )
+
+        self.chat_title_generation_crews = CrewPool(
+            factory=self.create_chat_title_generation_crew,
+            size=limits.get(EndpointEnum.CHAT_TITLE.value, 1)
+        )
+
+        self.quiz_feedback_recommendation_crews = CrewPool(
+            factory=self.create_quiz_feedback_recommendation_crew,
+            size=limits.get(EndpointEnum.QUIZ_FEEDBACK.value, 1)
+        )
 
         self.logger = getLogger('uvicorn')
 
@@ -56,27 +82,26 @@ class AgentsController(BaseController):
             task_agent=tags_suggestion_agent
         )
 
-        self.tags_suggestion_crew = CrewAIBuilder(
+        tags_suggestion_crew = CrewAIBuilder(
             crew_tasks=[tags_suggestion_task],
             crew_agents=[tags_suggestion_agent]
         ).create_crew()
 
-        return self.tags_suggestion_crew
+        return tags_suggestion_crew
 
     def create_quiz_tags(self, input: TagAgentInput):
 
-        if not hasattr(self, 'tags_suggestion_crew'):
-            self.tags_suggestion_crew = self.create_tag_suggestion_crew()
-
-        crew_output = self.tags_suggestion_crew.kickoff(
-            inputs=input.model_dump()
-        )
+        with self.tags_suggestion_crews.crew() as crew:
+            crew_output = crew.kickoff(
+                inputs=input.model_dump()
+            )
 
         if crew_output is None:
 
             raise ValueError("No output received from the crew.")
 
-        return crew_output
+        # Plain dicts so that the response can be cached
+        return crew_output.to_dict()
 
     def create_quiz_generation_crew(self):
 
@@ -113,7 +138,7 @@ class AgentsController(BaseController):
             context=[tag_filter_task]
         )
 
-        self.quiz_generation_crew = CrewAIBuilder(
+        quiz_generation_crew = CrewAIBuilder(
             crew_tasks=[
                 tag_filter_task,
                 quiz_generation_task
@@ -124,21 +149,19 @@ class AgentsController(BaseController):
             ]
         ).create_crew()
 
-        return self.quiz_generation_crew
+        return quiz_generation_crew
 
     def create_quiz(self, input: QuizAgentInput):
-        if not hasattr(self, 'quiz_generation_crew'):
-            self.quiz_generation_crew = self.create_quiz_generation_crew()
-
-        crew_output = self.quiz_generation_crew.kickoff(
-            inputs=input.model_dump()
-        )
+        with self.quiz_generation_crews.crew() as crew:
+            crew_output = crew.kickoff(
+                inputs=input.model_dump()
+            )
 
         if crew_output is None:
 
             raise ValueError("No output received from the crew.")
 
-        return crew_output
+        return crew_output.to_dict()
 
     def create_chat_title_generation_crew(self):
 
@@ -156,20 +179,18 @@ class AgentsController(BaseController):
             task_agent=chat_title_generation_agent
         )
 
-        self.chat_title_generation_crew = CrewAIBuilder(
+        chat_title_generation_crew = CrewAIBuilder(
             crew_tasks=[chat_title_generation_task],
             crew_agents=[chat_title_generation_agent]
         ).create_crew()
 
-        return self.chat_title_generation_crew
+        return chat_title_generation_crew
 
     def create_chat_title(self, input: ChatTitleGenerationInput):
-        if not hasattr(self, 'chat_title_generation_crew'):
-            self.chat_title_generation_crew = self.create_chat_title_generation_crew()
-
-        crew_output = self.chat_title_generation_crew.kickoff(
-            inputs=input.model_dump()
-        )
+        with self.chat_title_generation_crews.crew() as crew:
+            crew_output = crew.kickoff(
+                inputs=input.model_dump()
+            )
 
         if crew_output is None or crew_output['chat_title'] is None:
 
@@ -179,6 +200,9 @@ class AgentsController(BaseController):
 
     def create_quiz_feedback_recommendation_crew(self, tools: Optional[List[BaseTool]] = None):
 
+        if tools is None and self.quiz_feedback_tools_factory is not None:
+            tools = self.quiz_feedback_tools_factory()
+
         weakness_analyzer_agent = AgentBuilder().create_agent(
             agent_role=weakness_analyzer_agent_role,
             agent_goal=weakness_analyzer_agent_goal,
@@ -209,23 +233,18 @@ class AgentsController(BaseController):
             context=[weakness_analyzer_task]
         )
 
-        self.quiz_feedback_recommendation_crew = CrewAIBuilder(
+        quiz_feedback_recommendation_crew = CrewAIBuilder(
             crew_tasks=[weakness_analyzer_task, feedback_synthesizer_task],
             crew_agents=[weakness_analyzer_agent, feedback_synthesizer_agent],
         ).create_crew()
 
-        return self.quiz_feedback_recommendation_crew
+        return quiz_feedback_recommendation_crew
 
     def create_quiz_feedback_recommendation(self, inputs: FeedbackInput):
-        if not hasattr(self, 'quiz_feedback_recommendation_crew'):
-            self.logger.error(
-                "Quiz feedback crew has not been created yet. Please ensure it is initialized before proceeding."
+        with self.quiz_feedback_recommendation_crews.crew() as crew:
+            crew_output = crew.kickoff(
+                inputs=inputs.model_dump()
             )
-            return None
-
-        crew_output = self.quiz_feedback_recommendation_crew.kickoff(
-            inputs=inputs.model_dump()
-        )
 
         if (
             crew_output is None or
@@ -241,3 +260,55 @@ class AgentsController(BaseController):
             return None
 
         return crew_output
+
+    def create_question_explanation(self, question: QuizModelAnswer):
+        '''
+        Explains a single incorrect answer, used by the parallel quiz feedback
+        '''
+        explanation = self.llm.call(messages=[
+            {'role': 'system', 'content': question_explanation_system_prompt},
+            {'role': 'user', 'content': question_explanation_prompt.format(
+                question=question.question,
+                options=', '.join(question.options),
+                user_answer=question.user_answer,
+                correct_answer_text=question.correct_answer_text,
+            )},
+        ])
+
+        if not explanation or not str(explanation).strip():
+
+            raise ValueError("No explanation received from the LLM.")
+
+        return str(explanation).strip()
+
+    def create_feedback_topics(self, incorrect_questions: List[QuizModelAnswer]):
+        '''
+        Extracts the topics of every incorrect question in a single call, used by the parallel quiz feedback
+        '''
+        questions = json.dumps([
+            {'question': question.question, 'correct_answer_text': question.correct_answer_text}
+            for question in incorrect_questions
+        ], ensure_ascii=False)
+
+        output = self.llm.call(messages=[
+            {'role': 'system', 'content': feedback_topics_system_prompt},
+            {'role': 'user', 'content': feedback_topics_prompt.format(
+                incorrect_questions=questions)},
+        ])
+
+        # The model may wrap the JSON object in a markdown code block
+        json_object = re.search(r'\{.*\}', str(output or ''), re.DOTALL)
+
+        if json_object is None:
+
+            raise ValueError("No topics received from the LLM.")
+
+        return FeedbackTopicsOutput.model_validate_json(json_object.group(0))
+
+    def get_metrics(self):
+        return {
+            EndpointEnum.QUIZ_TAGS.value: self.tags_suggestion_crews.get_metrics(),
+            EndpointEnum.QUIZ_GENERATION.value: self.quiz_generation_crews.get_metrics(),
+            EndpointEnum.CHAT_TITLE.value: self.chat_title_generation_crews.get_metrics(),
+            EndpointEnum.QUIZ_FEEDBACK.value: self.quiz_feedback_recommendation_crews.get_metrics(),
+        }
@@ -1,89 +1,46 @@
-import psycopg2
 from .BaseController import BaseController
-import os
-from .utils import get_template_by_name
+from stores.database import PostgresPool
 
 
 class DBController(BaseController):
 
-    def __init__(self, db_name, db_user, db_password, db_host, db_port):
+    def __init__(self, db_pool: PostgresPool):
         super().__init__()
-        self.db_name = db_name
-        self.db_user = db_user
-        self.db_password = db_password
-        self.db_host = db_host
-        self.db_port = db_port
-        self.db_connection = self.db_connect()
-        self.db_cursor = self.db_connection.cursor()
-        self.queries_dir = os.path.join(
-            self.base_dir,
-            "controllers/utils/queries.json"
-        )
+        self.db_pool = db_pool
 
-
-    def db_connect(self):
-        try:
-            return psycopg2.connect(
-                dbname=self.db_name,
-                user=self.db_user,
-                password=self.db_password,
-                host=self.db_host,
-                port=self.db_port
-            )
-        except Exception as e:
-            print(e)
-            return None
-
-    def execute_query(self, query, params):
+    async def execute_query(self, query_name, params):
         try:
-            self.db_cursor.execute(query, params)
-            return self.db_cursor.fetchall()
+            rows = await self.db_pool.fetch_prepared(query_name, *params)
+            return [tuple(row) for row in rows]
         except Exception as e:
             print(e)
             return None
 
-    def get_last_message_by_chat_id(self, chat_id):
-        query = get_template_by_name(self.queries_dir, "get_last_message_id")
-
-        if query is not None:
-            return self.execute_query(query, (chat_id,))
+    async def get_last_message_by_chat_id(self, chat_id):
+        return await self.execute_query("get_last_message_id", (chat_id,))
 
-    def get_all_messages_by_chat_id(self, chat_id):
-        query = get_template_by_name(
-            self.queries_dir, "get_all_messages")
+    async def get_all_messages_by_chat_id(self, chat_id):
+        return await self.execute_query("get_all_messages", (chat_id,))
 
-        if query is not None:
-            return self.execute_query(query, (chat_id,))
-        else:
-            print("Query is None")
+    async def get_messages_by_chat_id(self, chat_id):
+        return await self.execute_query("get_messages", (chat_id,))
 
-    def get_attached_file_by_message_id(self, message_id):
-        query = get_template_by_name(self.queries_dir, "get_attached_file")
+    async def get_messages_after_message_id(self, chat_id, message_id):
+        return await self.execute_query("get_messages_after", (chat_id, message_id))
 
-        if query is not None:
-            return self.execute_query(query, (message_id,))
+    async def get_attached_file_by_message_id(self, message_id):
+        return await self.execute_query("get_attached_file", (message_id,))
 
-    def get_file_path(self, chat_id):
-        message_id, content = self.get_last_message_by_chat_id(chat_id=chat_id)[
+    async def get_file_path(self, chat_id):
+        message_id, content = (await self.get_last_message_by_chat_id(chat_id=chat_id))[
             0]
 
         if message_id is not None:
 
-            file_path, file_type = self.get_attached_file_by_message_id(
-                message_id=message_id)[0]
+            file_path, file_type = (await self.get_attached_file_by_message_id(
+                message_id=message_id))[0]
 
             return file_path
 
-    def get_all_courses(self):
-
-        get_courses_query = get_template_by_name(
-            self.queries_dir, "get_courses")
-
-        if get_courses_query is not None:
-            return self.execute_query(get_courses_query, ())
-        else:
-            print("get_courses query is None")
-
-    def db_disconnect(self):
-        self.db_cursor.close()
-        self.db_connection.close()
+    async def get_all_courses(self):
+        return await self.execute_query("get_courses", ())
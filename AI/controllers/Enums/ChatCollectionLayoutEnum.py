@@ -0,0 +1,12 @@
+from enum import Enum
+
+
+class ChatCollectionLayoutEnum(Enum):
+    '''
+    This class is an Enum that contains the possible layouts of the chat attachments in the vector DB.
+    Possible values are:
+    - PER_CHAT: one collection per chat, named collection_{chat_id}
+    - SHARED: a single collection for every chat, searched with a filter on the indexed chat_id payload field
+    '''
+    PER_CHAT = 'per_chat'
+    SHARED = 'shared'
@@ -0,0 +1,16 @@
+from enum import Enum
+
+
+class EndpointEnum(Enum):
+    '''
+    This class is an Enum that contains the endpoints whose blocking LLM calls are limited separately.
+    The values are the keys of the ENDPOINT_CONCURRENCY_LIMITS setting.
+    '''
+    PROCESS = 'process'
+    CHAT_TITLE = 'chat-title'
+    QUIZ_TAGS = 'quiz-tags'
+    QUIZ_GENERATION = 'quiz-generation'
+    QUIZ_FEEDBACK = 'quiz-feedback'
+    QUIZ_POOL = 'quiz-pool'
+    QUIZ_EXPLANATION = 'quiz-explanation'
+    STORAGE = 'storage'
@@ -0,0 +1,12 @@
+from enum import Enum
+
+
+class IndexModeEnum(Enum):
+    '''
+    This class is an Enum that contains the possible modes for indexing the courses into the vector DB.
+    Possible values are:
+    - INCREMENTAL: only re-embed the changed courses and delete the removed ones
+    - REBUILD: drop the collection and re-embed every course
+    '''
+    INCREMENTAL = 'incremental'
+    REBUILD = 'rebuild'
@@ -0,0 +1,13 @@
+from enum import Enum
+
+
+class QuizFeedbackModeEnum(Enum):
+    '''
+    This class is an Enum that contains the possible modes for generating the quiz feedback.
+    Possible values are:
+    - CREW: the weakness analyzer and feedback synthesizer crew handles every question in one run
+    - PARALLEL: one explanation call per incorrect question, run concurrently with the topic extraction
+      and course retrieval, then merged without an LLM
+    '''
+    CREW = 'crew'
+    PARALLEL = 'parallel'
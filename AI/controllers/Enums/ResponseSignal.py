@@ -17,3 +17,4 @@ class ResponseSignal(Enum):
     AGENT_RESPONSE_SUCCESS = "Agent response successful"
     AGENT_RESPONSE_FAILED = "Agent response failed"
     AGENT_CREW_CREATION_FAILED = "Agent crew creation failed"
+    SERVICE_NOT_READY = "Service is not ready yet"
@@ -1,2 +1,6 @@
 from .ResponseSignal import ResponseSignal
-from .ProcessEnum import ProcessEnum
\ No newline at end of file
+from .ProcessEnum import ProcessEnum
+from .IndexModeEnum import IndexModeEnum
+from .EndpointEnum import EndpointEnum
+from .QuizFeedbackModeEnum import QuizFeedbackModeEnum
+from .ChatCollectionLayoutEnum import ChatCollectionLayoutEnum
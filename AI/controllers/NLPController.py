@@ -1,19 +1,24 @@
-from typing import List
+from typing import List, Callable
 import json
 from stores.llm.LLMEnums import DocumentTypeEnums
 from .BaseController import BaseController
 from .DBController import DBController
 from .ProcessController import ProcessController
-from stores.llm import LLMFactoryProvider
-from stores.vectordb import VectorDBFactoryProvider
+from .Enums import IndexModeEnum, EndpointEnum, ChatCollectionLayoutEnum
+from stores.llm import LLMFactoryProvider, EmbeddingPipeline
+from stores.vectordb import VectorDBFactoryProvider, SemanticResponseCache
+from stores.memory import ConversationSummaryStore
 
 from models.QuizModels import FeedbackInput
+from helpers import ReadinessState, BlockingCallExecutor, StagePipeline
 import os
+import hashlib
+import uuid
+import numpy as np
+import time
 import prompts
 
-from groq import Groq
-
-from time import sleep
+from groq import AsyncGroq
 
 from logging import getLogger
 
@@ -22,45 +27,116 @@ from types import SimpleNamespace
 
 class NLPController(BaseController):
 
+    # Ids that are not chats keep their own collection in every layout
+    DEDICATED_CHAT_IDS = {'courses'}
+
     def __init__(self, vectordb_client: VectorDBFactoryProvider,
                  generation_model: LLMFactoryProvider,
-                 embedding_model: LLMFactoryProvider):
+                 embedding_model: LLMFactoryProvider,
+                 embedding_pipeline: EmbeddingPipeline,
+                 summary_client: AsyncGroq,
+                 summary_store: ConversationSummaryStore,
+                 semantic_cache: SemanticResponseCache,
+                 chat_db_controller: DBController,
+                 courses_db_controller: DBController,
+                 blocking_executor: BlockingCallExecutor):
         super().__init__()
 
         self.vectordb_client = vectordb_client
         self.generation_model = generation_model
         self.embedding_model = embedding_model
+        self.embedding_pipeline = embedding_pipeline
+        self.summary_client = summary_client
+        self.summary_store = summary_store
+        self.semantic_cache = semantic_cache
+
+        self.rag_pipeline = StagePipeline() \
+            .add_stage('query', self.get_rag_query) \
+            .add_stage('memory_summary', self.get_rag_memory_summary) \
+            .add_stage('query_vector', self.get_rag_query_vector, depends_on=['query']) \
+            .add_stage('retrieved_documents', self.retrieve_rag_documents, depends_on=['query_vector']) \
+            .add_stage('cached_answer', self.get_rag_cached_answer,
+                       depends_on=['query', 'query_vector', 'retrieved_documents'], short_circuit=True)
+        self.chat_db_controller = chat_db_controller
+        self.courses_db_controller = courses_db_controller
+        self.blocking_executor = blocking_executor
 
         self.logger = getLogger('uvicorn')
 
-    def get_file_and_store_into_vectordb(self, chat_id: str):
-        db_controller = DBController(
-            db_name=self.app_settings.DB_NAME,
-            db_user=self.app_settings.DB_USER,
-            db_password=self.app_settings.DB_PASSWORD,
-            db_host=self.app_settings.DB_HOST,
-            db_port=self.app_settings.DB_PORT
-        )
+        # With the shared layout every chat's attachments live in one collection, filtered by chat_id
+        self.shared_chat_collection = None
+        if self.app_settings.CHAT_COLLECTION_LAYOUT == ChatCollectionLayoutEnum.SHARED.value:
+            self.shared_chat_collection = self.app_settings.CHAT_SHARED_COLLECTION
+            self.create_shared_chat_collection()
+
+    async def run_storage_call(self, func, *args, **kwargs):
+        '''
+        Runs a blocking vector db or local store call on the executor, so that a large upload
+        or a slow search doesn't stall the other requests
+        '''
+        return await self.blocking_executor.run(EndpointEnum.STORAGE.value, func, *args, **kwargs)
 
-        file_path = db_controller.get_file_path(chat_id=chat_id)
+    async def get_file_and_store_into_vectordb(self, chat_id: str):
+        file_path = await self.chat_db_controller.get_file_path(chat_id=chat_id)
 
         print(f"File path: {file_path}")
 
         process_controller = ProcessController()
 
-        file_content = process_controller.get_file_content(file_path=file_path)
+        file_content = await self.blocking_executor.run(
+            EndpointEnum.PROCESS.value,
+            process_controller.get_file_content,
+            file_path=file_path
+        )
 
-        chunks = process_controller.get_file_chunks(file_content=file_content)
+        chunks = await self.blocking_executor.run(
+            EndpointEnum.PROCESS.value,
+            process_controller.get_file_chunks,
+            file_content=file_content
+        )
 
-        result = self.index_into_vector_db(chat_id=chat_id, chunks=chunks)
+        result = await self.index_into_vector_db(chat_id=chat_id, chunks=chunks)
 
         return result
 
+    def create_shared_chat_collection(self):
+        _ = self.vectordb_client.create_collection(
+            collection_name=self.shared_chat_collection,
+            embedding_dim=self.embedding_model.embedding_size
+        )
+
+        return self.vectordb_client.create_payload_index(
+            collection_name=self.shared_chat_collection,
+            field_name='chat_id'
+        )
+
+    def is_in_shared_collection(self, chat_id: str):
+        return self.shared_chat_collection is not None and str(chat_id) not in self.DEDICATED_CHAT_IDS
+
     def create_collection_name(self, chat_id: str):
+        if self.is_in_shared_collection(chat_id=chat_id):
+            return self.shared_chat_collection
+
         return f'collection_{chat_id}'.strip()
 
+    def get_chat_filters(self, chat_id: str):
+        if self.is_in_shared_collection(chat_id=chat_id):
+            return {'chat_id': str(chat_id)}
+
+        return None
+
+    @staticmethod
+    def get_shared_point_id(chat_id: str, chunk_id):
+        # Chunk ids restart from 0 for every chat, so they are namespaced by the chat in the shared collection
+        return str(uuid.uuid5(uuid.NAMESPACE_URL, f'chat:{chat_id}:{chunk_id}'))
+
     def reset_vector_db_collection(self, chat_id: str):
         collection_name = self.create_collection_name(chat_id=chat_id)
+
+        if self.is_in_shared_collection(chat_id=chat_id):
+            return self.vectordb_client.delete_by_filter(
+                collection_name=collection_name, filters=self.get_chat_filters(chat_id=chat_id))
+
         return self.vectordb_client.delete_collection(collection_name=collection_name)
 
     def get_vector_db_info(self, chat_id: str):
@@ -72,56 +148,79 @@ class NLPController(BaseController):
             json.dumps(collection_info, default=lambda x: x.__dict__)
         )
 
-    def index_into_vector_db(self, chat_id: str, chunks: List,
-                             chunk_ids: List[int] = None,
-                             do_reset: bool = False):
+    async def index_into_vector_db(self, chat_id: str, chunks: List,
+                                   chunk_ids: List[int] = None,
+                                   payloads: List[dict] = None,
+                                   do_reset: bool = False,
+                                   progress_callback: Callable[[int], None] = None):
 
         collection_name = self.create_collection_name(chat_id=chat_id)
 
         texts = [c.page_content for c in chunks]
         metadata = [c.metadata['source'] for c in chunks]
 
-        vectors = []
-        for cnt, text in enumerate(texts, 1):
-            if cnt % 1500 == 0:
-                sleep(60)
-            vectors.append(
-                self.embedding_model.get_embedding(
-                    text=text, document_type=DocumentTypeEnums.DOCUMENT.value)
-            )
+        vectors = await self.embedding_pipeline.embed(
+            texts=texts, document_type=DocumentTypeEnums.DOCUMENT.value,
+            progress_callback=progress_callback)
+
+        if vectors is None:
+            self.logger.error(
+                f"Error in embedding chunks for collection: {collection_name}")
+            return False
 
         chunk_ids = chunk_ids if chunk_ids else list(range(len(chunks)))
 
-        _ = self.vectordb_client.create_collection(
-            collection_name=collection_name,
-            embedding_dim=self.embedding_model.embedding_size,
-            do_reset=do_reset
-        )
+        if self.is_in_shared_collection(chat_id=chat_id):
+            if do_reset:
+                _ = await self.run_storage_call(self.reset_vector_db_collection, chat_id=chat_id)
+
+            chunk_ids = [self.get_shared_point_id(chat_id=chat_id, chunk_id=chunk_id)
+                         for chunk_id in chunk_ids]
+            payloads = [{**payload, 'chat_id': str(chat_id)}
+                        for payload in (payloads or [{}] * len(chunks))]
+        else:
+            _ = await self.run_storage_call(
+                self.vectordb_client.create_collection,
+                collection_name=collection_name,
+                embedding_dim=self.embedding_model.embedding_size,
+                do_reset=do_reset
+            )
+
+        if not chunks:
+            return True
 
-        _ = self.vectordb_client.insert_batch(
+        return await self.run_storage_call(
+            self.vectordb_client.insert_batch,
             collection_name=collection_name,
             vectors=vectors,
             texts=texts,
             metadata=metadata,
-            vector_ids=chunk_ids
+            vector_ids=chunk_ids,
+            payloads=payloads
         )
 
-        return True
-
-    def search_vector_db_collection(self, chat_id: str, text: str, limit: int = 10):
+    async def get_query_embedding(self, text: str):
+        if not text:
+            return None
 
-        collection_name = self.create_collection_name(chat_id=chat_id)
-
-        vector = self.embedding_model.get_embedding(
+        vector = await self.embedding_model.get_embedding(
             text=text, document_type=DocumentTypeEnums.QUERY.value)
 
         if not vector or len(vector) == 0:
-            return False
+            return None
 
-        results = self.vectordb_client.search_by_vector(
+        return vector
+
+    async def search_vector_db_collection_by_vector(self, chat_id: str, vector: list, limit: int = 10):
+
+        collection_name = self.create_collection_name(chat_id=chat_id)
+
+        results = await self.run_storage_call(
+            self.vectordb_client.search_by_vector,
             vector=vector,
             collection_name=collection_name,
-            top_k=limit
+            top_k=limit,
+            filters=self.get_chat_filters(chat_id=chat_id)
         )
 
         if not results:
@@ -129,71 +228,219 @@ class NLPController(BaseController):
 
         return results
 
-    def get_memory_summary_and_query(self, chat_id: str):
+    async def search_vector_db_collection(self, chat_id: str, text: str, limit: int = 10):
 
-        db_controller = DBController(
-            db_name=self.app_settings.DB_NAME,
-            db_user=self.app_settings.DB_USER,
-            db_password=self.app_settings.DB_PASSWORD,
-            db_host=self.app_settings.DB_HOST,
-            db_port=self.app_settings.DB_PORT
-        )
+        vector = await self.get_query_embedding(text=text)
 
-        all_messages = db_controller.get_all_messages_by_chat_id(
-            chat_id=chat_id)
+        if not vector:
+            return False
 
-        print(f"All messages: {all_messages}")
-
-        combined_messages = [
-            {
-                "role": "system",
-                "content": "You are a helpful assistant tasked with summarizing conversations. Provide a concise summary of the following message history."
-            },
-            {
-                'role': 'user',
-                'content': 'Here is the conversation history I would like to summarize:\n' +
-                '\n'.join([f'{sender}: {content}' for sender,
-                          content in all_messages[:-1]])
-            }
-        ]
+        return await self.search_vector_db_collection_by_vector(
+            chat_id=chat_id, vector=vector, limit=limit)
 
-        last_prompt = all_messages[-1][1]
+    async def search_vector_db_collection_batch(self, chat_id: str, texts: list, limit: int = 10):
+        '''
+        Searches for every text with one embedding call and one vector db request,
+        returns one list of documents per text
+        '''
+        if not texts:
+            return []
 
-        if len(all_messages) == 1:
-            return '', last_prompt
+        vectors = await self.embedding_pipeline.embed(
+            texts=texts, document_type=DocumentTypeEnums.QUERY.value)
 
-        llm_client = Groq(
-            api_key=self.app_settings.GROQ_API_KEY,
-        )
+        if not vectors:
+            return None
 
-        message_summary = llm_client.chat.completions.create(
-            model="gemma2-9b-it",
-            temperature=0,
-            messages=combined_messages
+        return await self.run_storage_call(
+            self.vectordb_client.search_batch_by_vectors,
+            vectors=vectors,
+            collection_name=self.create_collection_name(chat_id=chat_id),
+            top_k=limit,
+            filters=self.get_chat_filters(chat_id=chat_id)
         )
-        if message_summary and len(message_summary.choices) > 0 and message_summary.choices[0].message and message_summary.choices[0].message.content:
-            return message_summary.choices[0].message.content, last_prompt
 
-    def answer_rag_question(self, chat_id: str, limit: int = 10):
+    async def recommend_courses(self, topics: list, limit: int = 3):
+        '''
+        Returns (course_id, relevance_score) pairs of the courses matching any of the topics, best first.
+        Every course keeps its highest score across the topics.
+        '''
+        results = await self.search_vector_db_collection_batch(
+            chat_id='courses', texts=topics, limit=limit)
+
+        course_ids, scores = [], []
+        for document in (document for documents in results or [] for document in documents):
+            try:
+                course_ids.append(int(document.metadata))
+            except (ValueError, TypeError):
+                self.logger.warning(
+                    f"Skipping course document with invalid metadata: {document.metadata}")
+                continue
+            scores.append(document.score)
+
+        if not course_ids:
+            return []
+
+        unique_ids, inverse = np.unique(np.asarray(course_ids), return_inverse=True)
+
+        best_scores = np.full(len(unique_ids), -np.inf)
+        np.maximum.at(best_scores, inverse, np.asarray(scores, dtype=np.float64))
+
+        ranking = np.argsort(-best_scores, kind='stable')
+
+        return [(int(unique_ids[idx]), float(best_scores[idx])) for idx in ranking]
+
+    async def get_memory_summary_and_query(self, chat_id: str):
+        '''
+        Folds the messages that came after the stored summary into it, the latest message is the query
+        '''
+        summary, last_message_id = await self.run_storage_call(
+            self.summary_store.get, chat_id=chat_id) or ('', None)
+
+        messages = None
+        if last_message_id is not None:
+            messages = await self.chat_db_controller.get_messages_after_message_id(
+                chat_id=chat_id, message_id=last_message_id)
+
+        # Nothing after the stored summary means its last message is gone, start over from the full history
+        if not messages:
+            summary = ''
+            messages = await self.chat_db_controller.get_messages_by_chat_id(
+                chat_id=chat_id)
+
+        if not messages:
+            return summary, ''
+
+        *new_messages, (_, _, last_prompt) = messages
+
+        if not new_messages:
+            return summary, last_prompt
+
+        new_messages_text = '\n'.join(
+            [f'{sender}: {content}' for _, sender, content in new_messages])
+
+        if summary:
+            combined_messages = [
+                {"role": "system", "content": prompts.summary_update_system_prompt},
+                {"role": "user", "content": prompts.summary_update_prompt.substitute(
+                    summary=summary, new_messages=new_messages_text)}
+            ]
+        else:
+            combined_messages = [
+                {"role": "system", "content": prompts.summary_system_prompt},
+                {"role": "user", "content": prompts.summary_prompt.substitute(
+                    new_messages=new_messages_text)}
+            ]
+
+        try:
+            message_summary = await self.summary_client.chat.completions.create(
+                model="gemma2-9b-it",
+                temperature=0,
+                messages=combined_messages
+            )
+        except Exception as e:
+            # The stored summary and its watermark are kept, the messages are folded in on the next request
+            self.logger.error(
+                f"Error in updating the conversation summary for chat: {chat_id}: {e}")
+            return summary, last_prompt
+
+        if not message_summary or len(message_summary.choices) == 0 or not message_summary.choices[0].message or not message_summary.choices[0].message.content:
+            self.logger.error(
+                f"Error in updating the conversation summary for chat: {chat_id}")
+            return summary, last_prompt
+
+        summary = message_summary.choices[0].message.content
+
+        _ = await self.run_storage_call(
+            self.summary_store.set,
+            chat_id=chat_id, summary=summary, last_message_id=new_messages[-1][0])
 
-        full_prompt, chat_history, answer, documents_prompt = None, None, None, ''
+        return summary, last_prompt
 
-        memory_summary, query = self.get_memory_summary_and_query(
+    async def get_rag_query(self, chat_id: str, **kwargs):
+        last_message = await self.chat_db_controller.get_last_message_by_chat_id(
             chat_id=chat_id)
 
-        collection_name = self.create_collection_name(chat_id=chat_id)
+        if not last_message:
+            return ''
 
-        _ = self.vectordb_client.create_collection(
-            collection_name=collection_name,
-            embedding_dim=self.embedding_model.embedding_size
-        )
+        _, query = last_message[0]
+        return query
+
+    async def get_rag_memory_summary(self, chat_id: str, **kwargs):
+        memory_summary, _ = await self.get_memory_summary_and_query(
+            chat_id=chat_id)
+        return memory_summary
+
+    async def get_rag_query_vector(self, query: str, **kwargs):
+        return await self.get_query_embedding(text=query)
+
+    async def retrieve_rag_documents(self, chat_id: str, limit: int, query_vector: list, **kwargs):
+        if not query_vector:
+            return False
+
+        # A chat without attachments has nothing to search, its collection isn't created on a question
+        if not await self.run_storage_call(
+                self.vectordb_client.is_collection_exist,
+                collection_name=self.create_collection_name(chat_id=chat_id)):
+            return False
 
-        retrieved_documents = self.search_vector_db_collection(
+        return await self.search_vector_db_collection_by_vector(
             chat_id=chat_id,
-            text=query,
+            vector=query_vector,
             limit=limit
         )
 
+    def get_rag_cache_scope(self, chat_id: str, retrieved_documents):
+        return self.semantic_cache.build_scope(
+            chat_id=chat_id, has_chat_documents=bool(retrieved_documents))
+
+    async def get_rag_cached_answer(self, chat_id: str, query: str, query_vector: list,
+                                    retrieved_documents, **kwargs):
+        # The cache scope doesn't cover the conversation, so a follow-up like "explain that more"
+        # would get another chat's answer
+        if not self.semantic_cache or not query_vector or self.semantic_cache.is_context_dependent(query):
+            return None
+
+        return await self.run_storage_call(
+            self.semantic_cache.lookup,
+            vector=query_vector,
+            scope=self.get_rag_cache_scope(
+                chat_id=chat_id, retrieved_documents=retrieved_documents)
+        )
+
+    async def cache_rag_answer(self, chat_id: str, rag_context: dict, answer: str):
+        if not self.semantic_cache or not answer or \
+                self.semantic_cache.is_context_dependent(rag_context['query']):
+            return
+
+        await self.run_storage_call(
+            self.semantic_cache.store,
+            query=rag_context['query'],
+            vector=rag_context['query_vector'],
+            scope=self.get_rag_cache_scope(
+                chat_id=chat_id, retrieved_documents=rag_context['retrieved_documents']),
+            answer=answer
+        )
+
+    async def construct_rag_prompt(self, chat_id: str, limit: int = 10):
+
+        documents_prompt = ''
+
+        # The summary only needs the chat history, so it runs while the query is embedded, searched
+        # and looked up in the semantic cache
+        rag_context, timings = await self.rag_pipeline.run(chat_id=chat_id, limit=limit)
+
+        self.logger.info(f"RAG stage timings for chat {chat_id}: {timings}")
+
+        # A cache hit cancels the summary, there is no prompt to build
+        if rag_context['cached_answer']:
+            return None, None, rag_context
+
+        query = rag_context['query']
+        memory_summary = rag_context['memory_summary']
+        retrieved_documents = rag_context['retrieved_documents']
+
         # if not retrieved_documents or len(retrieved_documents) == 0:
         #     return full_prompt, chat_history, answer
 
@@ -235,35 +482,99 @@ class NLPController(BaseController):
             ]
         )
 
-        answer = self.generation_model.generate_text(
+        return full_prompt, chat_history, rag_context
+
+    async def answer_rag_question(self, chat_id: str, limit: int = 10):
+
+        full_prompt, chat_history, rag_context = await self.construct_rag_prompt(
+            chat_id=chat_id, limit=limit)
+
+        if rag_context['cached_answer']:
+            return full_prompt, chat_history, rag_context['cached_answer']
+
+        started_at = time.monotonic()
+        answer = await self.generation_model.generate_text(
             prompt=full_prompt,
             chat_history=chat_history,
         )
+        self.rag_pipeline.record('generation', time.monotonic() - started_at)
+
+        await self.cache_rag_answer(
+            chat_id=chat_id, rag_context=rag_context, answer=answer)
 
         return full_prompt, chat_history, answer
 
-    def index_courses_into_vectordb(self, chat_id: str = 'courses'):
+    async def answer_rag_question_stream(self, chat_id: str, limit: int = 10):
+        '''
+        Yields the answer tokens as the model produces them, the assembled answer is logged once the stream ends
+        '''
+        full_prompt, chat_history, rag_context = await self.construct_rag_prompt(
+            chat_id=chat_id, limit=limit)
 
-        db_controller = DBController(
-            db_name=self.app_settings.COURSES_DB_NAME,
-            db_user=self.app_settings.COURSES_DB_USER,
-            db_password=self.app_settings.COURSES_DB_PASSWORD,
-            db_host=self.app_settings.COURSES_DB_HOST,
-            db_port=self.app_settings.COURSES_DB_PORT
-        )
+        if rag_context['cached_answer']:
+            yield rag_context['cached_answer']
+            return
+
+        tokens = []
+        started_at = time.monotonic()
+        async for token in self.generation_model.generate_text_stream(
+            prompt=full_prompt,
+            chat_history=chat_history,
+        ):
+            tokens.append(token)
+            yield token
+        self.rag_pipeline.record('generation', time.monotonic() - started_at)
 
-        all_courses = db_controller.get_all_courses()
+        await self.cache_rag_answer(
+            chat_id=chat_id, rag_context=rag_context, answer=''.join(tokens))
 
-        print(f"All courses: {all_courses}")
+        self.logger.info(
+            f"Streamed answer for chat {chat_id}: {''.join(tokens)}")
+
+    def get_course_hash(self, course_name: str, course_description: str):
+        '''
+        The embedding model id is part of the hash so that switching models re-embeds every course
+        '''
+        content = '\x00'.join([
+            str(self.embedding_model.embedding_model_id),
+            str(course_name),
+            str(course_description)
+        ])
+        return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+    async def index_courses_into_vectordb(self, chat_id: str = 'courses',
+                                          readiness_state: ReadinessState = None):
+
+        all_courses = await self.courses_db_controller.get_all_courses()
 
         if not all_courses or len(all_courses) == 0:
             self.logger.error(
                 "Error in getting all courses from the database.")
+            return False
+
+        do_reset = self.app_settings.COURSES_INDEX_MODE == IndexModeEnum.REBUILD.value
 
-        chunks = []
+        indexed_payloads = {}
+        if not do_reset:
+            indexed_payloads = await self.run_storage_call(
+                self.vectordb_client.get_all_payloads,
+                collection_name=self.create_collection_name(chat_id=chat_id)
+            )
+
+        chunks, chunk_ids, payloads = [], [], []
 
         for course_id, course_name, course_description in all_courses:
 
+            content_hash = self.get_course_hash(
+                course_name=course_name,
+                course_description=course_description
+            )
+
+            indexed_payload = indexed_payloads.get(course_id) or {}
+
+            if indexed_payload.get('content_hash') == content_hash:
+                continue
+
             page_content = f"Course Name: {course_name}. Description: {course_description}"
 
             metadata = {
@@ -277,11 +588,39 @@ class NLPController(BaseController):
             chunks.append(
                 chunk_object
             )
+            chunk_ids.append(course_id)
+            payloads.append({'content_hash': content_hash})
+
+        course_ids = {course_id for course_id, _, _ in all_courses}
+
+        removed_ids = [
+            point_id
+            for point_id in indexed_payloads
+            if point_id not in course_ids
+        ]
+
+        if removed_ids:
+            _ = await self.run_storage_call(
+                self.vectordb_client.delete_by_ids,
+                collection_name=self.create_collection_name(chat_id=chat_id),
+                vector_ids=removed_ids
+            )
+
+        self.logger.info(
+            f"Courses sync: {len(chunks)} to embed, {len(removed_ids)} to delete, "
+            f"{len(all_courses) - len(chunks)} unchanged.")
+
+        if readiness_state:
+            readiness_state.set_total(len(all_courses))
+            readiness_state.advance(len(all_courses) - len(chunks))
 
-        done = self.index_into_vector_db(
+        done = await self.index_into_vector_db(
             chat_id=chat_id,
             chunks=chunks,
-            do_reset=True
+            chunk_ids=chunk_ids,
+            payloads=payloads,
+            do_reset=do_reset,
+            progress_callback=readiness_state.advance if readiness_state else None
         )
 
         if not done:
@@ -0,0 +1,135 @@
+import asyncio
+from logging import getLogger
+
+from .BaseController import BaseController
+from .AgentsController import AgentsController
+from .NLPController import NLPController
+from .Enums import EndpointEnum, QuizFeedbackModeEnum
+
+from helpers import BlockingCallExecutor, StagePipeline
+from models import (
+    FeedbackInput, QuizModelAnswer, FeedbackTopicsOutput, RecommendedCourse,
+    DetailedExplanation, FeedbackSynthesizerOutput
+)
+from prompts import feedback_message_template, feedback_message_without_topics, question_explanation_fallback
+
+
+class QuizFeedbackController(BaseController):
+    '''
+    Builds the quiz feedback without the feedback crew, so that its latency doesn't grow with the number of
+    incorrect questions. One small explanation call per question runs in parallel (at most
+    QUIZ_FEEDBACK_MAX_PARALLEL_EXPLANATIONS at once) alongside the topic extraction and the course retrieval,
+    and the results are merged into a FeedbackSynthesizerOutput without another LLM call.
+    '''
+
+    COURSES_PER_TOPIC = 3
+
+    def __init__(self, agents_controller: AgentsController, nlp_controller: NLPController,
+                 blocking_executor: BlockingCallExecutor):
+        super().__init__()
+
+        self.agents_controller = agents_controller
+        self.nlp_controller = nlp_controller
+        self.blocking_executor = blocking_executor
+
+        self.enabled = self.app_settings.QUIZ_FEEDBACK_MODE == QuizFeedbackModeEnum.PARALLEL.value
+        self.max_parallel_explanations = max(
+            1, self.app_settings.QUIZ_FEEDBACK_MAX_PARALLEL_EXPLANATIONS)
+
+        self.pipeline = StagePipeline() \
+            .add_stage('explanations', self.get_explanations) \
+            .add_stage('topics', self.get_topics) \
+            .add_stage('courses', self.get_recommended_courses, depends_on=['topics']) \
+            .add_stage('feedback', self.merge_feedback,
+                       depends_on=['explanations', 'topics', 'courses'])
+
+        self.failed_explanations = 0
+        self.failed_topics = 0
+
+        self.logger = getLogger('uvicorn')
+
+    async def get_explanation(self, question: QuizModelAnswer, semaphore: asyncio.Semaphore):
+        async with semaphore:
+            try:
+                explanation = await self.blocking_executor.run(
+                    EndpointEnum.QUIZ_EXPLANATION.value,
+                    self.agents_controller.create_question_explanation,
+                    question
+                )
+            except Exception as e:
+                # A single failed question shouldn't fail the whole feedback
+                self.failed_explanations += 1
+                self.logger.error(
+                    f"Error in explaining question {question.question_id}: {e}")
+                explanation = question_explanation_fallback.format(
+                    correct_answer_text=question.correct_answer_text,
+                    user_answer=question.user_answer
+                )
+
+        return DetailedExplanation(question_id=question.question_id, explanation=explanation)
+
+    async def get_explanations(self, feedback_input: FeedbackInput):
+        # Bounded per request so that one long quiz doesn't take every explanation slot
+        semaphore = asyncio.Semaphore(self.max_parallel_explanations)
+
+        return await asyncio.gather(*[
+            self.get_explanation(question=question, semaphore=semaphore)
+            for question in feedback_input.incorrect_questions
+        ])
+
+    async def get_topics(self, feedback_input: FeedbackInput):
+        if not feedback_input.incorrect_questions:
+            return FeedbackTopicsOutput()
+
+        try:
+            return await self.blocking_executor.run(
+                EndpointEnum.QUIZ_EXPLANATION.value,
+                self.agents_controller.create_feedback_topics,
+                feedback_input.incorrect_questions
+            )
+        except Exception as e:
+            self.failed_topics += 1
+            self.logger.error(f"Error in extracting the quiz feedback topics: {e}")
+            return FeedbackTopicsOutput()
+
+    async def get_recommended_courses(self, feedback_input: FeedbackInput, topics: FeedbackTopicsOutput):
+        search_topics = list(dict.fromkeys(
+            topic.strip() for topic in topics.specific_topics + topics.broad_topics if topic.strip()
+        ))
+
+        recommended_courses = await self.nlp_controller.recommend_courses(
+            topics=search_topics, limit=self.COURSES_PER_TOPIC)
+
+        return [
+            RecommendedCourse(course_id=course_id, relevance_score=score)
+            for course_id, score in recommended_courses
+        ]
+
+    async def merge_feedback(self, feedback_input: FeedbackInput, explanations: list,
+                             topics: FeedbackTopicsOutput, courses: list):
+        specific_topics = list(dict.fromkeys(
+            topic.strip() for topic in topics.specific_topics if topic.strip()))
+
+        feedback_message = feedback_message_template.format(
+            topics=', '.join(specific_topics)
+        ) if specific_topics else feedback_message_without_topics
+
+        return FeedbackSynthesizerOutput(
+            feedback_message=feedback_message,
+            detailed_explanations=explanations,
+            recommended_course_ids=[
+                course.course_id for course in courses[:feedback_input.k]]
+        )
+
+    async def create_feedback(self, feedback_input: FeedbackInput):
+        results, _ = await self.pipeline.run(feedback_input=feedback_input)
+
+        return results['feedback'].model_dump()
+
+    def get_metrics(self):
+        return {
+            'enabled': self.enabled,
+            'stages': self.pipeline.get_metrics(),
+            'failed_explanations': self.failed_explanations,
+            'failed_topics': self.failed_topics,
+        }
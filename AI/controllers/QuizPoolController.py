@@ -0,0 +1,191 @@
+import asyncio
+import time
+from collections import deque, defaultdict
+from logging import getLogger
+
+from .BaseController import BaseController
+from .AgentsController import AgentsController
+from .Enums import EndpointEnum
+
+from helpers import BlockingCallExecutor
+from models import QuizAgentResponse
+from routes.schemas import QuizAgentInput
+
+
+class QuizPoolController(BaseController):
+    '''
+    Keeps a pool of pre-generated quizzes for the (tags, difficulty, question_type) combinations listed in
+    QUIZ_POOL_COMBINATIONS. A background worker refills a pool once it drops below the low-water mark,
+    and quizzes older than QUIZ_POOL_MAX_AGE are dropped instead of being served.
+    '''
+
+    def __init__(self, agents_controller: AgentsController,
+                 blocking_executor: BlockingCallExecutor):
+        super().__init__()
+
+        self.agents_controller = agents_controller
+        self.blocking_executor = blocking_executor
+
+        self.pool_size = self.app_settings.QUIZ_POOL_SIZE
+        self.low_water_mark = self.app_settings.QUIZ_POOL_LOW_WATER_MARK
+        self.max_age = self.app_settings.QUIZ_POOL_MAX_AGE
+        self.refill_interval = self.app_settings.QUIZ_POOL_REFILL_INTERVAL
+
+        self.combinations = {}
+        for combination in self.app_settings.QUIZ_POOL_COMBINATIONS:
+            key = self.build_key(
+                tags=combination['tags'],
+                difficulty=combination['difficulty'],
+                question_type=combination['question_type']
+            )
+            self.combinations[key] = combination
+
+        # Every pool holds (generated_at, quiz) pairs, oldest first
+        self.pools = {key: deque() for key in self.combinations}
+        self.refill_needed = asyncio.Event()
+
+        self.served = defaultdict(int)
+        self.generated = defaultdict(int)
+        self.failed = defaultdict(int)
+        self.stale = defaultdict(int)
+        self.misses = 0
+
+        self.logger = getLogger('uvicorn')
+
+    def build_key(self, tags: list, difficulty: str, question_type: str):
+        return (
+            tuple(sorted({tag.strip().lower() for tag in tags if tag.strip()})),
+            difficulty.strip().lower(),
+            question_type.strip().lower(),
+        )
+
+    def get_key_name(self, key: tuple):
+        tags, difficulty, question_type = key
+        return f"{','.join(tags)}|{difficulty}|{question_type}"
+
+    def drop_stale(self, key: tuple):
+        pool = self.pools[key]
+        now = time.time()
+
+        while pool and now - pool[0][0] > self.max_age:
+            pool.popleft()
+            self.stale[key] += 1
+
+    def take(self, quiz_request: QuizAgentInput):
+        '''
+        Returns a pooled quiz for the request, or None if it has to be generated live.
+        Requests with additional preferences are never served from the pool.
+        '''
+        key = self.build_key(
+            tags=quiz_request.tags + quiz_request.additional_tags,
+            difficulty=quiz_request.difficulty,
+            question_type=quiz_request.question_type
+        )
+
+        combination = self.combinations.get(key)
+
+        if (
+            combination is None or
+            quiz_request.additional_preferences.strip() or
+            quiz_request.number_of_questions > combination['number_of_questions']
+        ):
+            self.misses += 1
+            return None
+
+        self.drop_stale(key)
+
+        pool = self.pools[key]
+        quiz = pool.popleft()[1] if pool else None
+
+        if len(pool) < self.low_water_mark:
+            self.refill_needed.set()
+
+        if quiz is None:
+            self.misses += 1
+            return None
+
+        self.served[key] += 1
+
+        return {
+            **quiz,
+            'questions': quiz['questions'][:quiz_request.number_of_questions]
+        }
+
+    async def generate(self, key: tuple):
+        combination = self.combinations[key]
+        tags, difficulty, question_type = combination['tags'], combination['difficulty'], combination['question_type']
+
+        quiz_input = QuizAgentInput(
+            prompt=combination.get('prompt') or
+            f"{difficulty} {question_type} quiz about {', '.join(tags)}",
+            difficulty=difficulty,
+            question_type=question_type,
+            time=combination.get('time', 15),
+            number_of_questions=combination['number_of_questions'],
+            tags=tags,
+        )
+
+        quiz = await self.blocking_executor.run(
+            EndpointEnum.QUIZ_POOL.value,
+            self.agents_controller.create_quiz,
+            quiz_input
+        )
+
+        # Only well-formed quizzes get into the pool
+        return QuizAgentResponse(**quiz).model_dump()
+
+    async def refill(self, key: tuple):
+        pool = self.pools[key]
+
+        while len(pool) < self.pool_size:
+            try:
+                quiz = await self.generate(key)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.failed[key] += 1
+                self.logger.error(
+                    f"Error in pre-generating a quiz for {self.get_key_name(key)}: {e}")
+                return
+
+            pool.append((time.time(), quiz))
+            self.generated[key] += 1
+
+    async def run(self):
+        '''
+        Background worker, refills every pool below the low-water mark whenever a quiz is taken
+        and at least every QUIZ_POOL_REFILL_INTERVAL seconds
+        '''
+        while True:
+            self.refill_needed.clear()
+
+            for key in self.pools:
+                self.drop_stale(key)
+
+                if len(self.pools[key]) < self.low_water_mark:
+                    await self.refill(key)
+
+            try:
+                await asyncio.wait_for(self.refill_needed.wait(), timeout=self.refill_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def get_metrics(self):
+        now = time.time()
+
+        return {
+            'misses': self.misses,
+            'pools': {
+                self.get_key_name(key): {
+                    'size': len(pool),
+                    'target_size': self.pool_size,
+                    'low_water_mark': self.low_water_mark,
+                    'oldest_age_s': round(now - pool[0][0], 1) if pool else None,
+                    'served': self.served[key],
+                    'generated': self.generated[key],
+                    'failed': self.failed[key],
+                    'stale_dropped': self.stale[key],
+                }
+                for key, pool in self.pools.items()
+            }
+        }
@@ -0,0 +1,208 @@
+import re
+import uuid
+from logging import getLogger
+
+from .BaseController import BaseController
+from .NLPController import NLPController
+
+from stores.llm.LLMEnums import DocumentTypeEnums
+from models import TagAgentInput, TagAgentResponse
+
+
+# Words that say nothing about the topic of a prompt or a course
+STOPWORDS = {
+    'a', 'an', 'and', 'the', 'of', 'for', 'to', 'in', 'on', 'with', 'about', 'at', 'by', 'from',
+    'course', 'courses', 'quiz', 'quizzes', 'question', 'questions', 'test', 'me', 'my', 'i',
+    'want', 'give', 'make', 'some', 'is', 'are', 'be', 'it', 'this', 'that',
+}
+
+
+class TagSuggestionController(BaseController):
+    '''
+    Suggests quiz tags without an LLM for prompts on known topics.
+    Candidate tags come from a tag vocabulary collection (nearest neighbours of the prompt embedding)
+    and a keyword index over the same vocabulary. The vocabulary is seeded from the course catalog and
+    grows with every tag list the tag agent returns. The prompt is considered on-topic when it is
+    close to a catalog course or contains every word of a vocabulary tag, and only then is the local
+    answer trusted, anything else goes to the tag agent, which is the one that can reject a prompt.
+    '''
+
+    SOURCE_COURSE = 'course'
+    SOURCE_AGENT = 'agent'
+
+    def __init__(self, nlp_controller: NLPController):
+        super().__init__()
+
+        self.nlp_controller = nlp_controller
+        self.vectordb_client = nlp_controller.vectordb_client
+
+        self.enabled = self.app_settings.TAG_FAST_PATH_ENABLED
+        self.collection_name = self.app_settings.TAG_VOCABULARY_COLLECTION
+        self.course_threshold = self.app_settings.TAG_FAST_PATH_COURSE_THRESHOLD
+        self.tag_threshold = self.app_settings.TAG_FAST_PATH_TAG_THRESHOLD
+        self.keyword_boost = self.app_settings.TAG_FAST_PATH_KEYWORD_BOOST
+
+        _ = self.vectordb_client.create_collection(
+            collection_name=self.collection_name,
+            embedding_dim=nlp_controller.embedding_model.embedding_size
+        )
+
+        # Keyword index: token -> tags containing it
+        self.vocabulary = set()
+        self.keyword_index = {}
+
+        for payload in self.vectordb_client.get_all_payloads(
+                collection_name=self.collection_name).values():
+            self.add_to_keyword_index(payload['text'])
+
+        self.fast_path_hits = 0
+        self.escalations = 0
+
+        self.logger = getLogger('uvicorn')
+
+    def tokenize(self, text: str):
+        tokens = re.findall(r'[a-z0-9][a-z0-9+#.]*', text.lower())
+        return [token.rstrip('.') for token in tokens if token.rstrip('.') not in STOPWORDS]
+
+    def normalize_tag(self, tag: str):
+        return ' '.join(tag.strip().lower().split())
+
+    def get_tag_id(self, tag: str):
+        return str(uuid.uuid5(uuid.NAMESPACE_URL, f'tag:{tag}'))
+
+    def add_to_keyword_index(self, tag: str):
+        self.vocabulary.add(tag)
+        for token in self.tokenize(tag):
+            self.keyword_index.setdefault(token, set()).add(tag)
+
+    async def learn_tags(self, tags: list, source: str = SOURCE_AGENT):
+        '''
+        Adds the tags that are not in the vocabulary yet
+        '''
+        new_tags = sorted({
+            self.normalize_tag(tag) for tag in tags
+            if tag and self.normalize_tag(tag) not in self.vocabulary
+        })
+
+        if not new_tags:
+            return 0
+
+        vectors = await self.nlp_controller.embedding_pipeline.embed(
+            texts=new_tags, document_type=DocumentTypeEnums.DOCUMENT.value)
+
+        if vectors is None:
+            self.logger.error("Error in embedding new tags for the vocabulary")
+            return 0
+
+        inserted = await self.nlp_controller.run_storage_call(
+            self.vectordb_client.insert_batch,
+            collection_name=self.collection_name,
+            vectors=vectors,
+            texts=new_tags,
+            metadata=[source] * len(new_tags),
+            vector_ids=[self.get_tag_id(tag) for tag in new_tags],
+        )
+
+        if not inserted:
+            return 0
+
+        for tag in new_tags:
+            self.add_to_keyword_index(tag)
+
+        return len(new_tags)
+
+    async def sync_catalog(self):
+        '''
+        Seeds the vocabulary with the short course names
+        '''
+        all_courses = await self.nlp_controller.courses_db_controller.get_all_courses()
+
+        if not all_courses:
+            return 0
+
+        course_tags = [
+            course_name for _, course_name, _ in all_courses
+            if course_name and len(course_name.split()) <= 3
+        ]
+
+        return await self.learn_tags(tags=course_tags, source=self.SOURCE_COURSE)
+
+    def get_keyword_matches(self, prompt_tokens: set):
+        candidate_tags = set()
+        for token in prompt_tokens:
+            candidate_tags |= self.keyword_index.get(token, set())
+
+        # Every meaningful token of the tag has to be in the prompt
+        return {
+            tag for tag in candidate_tags
+            if set(self.tokenize(tag)) <= prompt_tokens
+        }
+
+    async def suggest(self, tags_request: TagAgentInput):
+        '''
+        Returns a TagAgentResponse when the local engine is confident, otherwise None
+        so that the request goes to the tag agent
+        '''
+        if not self.enabled or not self.vocabulary:
+            return None
+
+        vector = await self.nlp_controller.get_query_embedding(text=tags_request.prompt)
+
+        if not vector:
+            return None
+
+        prompt_tokens = set(self.tokenize(tags_request.prompt))
+
+        course_score = 0.0
+        if await self.nlp_controller.run_storage_call(
+                self.vectordb_client.is_collection_exist,
+                collection_name=self.nlp_controller.create_collection_name(chat_id='courses')):
+            courses = await self.nlp_controller.search_vector_db_collection_by_vector(
+                chat_id='courses', vector=vector, limit=1)
+            course_score = courses[0].score if courses else 0.0
+
+        # Single course-name words like "advanced" or "data" say nothing about the topic,
+        # only a close course or a whole vocabulary tag does
+        keyword_matches = self.get_keyword_matches(prompt_tokens)
+        is_on_topic = course_score >= self.course_threshold or bool(keyword_matches)
+
+        if not is_on_topic:
+            self.escalations += 1
+            return None
+
+        neighbours = await self.nlp_controller.run_storage_call(
+            self.vectordb_client.search_by_vector,
+            vector=vector,
+            collection_name=self.collection_name,
+            top_k=tags_request.number_of_tags * 3
+        ) or []
+
+        scores = {neighbour.text: neighbour.score for neighbour in neighbours}
+
+        for tag in keyword_matches:
+            scores[tag] = max(scores.get(tag, 0.0),
+                              self.tag_threshold) + self.keyword_boost
+
+        tags = [
+            tag for tag, score in sorted(scores.items(), key=lambda item: item[1], reverse=True)
+            if score >= self.tag_threshold
+        ][:tags_request.number_of_tags]
+
+        if len(tags) < tags_request.number_of_tags:
+            self.escalations += 1
+            return None
+
+        self.fast_path_hits += 1
+
+        return TagAgentResponse(tags=tags, message='', is_relevant=True)
+
+    def get_metrics(self):
+        requests = self.fast_path_hits + self.escalations
+
+        return {
+            'enabled': self.enabled,
+            'vocabulary_size': len(self.vocabulary),
+            'fast_path_hits': self.fast_path_hits,
+            'escalations': self.escalations,
+            'fast_path_rate': round(self.fast_path_hits / requests, 4) if requests else 0.0,
+        }
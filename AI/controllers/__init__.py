@@ -3,6 +3,9 @@ from .DataController import BaseController
 from .NLPController import NLPController
 from .DBController import DBController
 from .AgentsController import AgentsController
+from .QuizPoolController import QuizPoolController
+from .TagSuggestionController import TagSuggestionController
+from .QuizFeedbackController import QuizFeedbackController
 
 from .utils import *
 from .Enums import ResponseSignal
@@ -1,6 +1,10 @@
 
 import json
 import os
+import re
+
+
+QUERIES_FILE_PATH = os.path.join(os.path.dirname(__file__), 'queries.json')
 
 
 def load_json_file(filepath):
@@ -12,11 +16,49 @@ def load_json_file(filepath):
         return None
 
 
-def get_template_by_name(file_path, template_name):
-    data = load_json_file(file_path)
+class QueryRegistry:
+    '''
+    Loads and validates the SQL templates of queries.json once.
+    The templates are grouped by database ("chat", "courses") so that each connection pool only
+    prepares the statements that can run against its own database.
+    '''
+
+    def __init__(self, file_path: str = QUERIES_FILE_PATH):
+        self.file_path = file_path
+        self.groups = self.validate(load_json_file(file_path))
+
+    def validate(self, data):
+
+        if not isinstance(data, dict) or not data:
+            raise ValueError(f"No query templates found in {self.file_path}")
+
+        for group, templates in data.items():
+            if not isinstance(templates, dict) or not templates:
+                raise ValueError(f"Query group '{group}' has no templates")
+
+            for name, query in templates.items():
+                if not isinstance(query, str) or not query.strip():
+                    raise ValueError(f"Query template '{name}' is empty")
+
+                if '%s' in query:
+                    raise ValueError(
+                        f"Query template '{name}' must use $n placeholders, not %s")
+
+                placeholders = sorted({int(n) for n in re.findall(r'\$(\d+)', query)})
+                if placeholders != list(range(1, len(placeholders) + 1)):
+                    raise ValueError(
+                        f"Query template '{name}' has non-contiguous placeholders: {placeholders}")
+
+        return data
+
+    def get_group(self, group: str):
+        return self.groups.get(group, {})
 
-    if template_name in data:
-        return data[template_name]
-    return None  # Return None if template is not found
+    def get_template_by_name(self, template_name: str):
+        for templates in self.groups.values():
+            if template_name in templates:
+                return templates[template_name]
+        return None  # Return None if template is not found
 
 
+query_registry = QueryRegistry()
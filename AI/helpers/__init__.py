@@ -1 +1,5 @@
-from .config import get_settings, Settings
+from .config import get_settings, reload_settings, Settings
+from .readiness import ReadinessState, ReadinessStatusEnum
+from .executor import BlockingCallExecutor
+from .pipeline import StagePipeline
+from .eviction import get_eviction_count
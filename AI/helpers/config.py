@@ -1,5 +1,7 @@
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import List, Dict, Any, Optional
+from functools import lru_cache
+import os
 
 
 class Settings(BaseSettings):
@@ -24,6 +26,11 @@ class Settings(BaseSettings):
     COURSES_DB_PORT: int
     COURSES_DB_NAME: str
 
+    DB_POOL_MIN_SIZE: int = 1
+    DB_POOL_MAX_SIZE: int = 10
+    DB_POOL_TIMEOUT: float = 10
+    DB_POOL_HEALTH_CHECK_INTERVAL: float = 30
+
     GENERATION_BACKEND: str
     EMBEDDING_BACKEND: str
 
@@ -37,18 +44,120 @@ class Settings(BaseSettings):
     GENERATION_MODEL_ID: str
     EMBEDDING_MODEL_ID: str
     EMBEDDING_SIZE: int
+    EMBEDDING_BATCH_SIZE: int = 100
+    EMBEDDING_BATCH_MAX_TOKENS: int = 20000
+    EMBEDDING_MAX_CONCURRENCY: int = 4
+    EMBEDDING_MAX_RETRIES: int = 5
+    OPENAI_EMBEDDING_REQUESTS_PER_MINUTE: int = 3000
+    GOOGLE_EMBEDDING_REQUESTS_PER_MINUTE: int = 1500
+
+    EMBEDDING_CACHE_ENABLED: bool = True
+    EMBEDDING_CACHE_PATH: str = 'embedding_cache'
+    EMBEDDING_CACHE_MEMORY_SIZE: int = 10000
+    EMBEDDING_CACHE_MAX_ENTRIES: int = 500000
+
+    CONVERSATION_SUMMARY_PATH: str = 'conversation_summaries'
 
     DEFAULT_INPUT_MAX_CHARACTERS: int = None
     DEFAULT_MAX_NEW_TOKENS: int = None
     DEFAULT_TEMPERATURE: float = None
 
+    HTTP_MAX_CONNECTIONS: int = 100
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    HTTP_KEEPALIVE_EXPIRY: float = 30
+    HTTP_CONNECT_TIMEOUT: float = 10
+    HTTP_TIMEOUT: float = 120
+
     VECTOR_DB_BACKEND: str
     VECTOR_DB_PATH: str
     VECTOR_DB_DISTANCE_METHOD: str
+    VECTOR_DB_MEMORY_COLLECTIONS: List[str] = ['collection_courses', 'tag_vocabulary']
+    VECTOR_DB_MEMORY_PATH: str = 'numpy_vectors'
+    VECTOR_DB_MEMORY_PERSIST: bool = True
+    VECTOR_DB_MEMORY_SAVE_INTERVAL: float = 30
+
+    CHAT_COLLECTION_LAYOUT: str = 'per_chat'
+    CHAT_SHARED_COLLECTION: str = 'chat_documents'
+
+    QDRANT_URL: str = 'http://localhost:6333'
+    QDRANT_API_KEY: Optional[str] = None
+    QDRANT_PREFER_GRPC: bool = True
+    QDRANT_GRPC_PORT: int = 6334
+    QDRANT_TIMEOUT: int = 10
+
+    VECTOR_DB_STORAGE_PROFILES: Dict[str, Dict[str, Any]] = {
+        'courses': {
+            'quantization': 'none',
+            'hnsw_m': 16,
+            'hnsw_ef_construct': 100,
+        },
+        'chats': {
+            'quantization': 'scalar',
+            'quantile': 0.99,
+            'quantization_always_ram': True,
+            'rescore': True,
+            'oversampling': 2.0,
+            'on_disk': True,
+            'on_disk_payload': True,
+            'hnsw_m': 16,
+            'hnsw_ef_construct': 100,
+        },
+    }
+    VECTOR_DB_COLLECTION_PROFILES: Dict[str, str] = {
+        'collection_courses': 'courses',
+        'chat_documents': 'chats',
+        'collection_*': 'chats',
+    }
+
+    COURSES_INDEX_MODE: str = 'incremental'
+    COURSES_INDEX_MAX_ATTEMPTS: int = 3
+    COURSES_INDEX_RETRY_DELAY: int = 30
+
+    SEMANTIC_CACHE_ENABLED: bool = True
+    SEMANTIC_CACHE_COLLECTION: str = 'semantic_response_cache'
+    SEMANTIC_CACHE_SIMILARITY_THRESHOLD: float = 0.95
+    SEMANTIC_CACHE_TTL: int = 86400
+    SEMANTIC_CACHE_MAX_ENTRIES: int = 10000
 
     DEFAULT_LANGUAGE: str = 'en'
     PRIMARY_LANGUAGE: str
 
+    BLOCKING_EXECUTOR_MAX_WORKERS: int = 80
+    ENDPOINT_CONCURRENCY_LIMITS: Dict[str, int] = {
+        'process': 16,
+        'chat-title': 8,
+        'quiz-tags': 8,
+        'quiz-generation': 4,
+        'quiz-feedback': 4,
+        'quiz-pool': 1,
+        'quiz-explanation': 16,
+        'storage': 16,
+    }
+
+    TAG_FAST_PATH_ENABLED: bool = True
+    TAG_VOCABULARY_COLLECTION: str = 'tag_vocabulary'
+    TAG_FAST_PATH_COURSE_THRESHOLD: float = 0.7
+    TAG_FAST_PATH_TAG_THRESHOLD: float = 0.6
+    TAG_FAST_PATH_KEYWORD_BOOST: float = 0.1
+
+    CREW_CACHE_ENABLED: bool = True
+    CREW_CACHE_MEMORY_SIZE: int = 1024
+    CREW_CACHE_DISK_ENABLED: bool = False
+    CREW_CACHE_PATH: str = 'crew_cache'
+    CREW_CACHE_TTLS: Dict[str, int] = {
+        'quiz-tags': 3600,
+        'quiz-generation': 300,
+    }
+
+    QUIZ_POOL_COMBINATIONS: List[Dict[str, Any]] = []
+    QUIZ_POOL_SIZE: int = 5
+    QUIZ_POOL_LOW_WATER_MARK: int = 2
+    QUIZ_POOL_MAX_AGE: int = 86400
+    QUIZ_POOL_REFILL_INTERVAL: int = 300
+
+    QUIZ_FEEDBACK_MODE: str = 'crew'
+    QUIZ_FEEDBACK_MAX_PARALLEL_EXPLANATIONS: int = 4
+
     QUIZ_GENERATION_MODEL_ID: str
     QUIZ_GENERATION_MODEL_TEMPERATURE: float
     AGENTOPS_API_KEY: str
@@ -57,5 +166,29 @@ class Settings(BaseSettings):
         env_file = '.env'
 
 
+def export_api_keys(settings: Settings):
+    '''
+    CrewAI, LiteLLM and AgentOps read their API keys from the environment
+    '''
+    os.environ["GROQ_API_KEY"] = settings.GROQ_API_KEY
+    os.environ["GEMINI_API_KEY"] = settings.GOOGLE_API_KEY
+    os.environ['AGENTOPS_API_KEY'] = settings.AGENTOPS_API_KEY
+
+
+@lru_cache(maxsize=1)
 def get_settings():
-    return Settings()
+    '''
+    Returns the process-wide Settings, the .env file is only read and validated on the first call
+    '''
+    settings = Settings()
+    export_api_keys(settings)
+    return settings
+
+
+def reload_settings():
+    '''
+    Drops the cached Settings and reads the .env file again.
+    Objects that already hold a reference to the old Settings keep it.
+    '''
+    get_settings.cache_clear()
+    return get_settings()
@@ -0,0 +1,7 @@
+def get_eviction_count(entries: int, max_entries: int, low_watermark: float = 0.9):
+    '''
+    Number of entries a cache holding `entries` evicts once it has grown past `max_entries`.
+    It evicts down to `low_watermark` of the limit rather than to the limit itself,
+    so that the next inserts don't each pay for another eviction.
+    '''
+    return max(0, entries - int(max_entries * low_watermark))
@@ -0,0 +1,110 @@
+import asyncio
+import functools
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from logging import getLogger
+
+
+class BlockingCallExecutor:
+    '''
+    Runs blocking LLM and CrewAI calls on a dedicated thread pool so they don't freeze the event loop.
+    Every endpoint gets its own concurrency limit; requests over the limit wait in a queue
+    whose depth is reported by `get_metrics`. The pool has at least one thread per endpoint slot,
+    so a call that got its slot never waits behind another endpoint's calls.
+    '''
+
+    def __init__(self, max_workers: int, endpoint_limits: dict = None,
+                 default_limit: int = 4):
+
+        self.endpoint_limits = endpoint_limits or {}
+        self.default_limit = default_limit
+        self.semaphores = {}
+
+        self.logger = getLogger(__name__)
+
+        total_limit = sum(self.endpoint_limits.values())
+        if max_workers < total_limit:
+            self.logger.warning(
+                f'{max_workers} blocking workers are fewer than the {total_limit} endpoint slots, '
+                f'using {total_limit} workers')
+            max_workers = total_limit
+
+        self.max_workers = max_workers
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix='protu-blocking')
+
+        self.waiting = defaultdict(int)
+        self.running = defaultdict(int)
+        self.completed = defaultdict(int)
+        self.failed = defaultdict(int)
+        self.total_wait_time = defaultdict(float)
+
+    def get_limit(self, endpoint: str):
+        return self.endpoint_limits.get(endpoint, self.default_limit)
+
+    def get_semaphore(self, endpoint: str):
+        if endpoint not in self.semaphores:
+            self.semaphores[endpoint] = asyncio.Semaphore(
+                self.get_limit(endpoint))
+        return self.semaphores[endpoint]
+
+    async def run(self, endpoint: str, func, *args, **kwargs):
+
+        semaphore = self.get_semaphore(endpoint)
+
+        queued_at = time.monotonic()
+        self.waiting[endpoint] += 1
+        try:
+            await semaphore.acquire()
+        finally:
+            self.waiting[endpoint] -= 1
+
+        self.total_wait_time[endpoint] += time.monotonic() - queued_at
+        self.running[endpoint] += 1
+
+        loop = asyncio.get_running_loop()
+
+        try:
+            future = self.executor.submit(functools.partial(func, *args, **kwargs))
+        except BaseException:
+            self.finish(endpoint, semaphore, failed=True)
+            raise
+
+        # The slot is held until the thread is done, cancelling the caller doesn't stop a running call
+        future.add_done_callback(
+            lambda done: loop.call_soon_threadsafe(
+                self.finish, endpoint, semaphore, done.cancelled() or done.exception() is not None)
+        )
+
+        return await asyncio.wrap_future(future, loop=loop)
+
+    def finish(self, endpoint: str, semaphore: asyncio.Semaphore, failed: bool):
+        self.running[endpoint] -= 1
+        semaphore.release()
+
+        if failed:
+            self.failed[endpoint] += 1
+        else:
+            self.completed[endpoint] += 1
+
+    def get_metrics(self):
+        endpoints = set(self.semaphores) | set(self.endpoint_limits)
+
+        return {
+            endpoint: {
+                'limit': self.get_limit(endpoint),
+                'queue_depth': self.waiting[endpoint],
+                'running': self.running[endpoint],
+                'completed': self.completed[endpoint],
+                'failed': self.failed[endpoint],
+                'avg_wait_ms': round(
+                    1000 * self.total_wait_time[endpoint] /
+                    max(1, self.completed[endpoint] + self.failed[endpoint]), 2
+                ),
+            }
+            for endpoint in sorted(endpoints)
+        }
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,100 @@
+import asyncio
+import time
+from collections import defaultdict
+
+
+class StagePipeline:
+    '''
+    Small DAG executor for async request stages.
+    A stage starts as soon as the stages it depends on are done, so independent stages run concurrently.
+    Every stage is called with the run inputs plus the results of its dependencies as keyword arguments,
+    and its duration is recorded for `get_metrics`.
+    A `short_circuit` stage that returns a truthy result ends the run early: the stages still running
+    are cancelled and their results are None.
+    '''
+
+    def __init__(self):
+        self.stages = {}
+
+        self.count = defaultdict(int)
+        self.total_time = defaultdict(float)
+        self.max_time = defaultdict(float)
+
+    def add_stage(self, name: str, func, depends_on: list = None, short_circuit: bool = False):
+        depends_on = list(depends_on or [])
+
+        # Dependencies have to be declared first, which also rules out cycles
+        unknown = [dependency for dependency in depends_on
+                   if dependency not in self.stages]
+        if unknown:
+            raise ValueError(
+                f'Stage {name} depends on undeclared stages: {unknown}')
+
+        self.stages[name] = (func, depends_on, short_circuit)
+        return self
+
+    def record(self, name: str, elapsed: float):
+        self.count[name] += 1
+        self.total_time[name] += elapsed
+        self.max_time[name] = max(self.max_time[name], elapsed)
+
+    async def run(self, **inputs):
+        '''
+        Returns the results of every stage and the time each one took in milliseconds
+        '''
+        tasks = {}
+        timings = {}
+        short_circuited = []
+
+        async def run_stage(name: str):
+            func, depends_on, short_circuit = self.stages[name]
+
+            dependencies = await asyncio.gather(
+                *[tasks[dependency] for dependency in depends_on])
+
+            started_at = time.monotonic()
+            result = await func(**inputs, **dict(zip(depends_on, dependencies)))
+            elapsed = time.monotonic() - started_at
+
+            self.record(name, elapsed)
+            timings[name] = round(1000 * elapsed, 2)
+
+            if short_circuit and result:
+                short_circuited.append(name)
+                for other_name, task in tasks.items():
+                    if other_name != name:
+                        task.cancel()
+
+            return result
+
+        for name in self.stages:
+            tasks[name] = asyncio.ensure_future(run_stage(name))
+
+        try:
+            results = await asyncio.gather(*tasks.values())
+        except asyncio.CancelledError:
+            if not short_circuited:
+                for task in tasks.values():
+                    task.cancel()
+                raise
+
+            return {
+                name: task.result() if task.done() and not task.cancelled() and task.exception() is None else None
+                for name, task in tasks.items()
+            }, timings
+        except BaseException:
+            for task in tasks.values():
+                task.cancel()
+            raise
+
+        return dict(zip(tasks, results)), timings
+
+    def get_metrics(self):
+        return {
+            name: {
+                'count': self.count[name],
+                'avg_ms': round(1000 * self.total_time[name] / max(1, self.count[name]), 2),
+                'max_ms': round(1000 * self.max_time[name], 2),
+            }
+            for name in self.count
+        }
@@ -0,0 +1,66 @@
+from enum import Enum
+import time
+
+
+class ReadinessStatusEnum(Enum):
+
+    PENDING = 'pending'
+    INDEXING = 'indexing'
+    READY = 'ready'
+    FAILED = 'failed'
+
+
+class ReadinessState:
+    '''
+    Tracks the background courses indexing so the health routes can report its progress
+    and the course-dependent routes can refuse requests until it has finished.
+    '''
+
+    def __init__(self):
+        self.status = ReadinessStatusEnum.PENDING
+        self.total = 0
+        self.processed = 0
+        self.attempts = 0
+        self.error = None
+        self.started_at = None
+        self.finished_at = None
+
+    def start(self):
+        self.status = ReadinessStatusEnum.INDEXING
+        self.total = 0
+        self.processed = 0
+        self.attempts += 1
+        self.error = None
+        self.started_at = time.time()
+        self.finished_at = None
+
+    def set_total(self, total: int):
+        self.total = total
+
+    def advance(self, count: int = 1):
+        self.processed += count
+
+    def finish(self):
+        self.status = ReadinessStatusEnum.READY
+        self.processed = self.total
+        self.finished_at = time.time()
+
+    def fail(self, error: str):
+        self.status = ReadinessStatusEnum.FAILED
+        self.error = error
+        self.finished_at = time.time()
+
+    @property
+    def is_ready(self):
+        return self.status == ReadinessStatusEnum.READY
+
+    def to_dict(self):
+        return {
+            'status': self.status.value,
+            'courses_total': self.total,
+            'courses_processed': self.processed,
+            'attempts': self.attempts,
+            'error': self.error,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+        }
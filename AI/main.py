@@ -1,16 +1,25 @@
 from fastapi import FastAPI
 from routes import base, data, quiz
 
-from controllers import DBController, NLPController, AgentsController
+from controllers import DBController, NLPController, AgentsController, BaseController, QuizPoolController, TagSuggestionController, QuizFeedbackController
+from controllers.utils import query_registry
 
 from contextlib import asynccontextmanager
 
-from helpers import get_settings
+from helpers import get_settings, ReadinessState, BlockingCallExecutor
 
-from stores.llm import LLMFactoryProvider
-from stores.vectordb import VectorDBFactoryProvider
+from stores.llm import LLMFactoryProvider, EmbeddingCache
+from stores.vectordb import VectorDBFactoryProvider, SemanticResponseCache
+from stores.database import PostgresPool
+from stores.memory import ConversationSummaryStore
+from stores.agents import CrewResponseCache
+from stores.agents.tools import retrieve_courses_tool
 
 import agentops
+import asyncio
+import logging
+
+logger = logging.getLogger("uvicorn.error")
 
 
 async def startup_spam():
@@ -21,7 +30,20 @@ async def startup_spam():
         api_key=settings.AGENTOPS_API_KEY,
     )
 
-    llm_factory_provider = LLMFactoryProvider(config=settings)
+    # Embedding cache, shared by every provider built by the factory
+    app.embedding_cache = None
+    if settings.EMBEDDING_CACHE_ENABLED:
+        app.embedding_cache = EmbeddingCache(
+            db_path=BaseController().get_db_path(settings.EMBEDDING_CACHE_PATH),
+            memory_size=settings.EMBEDDING_CACHE_MEMORY_SIZE,
+            max_entries=settings.EMBEDDING_CACHE_MAX_ENTRIES,
+        )
+
+    llm_factory_provider = LLMFactoryProvider(
+        config=settings, embedding_cache=app.embedding_cache)
+
+    # Keep-alive HTTP pool shared by the async OpenAI, Gemini and Groq clients
+    app.http_client = llm_factory_provider.create_http_client()
     vectordb_factory_provider = VectorDBFactoryProvider(config=settings)
 
     # Generation model
@@ -37,28 +59,190 @@ async def startup_spam():
         embedding_model_id=settings.EMBEDDING_MODEL_ID,
         embedding_size=settings.EMBEDDING_SIZE)
 
-    # VectorDB
-    app.vectordb_client = vectordb_factory_provider.create_provider(
+    app.embedding_pipeline = llm_factory_provider.create_embedding_pipeline(
+        provider=settings.EMBEDDING_BACKEND,
+        embedding_model=app.embedding_model)
+
+    # Conversation summary model and the rolling summaries it keeps up to date
+    app.summary_client = llm_factory_provider.create_summary_client()
+    app.summary_store = ConversationSummaryStore(
+        db_path=BaseController().get_db_path(settings.CONVERSATION_SUMMARY_PATH))
+
+    # VectorDB, the small read-mostly collections are searched in memory
+    app.vectordb_client = vectordb_factory_provider.create_routed_provider(
         provider=settings.VECTOR_DB_BACKEND
     )
     app.vectordb_client.connect()
 
+    # Answers of near-identical questions are served from a dedicated collection
+    app.semantic_cache = None
+    if settings.SEMANTIC_CACHE_ENABLED:
+        app.semantic_cache = SemanticResponseCache(
+            vectordb_client=app.vectordb_client,
+            collection_name=settings.SEMANTIC_CACHE_COLLECTION,
+            embedding_dim=settings.EMBEDDING_SIZE,
+            similarity_threshold=settings.SEMANTIC_CACHE_SIMILARITY_THRESHOLD,
+            ttl=settings.SEMANTIC_CACHE_TTL,
+            max_entries=settings.SEMANTIC_CACHE_MAX_ENTRIES,
+        )
+
+    # Database pools, one per database
+    app.chat_db_pool = PostgresPool(
+        db_name=settings.DB_NAME,
+        db_user=settings.DB_USER,
+        db_password=settings.DB_PASSWORD,
+        db_host=settings.DB_HOST,
+        db_port=settings.DB_PORT,
+        min_size=settings.DB_POOL_MIN_SIZE,
+        max_size=settings.DB_POOL_MAX_SIZE,
+        timeout=settings.DB_POOL_TIMEOUT,
+        health_check_interval=settings.DB_POOL_HEALTH_CHECK_INTERVAL,
+        queries=query_registry.get_group('chat'),
+    )
+    app.courses_db_pool = PostgresPool(
+        db_name=settings.COURSES_DB_NAME,
+        db_user=settings.COURSES_DB_USER,
+        db_password=settings.COURSES_DB_PASSWORD,
+        db_host=settings.COURSES_DB_HOST,
+        db_port=settings.COURSES_DB_PORT,
+        min_size=settings.DB_POOL_MIN_SIZE,
+        max_size=settings.DB_POOL_MAX_SIZE,
+        timeout=settings.DB_POOL_TIMEOUT,
+        health_check_interval=settings.DB_POOL_HEALTH_CHECK_INTERVAL,
+        queries=query_registry.get_group('courses'),
+    )
+
+    app.chat_db_controller = DBController(db_pool=app.chat_db_pool)
+    app.courses_db_controller = DBController(db_pool=app.courses_db_pool)
+
+    # Thread pool for the blocking LLM and CrewAI calls
+    app.blocking_executor = BlockingCallExecutor(
+        max_workers=settings.BLOCKING_EXECUTOR_MAX_WORKERS,
+        endpoint_limits=settings.ENDPOINT_CONCURRENCY_LIMITS,
+    )
+
     # NLP Controller
     app.nlp_controller = NLPController(
         vectordb_client=app.vectordb_client,
         generation_model=app.generation_model,
         embedding_model=app.embedding_model,
+        embedding_pipeline=app.embedding_pipeline,
+        summary_client=app.summary_client,
+        summary_store=app.summary_store,
+        semantic_cache=app.semantic_cache,
+        chat_db_controller=app.chat_db_controller,
+        courses_db_controller=app.courses_db_controller,
+        blocking_executor=app.blocking_executor,
+    )
+
+    # Local tag suggestions for known topics, the tag agent only gets the rest
+    app.tag_suggestion_controller = TagSuggestionController(
+        nlp_controller=app.nlp_controller,
+    )
+
+    # Agents Controller, the crews are built on first use and reused from per-endpoint pools.
+    # Feedback crews are built on worker threads, so their course tool is bound to this loop
+    loop = asyncio.get_running_loop()
+    app.agents_controller = AgentsController(
+        quiz_feedback_tools_factory=lambda: [
+            retrieve_courses_tool(nlp_controller=app.nlp_controller, loop=loop)
+        ],
+    )
+
+    # Responses of identical quiz requests are served without running the crews again
+    app.crew_cache = CrewResponseCache(
+        model_id=settings.QUIZ_GENERATION_MODEL_ID,
+        temperature=settings.QUIZ_GENERATION_MODEL_TEMPERATURE,
+        endpoint_ttls=settings.CREW_CACHE_TTLS,
+        memory_size=settings.CREW_CACHE_MEMORY_SIZE,
+        db_path=BaseController().get_db_path(
+            settings.CREW_CACHE_PATH) if settings.CREW_CACHE_DISK_ENABLED else None,
+        enabled=settings.CREW_CACHE_ENABLED,
+    )
+
+    # Pre-generated quizzes for the popular combinations, refilled in the background
+    app.quiz_pool_controller = QuizPoolController(
+        agents_controller=app.agents_controller,
+        blocking_executor=app.blocking_executor,
+    )
+    app.quiz_pool_task = asyncio.create_task(app.quiz_pool_controller.run())
+
+    # Quiz feedback with one explanation call per question, the route uses it when QUIZ_FEEDBACK_MODE is parallel
+    app.quiz_feedback_controller = QuizFeedbackController(
+        agents_controller=app.agents_controller,
+        nlp_controller=app.nlp_controller,
+        blocking_executor=app.blocking_executor,
     )
 
-    app.nlp_controller.index_courses_into_vectordb()
+    # Courses are indexed in the background so the port opens right away
+    app.readiness_state = ReadinessState()
+    app.indexing_task = asyncio.create_task(index_courses_in_background())
+
+
+async def index_courses_in_background():
+
+    settings = get_settings()
+
+    for attempt in range(1, settings.COURSES_INDEX_MAX_ATTEMPTS + 1):
+
+        app.readiness_state.start()
+
+        try:
+            done = await app.nlp_controller.index_courses_into_vectordb(
+                readiness_state=app.readiness_state
+            )
+        except Exception as e:
+            logger.error(f"Error in indexing courses (attempt {attempt}): {e}")
+            app.readiness_state.fail(error=str(e))
+            done = False
+
+        if done:
+            app.readiness_state.finish()
+            await sync_tag_catalog()
+            return
+
+        if app.readiness_state.error is None:
+            app.readiness_state.fail(error="Courses indexing failed")
+
+        if attempt < settings.COURSES_INDEX_MAX_ATTEMPTS:
+            await asyncio.sleep(settings.COURSES_INDEX_RETRY_DELAY)
 
-    # Agents Controller
-    app.agents_controller = AgentsController()
+    logger.error(
+        f"Giving up on indexing courses after {settings.COURSES_INDEX_MAX_ATTEMPTS} attempts: "
+        f"{app.readiness_state.error}")
+
+
+async def sync_tag_catalog():
+    try:
+        learned = await app.tag_suggestion_controller.sync_catalog()
+        logger.info(f"Tag vocabulary synced with the course catalog: {learned} new tags")
+    except Exception as e:
+        logger.error(f"Error in syncing the tag vocabulary with the course catalog: {e}")
 
 
 async def shutdown_spam():
 
+    app.indexing_task.cancel()
+    app.quiz_pool_task.cancel()
+
+    # The tasks may be mid-way through a vector db or database call, let them unwind before the clients close
+    await asyncio.gather(app.indexing_task, app.quiz_pool_task, return_exceptions=True)
+
     app.vectordb_client.disconnect()
+
+    await app.chat_db_pool.close()
+    await app.courses_db_pool.close()
+
+    app.blocking_executor.shutdown()
+
+    await app.http_client.aclose()
+
+    if app.embedding_cache:
+        app.embedding_cache.close()
+
+    app.summary_store.close()
+
+    app.crew_cache.close()
     # agentops.end_session()
 
 
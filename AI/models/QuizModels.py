@@ -106,6 +106,16 @@ class WeaknessAnalyzerOutput(BaseModel):
         ..., description="A consolidated list of all course recommendations for the identified topics.")
 
 
+class FeedbackTopicsOutput(BaseModel):
+    """
+    Topics of the incorrect questions, extracted by a single call in the parallel feedback mode.
+    """
+    specific_topics: List[str] = Field(
+        default=[], description="A de-duplicated list of the granular topics of the incorrect questions.")
+    broad_topics: List[str] = Field(
+        default=[], description="A de-duplicated list of the general search topics of the incorrect questions.")
+
+
 class DetailedExplanation(BaseModel):
     """
     Represents a detailed explanation for a single incorrect answer.
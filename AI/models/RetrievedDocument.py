@@ -1,4 +1,5 @@
 from pydantic import BaseModel
+from typing import Optional, Union
 
 class RetrievedDocument(BaseModel):
     '''
@@ -8,3 +9,5 @@ class RetrievedDocument(BaseModel):
     text: str
     score: float
     metadata: str
+    id: Optional[Union[int, str]] = None
+    payload: Optional[dict] = None
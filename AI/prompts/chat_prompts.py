@@ -56,6 +56,38 @@ footer_prompt = Template(
 )
 
 
+# Rolling conversation summary
+
+summary_system_prompt = "You are a helpful assistant tasked with summarizing conversations. Provide a concise summary of the following message history."
+
+summary_update_system_prompt = "\n".join([
+    "You are a helpful assistant that keeps a running summary of a conversation up to date.",
+    "You will be given the current summary and the messages that came after it.",
+    "Return a single concise summary that covers both, keeping the facts, topics and open questions that matter for the rest of the conversation.",
+])
+
+summary_prompt = Template(
+    '\n'.join(
+        [
+            "Here is the conversation history I would like to summarize:",
+            "$new_messages",
+        ]
+    )
+)
+
+summary_update_prompt = Template(
+    '\n'.join(
+        [
+            "## Current Summary:",
+            "$summary",
+            "",
+            "## New Messages:",
+            "$new_messages",
+        ]
+    )
+)
+
+
 # Chat title generation agent
 
 title_generation_agent_role = "Chat Title Generation Agent"
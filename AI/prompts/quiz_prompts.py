@@ -251,3 +251,48 @@ feedback_synthesizer_task_expected_output = "\n".join([
     "- `detailed_explanations` (list of objects): The list of per-question explanations you generated.",
     "- `recommended_course_ids` (list of integers): The final, curated list of the top 'k' course IDs to recommend."
 ])
+
+
+# Parallel quiz feedback, one small call per incorrect question
+
+question_explanation_system_prompt = "\n".join([
+    "You are an expert AI Learning Coach.",
+    "You explain a single quiz question the user answered incorrectly, in a constructive and supportive tone.",
+    "Reply with the explanation text only, without a title, greeting or JSON."
+])
+
+question_explanation_prompt = "\n".join([
+    "Question: {question}",
+    "Options: {options}",
+    "The user's answer: {user_answer}",
+    "The correct answer: {correct_answer_text}",
+    "",
+    "Explain in a short paragraph *why* the user's answer is incorrect and *why* the correct answer is right, focusing on the underlying concept."
+])
+
+feedback_topics_system_prompt = "\n".join([
+    "You are an Expert Learning Analyst.",
+    "You identify the knowledge gaps behind a user's incorrect quiz answers."
+])
+
+feedback_topics_prompt = "\n".join([
+    "Incorrect quiz questions: {incorrect_questions}",
+    "",
+    "For every question, determine its granular **Specific Topic** (e.g., \"RAII\", \"forwarding reference\") and its general **Broad Search Topic** (e.g., \"Advanced C++\").",
+    "Return only a JSON object with two keys:",
+    "- `specific_topics`: the de-duplicated list of specific topics.",
+    "- `broad_topics`: the de-duplicated list of broad search topics."
+])
+
+feedback_message_template = " ".join([
+    "Great effort on this quiz, every mistake is a step forward!",
+    "You have opportunities to improve in the following areas: {topics}.",
+    "Go through the explanations below and check out the recommended courses to turn these into strengths. Keep learning!"
+])
+
+feedback_message_without_topics = " ".join([
+    "Great effort on this quiz, every mistake is a step forward!",
+    "Go through the explanations below and check out the recommended courses to strengthen your understanding. Keep learning!"
+])
+
+question_explanation_fallback = "The correct answer is \"{correct_answer_text}\", not \"{user_answer}\"."
@@ -1,4 +1,5 @@
-from fastapi import FastAPI, APIRouter
+from fastapi import FastAPI, APIRouter, Request, status
+from fastapi.responses import JSONResponse
 
 base_router = APIRouter(
     prefix="/protu/ai",
@@ -8,4 +9,39 @@ base_router = APIRouter(
 async def welcome():
     return {
         "message": "Welcome to the Protu AI!"
-    }
\ No newline at end of file
+    }
+
+
+@base_router.get("/health/live")
+async def liveness():
+    return {
+        "status": "alive"
+    }
+
+
+@base_router.get("/health/ready")
+async def readiness(request: Request):
+
+    readiness_state = request.app.readiness_state
+
+    return JSONResponse(
+        status_code=status.HTTP_200_OK if readiness_state.is_ready else status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={
+            "ready": readiness_state.is_ready,
+            "courses_indexing": readiness_state.to_dict()
+        }
+    )
+
+
+@base_router.get("/metrics")
+async def metrics(request: Request):
+    return {
+        "blocking_executor": request.app.blocking_executor.get_metrics(),
+        "rag_stages": request.app.nlp_controller.rag_pipeline.get_metrics(),
+        "semantic_cache": request.app.semantic_cache.get_metrics() if request.app.semantic_cache else None,
+        "crew_cache": request.app.crew_cache.get_metrics(),
+        "crew_pools": request.app.agents_controller.get_metrics(),
+        "quiz_pool": request.app.quiz_pool_controller.get_metrics(),
+        "quiz_feedback": request.app.quiz_feedback_controller.get_metrics(),
+        "tag_suggestion": request.app.tag_suggestion_controller.get_metrics()
+    }
@@ -1,6 +1,7 @@
 from fastapi import FastAPI, APIRouter, UploadFile, File, status, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 import aiofiles
+import json
 import os
 
 from stores.llm import LLMFactoryProvider
@@ -8,7 +9,7 @@ from stores.vectordb import VectorDBFactoryProvider
 
 from controllers import DataController, BaseController, NLPController, DBController
 
-from controllers.Enums import ResponseSignal
+from controllers.Enums import ResponseSignal, EndpointEnum
 
 import logging
 
@@ -30,9 +31,9 @@ async def process_end(request: Request, process_request: ProcessRequest):
     nlp_controller = request.app.nlp_controller
 
     if is_attached:
-        _ = nlp_controller.get_file_and_store_into_vectordb(chat_id=chat_id)
+        _ = await nlp_controller.get_file_and_store_into_vectordb(chat_id=chat_id)
 
-    full_prompt, chat_history, answer = nlp_controller.answer_rag_question(
+    full_prompt, chat_history, answer = await nlp_controller.answer_rag_question(
         chat_id=chat_id)
 
     try:
@@ -53,22 +54,58 @@ async def process_end(request: Request, process_request: ProcessRequest):
         )
 
 
+def format_sse_event(data: dict, event: str = None):
+    lines = [f"event: {event}"] if event else []
+    lines.append(f"data: {json.dumps(data)}")
+    return '\n'.join(lines) + '\n\n'
+
+
+@data_router.post("/process/stream")
+async def process_stream_end(request: Request, process_request: ProcessRequest):
+    chat_id, is_attached = process_request.chat_id, process_request.is_attached
+
+    nlp_controller = request.app.nlp_controller
+
+    if is_attached:
+        _ = await nlp_controller.get_file_and_store_into_vectordb(chat_id=chat_id)
+
+    async def event_stream():
+        answer = []
+        try:
+            async for token in nlp_controller.answer_rag_question_stream(chat_id=chat_id):
+                answer.append(token)
+                yield format_sse_event({"token": token})
+        except Exception as e:
+            logger.log(logging.WARNING, f"Error in process_stream_end: {e}")
+            yield format_sse_event(
+                {"message": ResponseSignal.LLM_GENERATION_FAILED.value},
+                event="error"
+            )
+            return
+
+        yield format_sse_event(
+            {
+                "message": ResponseSignal.LLM_GENERATION_SUCCESS.value,
+                "answer": ''.join(answer)
+            },
+            event="done"
+        )
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @data_router.post("/chat_title")
 async def chat_title_generation(request: Request, chat_messages: ChatTitleGenerationRequst):
 
     agents_controller = request.app.agents_controller
 
-    app_settings = BaseController().app_settings
-
-    db_controller = db_controller = DBController(
-        db_name=app_settings.DB_NAME,
-        db_user=app_settings.DB_USER,
-        db_password=app_settings.DB_PASSWORD,
-        db_host=app_settings.DB_HOST,
-        db_port=app_settings.DB_PORT
-    )
+    db_controller = request.app.chat_db_controller
 
-    all_messages_as_tuples = db_controller.get_all_messages_by_chat_id(
+    all_messages_as_tuples = await db_controller.get_all_messages_by_chat_id(
         chat_id=chat_messages.chat_id
     )
 
@@ -79,7 +116,9 @@ async def chat_title_generation(request: Request, chat_messages: ChatTitleGenera
 
     print(all_messages)
 
-    chat_title = agents_controller.create_chat_title(
+    chat_title = await request.app.blocking_executor.run(
+        EndpointEnum.CHAT_TITLE.value,
+        agents_controller.create_chat_title,
         input=ChatTitleGenerationInput(
             chat_messages=all_messages
         )
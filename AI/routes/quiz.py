@@ -5,9 +5,7 @@ from controllers import AgentsController, NLPController
 
 from models import TagAgentInput, FeedbackInput
 
-from controllers.Enums import ResponseSignal
-
-from stores.agents.tools import retrieve_courses_tool
+from controllers.Enums import ResponseSignal, EndpointEnum
 
 from .schemas import *
 
@@ -27,7 +25,30 @@ async def create_quiz_tags(request: Request, tags_request: TagAgentInput):
 
     agents_controller = request.app.agents_controller
 
-    agent_response = agents_controller.create_quiz_tags(tags_request)
+    tag_suggestion_controller = request.app.tag_suggestion_controller
+
+    local_response = await tag_suggestion_controller.suggest(tags_request)
+
+    if local_response is not None:
+        return JSONResponse(
+            status_code=status.HTTP_200_OK,
+            content={
+                'signal': ResponseSignal.AGENT_RESPONSE_SUCCESS.value,
+                'tags': local_response.tags,
+                'message': local_response.message,
+                'is_relevant': local_response.is_relevant
+            }
+        )
+
+    agent_response = await request.app.crew_cache.get_or_run(
+        endpoint=EndpointEnum.QUIZ_TAGS.value,
+        inputs=tags_request.model_dump(),
+        run=lambda: request.app.blocking_executor.run(
+            EndpointEnum.QUIZ_TAGS.value,
+            agents_controller.create_quiz_tags,
+            tags_request
+        )
+    )
 
     if agent_response is None:
         logger.error("Error in creating quiz tags")
@@ -41,6 +62,10 @@ async def create_quiz_tags(request: Request, tags_request: TagAgentInput):
     quiz_tags, message, is_relevant = agent_response[
         'tags'], agent_response['message'], agent_response['is_relevant']
 
+    # The agent's tags feed the local suggestions of the next similar prompts
+    if is_relevant and quiz_tags:
+        await tag_suggestion_controller.learn_tags(tags=quiz_tags)
+
     return JSONResponse(
         status_code=status.HTTP_200_OK,
         content={
@@ -57,7 +82,26 @@ async def create_quiz_tags(request: Request, tags_request: TagAgentInput):
 async def create_quiz(request: Request, quiz_request: QuizAgentInput):
     agents_controller = request.app.agents_controller
 
-    agent_quiz_response = agents_controller.create_quiz(quiz_request)
+    pooled_quiz = request.app.quiz_pool_controller.take(quiz_request)
+
+    if pooled_quiz is not None:
+        return JSONResponse(
+            status_code=status.HTTP_200_OK,
+            content={
+                'signal': ResponseSignal.AGENT_RESPONSE_SUCCESS.value,
+                'quiz': pooled_quiz,
+            }
+        )
+
+    agent_quiz_response = await request.app.crew_cache.get_or_run(
+        endpoint=EndpointEnum.QUIZ_GENERATION.value,
+        inputs=quiz_request.model_dump(),
+        run=lambda: request.app.blocking_executor.run(
+            EndpointEnum.QUIZ_GENERATION.value,
+            agents_controller.create_quiz,
+            quiz_request
+        )
+    )
 
     if agent_quiz_response is None:
         logger.error("Error in creating quiz")
@@ -71,7 +115,7 @@ async def create_quiz(request: Request, quiz_request: QuizAgentInput):
         status_code=status.HTTP_200_OK,
         content={
             'signal': ResponseSignal.AGENT_RESPONSE_SUCCESS.value,
-            'quiz': agent_quiz_response.to_dict(),
+            'quiz': agent_quiz_response,
         }
     )
 
@@ -79,93 +123,28 @@ async def create_quiz(request: Request, quiz_request: QuizAgentInput):
 @quiz_router.post("/quiz-feedback")
 async def create_quiz_feedback(request: Request, quiz_feedback_request: FeedbackInput):
 
-    agents_controller = request.app.agents_controller
-
-    nlp_controller = request.app.nlp_controller
-
-    courses_retriever_tool = retrieve_courses_tool(
-        nlp_controller=nlp_controller
-    )
-
-    # topics = [
-    #     "precision",
-    #     "machine learning",
-    #     "artificial intelligence",
-    #     "neural networks",
-    #     "activation function",
-    #     "neural network architecture",
-    #     "python library",
-    #     "clustering",
-    #     "supervised learning",
-    #     "overfitting",
-    #     "feature engineering",
-    #     "deep learning",
-    #     "perceptron",
-    #     "backpropagation",
-    #     "reinforcement learning"
-    # ]
-    # all_results = []
-    # for t in topics:
-    #     raw_documents = nlp_controller.search_vector_db_collection(
-    #         text=t,
-    #         chat_id="courses",
-    #         limit=3
-    #     )
-    #     if raw_documents is None:
-    #         print(f"WARNING: No results found for topic: {t}")
-    #         continue
-
-    #     all_results.extend(raw_documents)
-
-    # print(all_results)
-    # highest_scores = {}
-    # for doc in all_results:
-    #     try:
-    #         course_id = int(doc.metadata)
-    #         score = doc.score
-
-    #         if course_id not in highest_scores or score > highest_scores[course_id]:
-    #             highest_scores[course_id] = score
-
-    #     except (ValueError, TypeError):
-    #         # Skip documents with malformed metadata
-    #         print(
-    #             f"WARNING: Skipping document with invalid metadata: {doc.metadata}")
-    #         continue
-
-    # processed_results = [
-    #     {"course_id": course_id, "relevance_score": score}
-    #     for course_id, score in highest_scores.items()
-    # ]
-    # print(processed_results)
-
-    # sorted_results = sorted(
-    #     processed_results,
-    #     key=lambda item: item['relevance_score'],
-    #     reverse=True
-    # )
-
-    # print(sorted_results)
-
-    crew_created = agents_controller.create_quiz_feedback_recommendation_crew(
-        tools=[courses_retriever_tool]
-    )
-
-    if not crew_created:
-        logger.error("Error in creating quiz feedback recommendation crew")
+    if not request.app.readiness_state.is_ready:
+        logger.warning("Quiz feedback requested before the courses were indexed")
         return JSONResponse(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             content={
-                'signal': ResponseSignal.AGENT_CREW_CREATION_FAILED.value,
+                'signal': ResponseSignal.SERVICE_NOT_READY.value,
             }
         )
 
-    feedback_response = agents_controller.create_quiz_feedback_recommendation(
-        inputs=quiz_feedback_request
-    )
+    agents_controller = request.app.agents_controller
 
-    feedback_message, detailed_explanations, recommended_course_ids = feedback_response[
-        'feedback_message'], feedback_response['detailed_explanations'], feedback_response['recommended_course_ids']
+    if request.app.quiz_feedback_controller.enabled:
+        feedback_response = await request.app.quiz_feedback_controller.create_feedback(
+            feedback_input=quiz_feedback_request
+        )
+    else:
+        # The crew is checked out of the feedback crew pool for the duration of the run
+        feedback_response = await request.app.blocking_executor.run(
+            EndpointEnum.QUIZ_FEEDBACK.value,
+            agents_controller.create_quiz_feedback_recommendation,
+            inputs=quiz_feedback_request
+        )
 
     if feedback_response is None:
         logger.error("Error in creating quiz feedback")
@@ -176,6 +155,9 @@ async def create_quiz_feedback(request: Request, quiz_feedback_request: Feedback
             }
         )
 
+    feedback_message, detailed_explanations, recommended_course_ids = feedback_response[
+        'feedback_message'], feedback_response['detailed_explanations'], feedback_response['recommended_course_ids']
+
     return JSONResponse(
         status_code=status.HTTP_200_OK,
         content={
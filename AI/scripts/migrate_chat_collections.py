@@ -0,0 +1,127 @@
+'''
+Moves the per-chat collections (collection_{chat_id}) into the shared chat collection
+used when CHAT_COLLECTION_LAYOUT is "shared".
+
+Every point keeps its vector, text and metadata, gets a chat_id payload field and an id namespaced
+by its chat, the same one a new upload of the chunk would get, so running it again is harmless.
+The embedded Qdrant holds a file lock, stop the service before running it against VECTOR_DB_PATH.
+
+Run it from the AI directory so the .env file is found:
+
+    python -m scripts.migrate_chat_collections --dry-run
+    python -m scripts.migrate_chat_collections --delete-source
+'''
+import argparse
+
+from helpers.config import get_settings
+from controllers import NLPController
+from stores.vectordb import VectorDBFactoryProvider
+
+
+COLLECTION_PREFIX = 'collection_'
+
+
+def list_chat_collections(vectordb_client, shared_collection: str):
+    collections = vectordb_client.list_collections()
+    names = [getattr(collection, 'name', collection)
+             for collection in getattr(collections, 'collections', collections)]
+
+    dedicated = {f'{COLLECTION_PREFIX}{chat_id}' for chat_id in NLPController.DEDICATED_CHAT_IDS}
+
+    return sorted(
+        name for name in names
+        if name.startswith(COLLECTION_PREFIX) and name not in dedicated and name != shared_collection
+    )
+
+
+def migrate_collection(vectordb_client, collection_name: str, shared_collection: str, batch_size: int):
+    chat_id = collection_name[len(COLLECTION_PREFIX):]
+    migrated = 0
+
+    for points in vectordb_client.scroll_points(collection_name=collection_name, batch_size=batch_size):
+
+        inserted = vectordb_client.insert_batch(
+            collection_name=shared_collection,
+            vectors=[vector for _, vector, _ in points],
+            texts=[payload.get('text') for _, _, payload in points],
+            metadata=[payload.get('metadata') for _, _, payload in points],
+            vector_ids=[NLPController.get_shared_point_id(chat_id=chat_id, chunk_id=point_id)
+                        for point_id, _, _ in points],
+            payloads=[
+                {
+                    **{key: value for key, value in payload.items() if key not in ('text', 'metadata')},
+                    'chat_id': chat_id,
+                }
+                for _, _, payload in points
+            ],
+            batch_size=batch_size
+        )
+
+        if not inserted:
+            raise RuntimeError(f'Error inserting the points of {collection_name}')
+
+        migrated += len(points)
+
+    return migrated
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--batch-size', type=int, default=256)
+    parser.add_argument('--delete-source', action='store_true',
+                        help='delete every per-chat collection once it is migrated')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='only list the collections that would be migrated')
+    args = parser.parse_args()
+
+    settings = get_settings()
+    shared_collection = settings.CHAT_SHARED_COLLECTION
+
+    # The per-chat collections are never served from memory, so the backend is used directly
+    vectordb_client = VectorDBFactoryProvider(config=settings).create_provider(
+        provider=settings.VECTOR_DB_BACKEND)
+    vectordb_client.connect()
+
+    try:
+        chat_collections = list_chat_collections(
+            vectordb_client=vectordb_client, shared_collection=shared_collection)
+
+        print(f"{len(chat_collections)} per-chat collections to migrate into {shared_collection}")
+
+        if args.dry_run:
+            for collection_name in chat_collections:
+                print(f"  {collection_name}")
+            return
+
+        _ = vectordb_client.create_collection(
+            collection_name=shared_collection,
+            embedding_dim=settings.EMBEDDING_SIZE
+        )
+        _ = vectordb_client.create_payload_index(
+            collection_name=shared_collection,
+            field_name='chat_id'
+        )
+
+        total = 0
+        for collection_name in chat_collections:
+            migrated = migrate_collection(
+                vectordb_client=vectordb_client,
+                collection_name=collection_name,
+                shared_collection=shared_collection,
+                batch_size=args.batch_size
+            )
+            total += migrated
+
+            if args.delete_source:
+                _ = vectordb_client.delete_collection(collection_name=collection_name)
+
+            print(f"  {collection_name}: {migrated} points")
+
+        print(f"Migrated {total} points from {len(chat_collections)} collections")
+
+    finally:
+        vectordb_client.disconnect()
+
+
+if __name__ == '__main__':
+    main()
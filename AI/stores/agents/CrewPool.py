@@ -0,0 +1,80 @@
+import queue
+import threading
+from contextlib import contextmanager
+from typing import Callable
+
+from crewai import Crew
+
+
+class CrewPool:
+    '''
+    Pool of identical crews built by `factory`, at most `size` of them.
+    A crew keeps per-run state while it is kicked off, so each one serves a single request at a time:
+    callers check a crew out for the duration of the run and hand it back afterwards.
+    Crews are built on first demand and reused from then on.
+    '''
+
+    def __init__(self, factory: Callable[[], Crew], size: int = 1):
+        self.factory = factory
+        self.size = max(1, size)
+
+        self.available = queue.LifoQueue()
+        self.lock = threading.Lock()
+
+        self.created = 0
+        self.in_use = 0
+        self.checkouts = 0
+        self.waits = 0
+
+    def checkout(self, timeout: float = None):
+        try:
+            crew = self.available.get_nowait()
+        except queue.Empty:
+            crew = None
+
+        if crew is None:
+            with self.lock:
+                can_create = self.created < self.size
+                if can_create:
+                    self.created += 1
+
+            if can_create:
+                try:
+                    crew = self.factory()
+                except Exception:
+                    with self.lock:
+                        self.created -= 1
+                    raise
+            else:
+                with self.lock:
+                    self.waits += 1
+                crew = self.available.get(timeout=timeout)
+
+        with self.lock:
+            self.in_use += 1
+            self.checkouts += 1
+
+        return crew
+
+    def release(self, crew: Crew):
+        with self.lock:
+            self.in_use -= 1
+        self.available.put(crew)
+
+    @contextmanager
+    def crew(self, timeout: float = None):
+        crew = self.checkout(timeout=timeout)
+        try:
+            yield crew
+        finally:
+            self.release(crew)
+
+    def get_metrics(self):
+        return {
+            'size': self.size,
+            'created': self.created,
+            'in_use': self.in_use,
+            'available': self.available.qsize(),
+            'checkouts': self.checkouts,
+            'waits': self.waits,
+        }
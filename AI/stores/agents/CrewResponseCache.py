@@ -0,0 +1,175 @@
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from collections import OrderedDict, defaultdict
+from logging import getLogger
+
+
+class CrewResponseCache:
+    '''
+    Request-level cache for crew runs.
+    Entries are keyed by a canonical hash of the request payload and the model id / temperature,
+    kept in an in-memory LRU and optionally in a SQLite file, and expire after the endpoint's TTL.
+    Concurrent identical requests share a single crew run.
+    '''
+
+    def __init__(self, model_id: str, temperature: float,
+                 endpoint_ttls: dict = None, default_ttl: int = 600,
+                 memory_size: int = 1024, db_path: str = None,
+                 enabled: bool = True):
+
+        self.model_id = model_id
+        self.temperature = temperature
+        self.endpoint_ttls = endpoint_ttls or {}
+        self.default_ttl = default_ttl
+        self.memory_size = memory_size
+        self.enabled = enabled
+
+        self.memory = OrderedDict()
+        self.in_flight = {}
+
+        self.hits = defaultdict(int)
+        self.misses = defaultdict(int)
+        self.deduplicated = defaultdict(int)
+
+        self.logger = getLogger(__name__)
+
+        self.connection = None
+        if enabled and db_path:
+            self.connection = sqlite3.connect(
+                os.path.join(db_path, 'crew_responses.sqlite3'), check_same_thread=False)
+            self.connection.execute('PRAGMA journal_mode=WAL')
+            self.connection.execute(
+                'CREATE TABLE IF NOT EXISTS responses ('
+                'key TEXT PRIMARY KEY, endpoint TEXT NOT NULL, value TEXT NOT NULL, expires_at REAL NOT NULL)'
+            )
+            self.connection.execute(
+                'DELETE FROM responses WHERE expires_at < ?', (time.time(),))
+            self.connection.commit()
+
+    def get_ttl(self, endpoint: str):
+        return self.endpoint_ttls.get(endpoint, self.default_ttl)
+
+    def build_key(self, endpoint: str, inputs: dict):
+        canonical = json.dumps(
+            {
+                'endpoint': endpoint,
+                'model_id': self.model_id,
+                'temperature': self.temperature,
+                'inputs': inputs,
+            },
+            sort_keys=True, separators=(',', ':'), ensure_ascii=False, default=str
+        )
+        return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+    def get(self, key: str):
+        now = time.time()
+
+        if key in self.memory:
+            expires_at, value = self.memory[key]
+            if expires_at >= now:
+                self.memory.move_to_end(key)
+                return value
+            del self.memory[key]
+
+        if self.connection is None:
+            return None
+
+        try:
+            row = self.connection.execute(
+                'SELECT value, expires_at FROM responses WHERE key = ? AND expires_at >= ?',
+                (key, now)
+            ).fetchone()
+        except sqlite3.Error as e:
+            self.logger.error(f'Error reading crew response cache: {e}')
+            return None
+
+        if not row:
+            return None
+
+        value, expires_at = json.loads(row[0]), row[1]
+        self.remember(key, value, expires_at)
+        return value
+
+    def remember(self, key: str, value, expires_at: float):
+        self.memory[key] = (expires_at, value)
+        self.memory.move_to_end(key)
+
+        if len(self.memory) > self.memory_size:
+            self.memory.popitem(last=False)
+
+    def set(self, endpoint: str, key: str, value):
+        expires_at = time.time() + self.get_ttl(endpoint)
+
+        self.remember(key, value, expires_at)
+
+        if self.connection is None:
+            return
+
+        try:
+            self.connection.execute(
+                'INSERT OR REPLACE INTO responses (key, endpoint, value, expires_at) VALUES (?, ?, ?, ?)',
+                (key, endpoint, json.dumps(value), expires_at)
+            )
+            self.connection.commit()
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            self.logger.error(f'Error writing crew response cache: {e}')
+
+    async def get_or_run(self, endpoint: str, inputs: dict, run):
+        '''
+        Returns the cached response for `inputs`, otherwise awaits `run()` and caches a non-empty result.
+        A request identical to one that is still running waits for that run instead of starting its own.
+        '''
+        if not self.enabled or self.get_ttl(endpoint) <= 0:
+            return await run()
+
+        key = self.build_key(endpoint=endpoint, inputs=inputs)
+
+        value = self.get(key)
+        if value is not None:
+            self.hits[endpoint] += 1
+            return value
+
+        if key in self.in_flight:
+            self.deduplicated[endpoint] += 1
+            # Shielded so a cancelled waiter doesn't cancel the run the others are waiting on
+            return await asyncio.shield(self.in_flight[key])
+
+        self.misses[endpoint] += 1
+
+        async def run_and_cache():
+            try:
+                value = await run()
+                if value:
+                    self.set(endpoint=endpoint, key=key, value=value)
+                return value
+            finally:
+                self.in_flight.pop(key, None)
+
+        self.in_flight[key] = asyncio.ensure_future(run_and_cache())
+        return await asyncio.shield(self.in_flight[key])
+
+    def get_metrics(self):
+        endpoints = set(self.hits) | set(self.misses) | set(self.endpoint_ttls)
+
+        return {
+            endpoint: {
+                'ttl': self.get_ttl(endpoint),
+                'hits': self.hits[endpoint],
+                'misses': self.misses[endpoint],
+                'deduplicated': self.deduplicated[endpoint],
+                'hit_rate': round(
+                    (self.hits[endpoint] + self.deduplicated[endpoint]) /
+                    max(1, self.hits[endpoint] + self.deduplicated[endpoint] + self.misses[endpoint]), 4
+                ),
+            }
+            for endpoint in sorted(endpoints)
+        }
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
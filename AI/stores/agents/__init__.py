@@ -1,3 +1,5 @@
 from .AgentBuilder import AgentBuilder
 from .CrewAIBuilder import CrewAIBuilder
 from .TaskBuilder import TaskBuilder
+from .CrewResponseCache import CrewResponseCache
+from .CrewPool import CrewPool
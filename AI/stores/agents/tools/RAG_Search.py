@@ -1,69 +1,59 @@
+import asyncio
+
 from controllers import NLPController
 from crewai.tools.base_tool import Tool
 
 from models.QuizModels import CourseSearchInput
 
 from typing import List, Dict, Any
+from logging import getLogger
+
+
+logger = getLogger(__name__)
 
 
-def retrieve_courses_tool(nlp_controller: NLPController) -> Tool:
+def retrieve_courses_tool(nlp_controller: NLPController,
+                          loop: asyncio.AbstractEventLoop = None) -> Tool:
     """
     Factory function that creates a well-documented Course Recommender tool.
 
     This function takes an initialized instance of the NLPController and returns a 
     crewAI Tool that is fully configured to use the controller's search method.
 
+    The crew runs on a worker thread while the search is a coroutine, so the search is
+    scheduled on `loop`, by default the event loop the factory is called from.
+
     Args:
         nlp_controller: An initialized instance of the NLPController class that
-                        has the `search_vector_db_collection` method.
+                        has the `recommend_courses` method.
+        loop: The event loop the search is scheduled on, required when the factory
+              is called outside of it.
 
     Returns:
         A crewAI Tool object ready to be passed to an agent.
     """
 
+    loop = loop or asyncio.get_running_loop()
+
     def run_and_process_search(topics: List[str]) -> List[Dict[str, Any]]:
 
-        all_results = []
-        for t in topics:
-            raw_documents = nlp_controller.search_vector_db_collection(
-                text=t,
-                chat_id="courses",
+        # One embedding call and one vector db request for all the topics
+        recommended_courses = asyncio.run_coroutine_threadsafe(
+            nlp_controller.recommend_courses(
+                topics=topics,
                 limit=3
-            )
-            if raw_documents is None:
-                print(f"WARNING: No results found for topic: {t}")
-                continue
+            ),
+            loop
+        ).result()
 
-            all_results.extend(raw_documents)
+        if not recommended_courses:
+            logger.warning(f"No results found for topics: {topics}")
 
-        highest_scores = {}
-        for doc in all_results:
-            try:
-                course_id = int(doc.metadata)
-                score = doc.score
-
-                if course_id not in highest_scores or score > highest_scores[course_id]:
-                    highest_scores[course_id] = score
-
-            except (ValueError, TypeError):
-                # Skip documents with malformed metadata
-                print(
-                    f"WARNING: Skipping document with invalid metadata: {doc.metadata}")
-                continue
-
-        processed_results = [
+        return [
             {"course_id": course_id, "relevance_score": score}
-            for course_id, score in highest_scores.items()
+            for course_id, score in recommended_courses
         ]
 
-        sorted_results = sorted(
-            processed_results,
-            key=lambda item: item['relevance_score'],
-            reverse=True
-        )
-
-        return sorted_results
-
     return Tool(
         name="Course Recommender",
         description=(
@@ -0,0 +1,167 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from logging import getLogger
+
+import asyncpg
+
+
+class PoolTimeoutError(Exception):
+    pass
+
+
+class PoolConnectionError(Exception):
+    pass
+
+
+class PostgresPool:
+    '''
+    App-scoped asyncpg connection pool for one database.
+    Checkouts wait for at most `timeout` seconds when every connection is in use, and a connection
+    that has been idle for longer than `health_check_interval` seconds is pinged before being handed out.
+    The `queries` templates are prepared on the server as named statements as soon as a connection is
+    opened (nothing is executed), and fetch_prepared runs them by name with a single bind and execute.
+    '''
+
+    def __init__(self, db_name: str, db_user: str, db_password: str,
+                 db_host: str, db_port: int,
+                 min_size: int = 1, max_size: int = 10,
+                 timeout: float = 10, health_check_interval: float = 30,
+                 queries: dict = None):
+
+        self.db_name = db_name
+        self.db_user = db_user
+        self.db_password = db_password
+        self.db_host = db_host
+        self.db_port = db_port
+
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.health_check_interval = health_check_interval
+
+        self.queries = queries or {}
+
+        self.pool = None
+        self.pool_lock = asyncio.Lock()
+        # Backend pid -> last release time and {query name: PreparedStatement}, dropped when the connection closes
+        self.last_used = {}
+        self.statements = {}
+
+        self.logger = getLogger(__name__)
+
+    async def open(self):
+        async with self.pool_lock:
+            if self.pool is None:
+                self.pool = await asyncpg.create_pool(
+                    database=self.db_name,
+                    user=self.db_user,
+                    password=self.db_password,
+                    host=self.db_host,
+                    port=self.db_port,
+                    min_size=self.min_size,
+                    max_size=self.max_size,
+                    init=self.prepare_statements,
+                )
+        return self.pool
+
+    async def prepare_statements(self, connection):
+        # The pool resets connections on release without deallocating, so the statements outlive the checkout
+        pid = connection.get_server_pid()
+        statements = {}
+
+        for name, query in self.queries.items():
+            try:
+                statements[name] = await connection.prepare(query, name=f'protu_{name}')
+            except asyncpg.PostgresError as e:
+                # fetch_prepared falls back to a plain fetch for this query
+                self.logger.error(
+                    f'Error preparing query {name} for database {self.db_name}: {e}')
+
+        self.statements[pid] = statements
+        # Covers the pool recycling idle connections as well as terminate() on broken ones
+        connection.add_termination_listener(
+            lambda _: self.forget_connection(pid))
+
+    def forget_connection(self, pid: int):
+        self.last_used.pop(pid, None)
+        self.statements.pop(pid, None)
+
+    async def close(self):
+        async with self.pool_lock:
+            if self.pool is not None:
+                await self.pool.close()
+                self.pool = None
+
+    async def is_healthy(self, connection):
+        if connection.is_closed():
+            return False
+
+        idle_for = time.monotonic() - \
+            self.last_used.get(connection.get_server_pid(), 0)
+        if not self.health_check_interval or idle_for < self.health_check_interval:
+            return True
+
+        try:
+            await connection.execute('SELECT 1', timeout=self.timeout)
+            return True
+        except (asyncpg.PostgresError, asyncpg.InterfaceError, OSError, asyncio.TimeoutError):
+            return False
+
+    async def checkout(self, pool):
+        try:
+            return await pool.acquire(timeout=self.timeout)
+        except asyncio.TimeoutError:
+            raise PoolTimeoutError(
+                f'Timed out after {self.timeout}s waiting for a connection to database: {self.db_name}')
+
+    async def acquire(self):
+        pool = self.pool or await self.open()
+
+        # After a database restart every idle connection can be broken, a fresh one failing too means it is down
+        for _ in range(self.max_size + 1):
+            connection = await self.checkout(pool)
+
+            if await self.is_healthy(connection):
+                return connection
+
+            self.logger.warning(
+                f'Dropping broken connection to database: {self.db_name}')
+            # Releasing a terminated connection makes the pool open a fresh one on the next acquire
+            self.forget_connection(connection.get_server_pid())
+            connection.terminate()
+            await pool.release(connection)
+
+        raise PoolConnectionError(
+            f'No healthy connection to database: {self.db_name}')
+
+    async def release(self, connection):
+        if not connection.is_closed():
+            self.last_used[connection.get_server_pid()] = time.monotonic()
+        await self.pool.release(connection)
+
+    @asynccontextmanager
+    async def connection(self):
+        connection = await self.acquire()
+        try:
+            yield connection
+        finally:
+            await self.release(connection)
+
+    async def fetch(self, query: str, *params):
+        async with self.connection() as connection:
+            return await connection.fetch(query, *params, timeout=self.timeout)
+
+    async def fetch_prepared(self, name: str, *params):
+        if name not in self.queries:
+            raise KeyError(
+                f'Query {name} is not registered for database: {self.db_name}')
+
+        async with self.connection() as connection:
+            statement = self.statements.get(
+                connection.get_server_pid(), {}).get(name)
+
+            if statement is None:
+                return await connection.fetch(self.queries[name], *params, timeout=self.timeout)
+
+            return await statement.fetch(*params, timeout=self.timeout)
@@ -0,0 +1 @@
+from .PostgresPool import PostgresPool, PoolTimeoutError, PoolConnectionError
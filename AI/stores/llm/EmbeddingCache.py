@@ -0,0 +1,171 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from logging import getLogger
+
+from helpers import get_eviction_count
+
+
+class EmbeddingCache:
+    '''
+    Content-addressed embedding cache.
+    Entries are keyed by (embedding model id, document type, sha256 of the processed text), kept in an
+    in-memory LRU and backed by a SQLite file that evicts the least recently used rows once it
+    grows past `max_entries`. Reads only record the access time in memory, it is written with the next
+    batch of embeddings so a cache hit never costs a SQLite commit.
+    '''
+
+    def __init__(self, db_path: str, memory_size: int = 10000,
+                 max_entries: int = 500000):
+
+        self.db_path = os.path.join(db_path, 'embeddings.sqlite3')
+        self.memory_size = memory_size
+        self.max_entries = max_entries
+
+        self.memory = OrderedDict()
+        self.pending_access = {}
+        self.lock = threading.Lock()
+
+        self.connection = sqlite3.connect(
+            self.db_path, check_same_thread=False)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute(
+            'CREATE TABLE IF NOT EXISTS embeddings ('
+            'key TEXT PRIMARY KEY, vector BLOB NOT NULL, last_access REAL NOT NULL)'
+        )
+        self.connection.execute(
+            'CREATE INDEX IF NOT EXISTS embeddings_last_access ON embeddings (last_access)'
+        )
+        self.connection.commit()
+
+        self.entries = self.connection.execute(
+            'SELECT COUNT(*) FROM embeddings').fetchone()[0]
+
+        self.logger = getLogger(__name__)
+
+    def build_key(self, model_id: str, document_type: str, text: str):
+        text_hash = hashlib.sha256(text.encode('utf-8')).hexdigest()
+        return f'{model_id}:{document_type}:{text_hash}'
+
+    def remember(self, key: str, vector: list):
+        self.memory[key] = vector
+        self.memory.move_to_end(key)
+
+        if len(self.memory) > self.memory_size:
+            self.memory.popitem(last=False)
+
+    def get(self, model_id: str, document_type: str, text: str):
+        return self.get_many(model_id=model_id, document_type=document_type, texts=[text])[0]
+
+    def get_many(self, model_id: str, document_type: str, texts: list):
+
+        keys = [self.build_key(model_id, document_type, text) for text in texts]
+        vectors = [None] * len(keys)
+        missing = {}
+        now = time.time()
+
+        with self.lock:
+            for idx, key in enumerate(keys):
+                if key in self.memory:
+                    self.memory.move_to_end(key)
+                    self.pending_access[key] = now
+                    vectors[idx] = self.memory[key]
+                else:
+                    missing.setdefault(key, []).append(idx)
+
+            if not missing:
+                return vectors
+
+            try:
+                rows = self.connection.execute(
+                    f'SELECT key, vector FROM embeddings WHERE key IN ({",".join("?" * len(missing))})',
+                    list(missing)
+                ).fetchall()
+            except sqlite3.Error as e:
+                self.logger.error(f'Error reading embedding cache: {e}')
+                return vectors
+
+            for key, blob in rows:
+                vector = array('f', blob).tolist()
+                self.remember(key, vector)
+                self.pending_access[key] = now
+                for idx in missing[key]:
+                    vectors[idx] = vector
+
+        return vectors
+
+    def set(self, model_id: str, document_type: str, text: str, vector: list):
+        self.set_many(model_id=model_id, document_type=document_type,
+                      texts=[text], vectors=[vector])
+
+    def set_many(self, model_id: str, document_type: str, texts: list, vectors: list):
+
+        rows = []
+        now = time.time()
+
+        with self.lock:
+            for text, vector in zip(texts, vectors):
+                if not vector:
+                    continue
+
+                key = self.build_key(model_id, document_type, text)
+                self.remember(key, list(vector))
+                rows.append((key, array('f', vector).tobytes(), now))
+
+            if not rows:
+                return
+
+            try:
+                before = self.connection.total_changes
+                self.connection.executemany(
+                    'INSERT OR IGNORE INTO embeddings (key, vector, last_access) VALUES (?, ?, ?)',
+                    rows
+                )
+                self.entries += self.connection.total_changes - before
+                self.flush_access()
+                self.connection.commit()
+
+                if self.entries > self.max_entries:
+                    self.evict()
+            except sqlite3.Error as e:
+                self.logger.error(f'Error writing embedding cache: {e}')
+
+    def flush_access(self):
+        '''
+        Writes the buffered access times, the caller holds the lock and commits
+        '''
+        if not self.pending_access:
+            return
+
+        self.connection.executemany(
+            'UPDATE embeddings SET last_access = ? WHERE key = ?',
+            [(accessed_at, key) for key, accessed_at in self.pending_access.items()]
+        )
+        self.pending_access = {}
+
+    def evict(self):
+        overflow = get_eviction_count(
+            entries=self.entries, max_entries=self.max_entries)
+
+        self.connection.execute(
+            'DELETE FROM embeddings WHERE key IN '
+            '(SELECT key FROM embeddings ORDER BY last_access ASC LIMIT ?)',
+            (overflow,)
+        )
+        self.connection.commit()
+
+        self.entries = self.connection.execute(
+            'SELECT COUNT(*) FROM embeddings').fetchone()[0]
+
+    def close(self):
+        with self.lock:
+            try:
+                self.flush_access()
+                self.connection.commit()
+            except sqlite3.Error as e:
+                self.logger.error(f'Error writing embedding cache: {e}')
+            self.connection.close()
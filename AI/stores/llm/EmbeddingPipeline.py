@@ -0,0 +1,115 @@
+import asyncio
+from logging import getLogger
+from typing import List, Callable
+
+from .LLMInterface import LLMInterface
+from .RateLimiter import TokenBucketRateLimiter, is_rate_limit_error, get_retry_after
+from .utils import pack_embedding_batches
+
+
+class EmbeddingPipeline:
+    '''
+    Embeds a list of texts by running up to `max_concurrency` batch requests at the same time.
+    Texts already in the embedding cache are served from it, the others are batched and every request
+    goes through the provider rate limiter, and 429 answers are retried with backoff.
+    The returned vectors keep the order of the input texts.
+    '''
+
+    def __init__(self, embedding_model: LLMInterface,
+                 rate_limiter: TokenBucketRateLimiter,
+                 max_concurrency: int = 4,
+                 max_retries: int = 5):
+
+        self.embedding_model = embedding_model
+        self.rate_limiter = rate_limiter
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+
+        self.logger = getLogger(__name__)
+
+    async def embed_batch_with_retry(self, texts: List[str], document_type: str,
+                                     semaphore: asyncio.Semaphore,
+                                     progress_callback: Callable[[int], None] = None):
+
+        async with semaphore:
+            for attempt in range(self.max_retries + 1):
+
+                await self.rate_limiter.acquire()
+
+                try:
+                    vectors = await self.embedding_model.embed_batch(
+                        texts=texts,
+                        document_type=document_type
+                    )
+                except Exception as e:
+                    if not is_rate_limit_error(e) or attempt == self.max_retries:
+                        self.logger.error(f"Error in embedding batch: {e}")
+                        return None
+
+                    retry_after = get_retry_after(e)
+                    self.rate_limiter.penalize(retry_after=retry_after)
+
+                    await asyncio.sleep(
+                        self.rate_limiter.get_backoff_delay(
+                            attempt=attempt, retry_after=retry_after)
+                    )
+                    continue
+
+                self.rate_limiter.reward()
+
+                if vectors and progress_callback:
+                    progress_callback(len(texts))
+
+                return vectors
+
+        return None
+
+    async def embed(self, texts: List[str], document_type: str = None,
+                    progress_callback: Callable[[int], None] = None):
+
+        if not texts:
+            return []
+
+        texts = [self.embedding_model.process_text(text) for text in texts]
+
+        # Cache hits never reach the provider, so they don't take rate limiter tokens either
+        vectors = list(await self.embedding_model.get_cached_embeddings(
+            texts=texts, document_type=document_type))
+
+        missing = [idx for idx, vector in enumerate(vectors) if vector is None]
+
+        if progress_callback and len(missing) < len(texts):
+            progress_callback(len(texts) - len(missing))
+
+        if not missing:
+            return vectors
+
+        batches = [
+            [missing[idx] for idx in batch]
+            for batch in pack_embedding_batches(
+                texts=[texts[idx] for idx in missing],
+                max_batch_size=self.embedding_model.embedding_batch_size,
+                max_batch_tokens=self.embedding_model.embedding_batch_max_tokens
+            )
+        ]
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        batch_vectors = await asyncio.gather(*[
+            self.embed_batch_with_retry(
+                texts=[texts[idx] for idx in batch],
+                document_type=document_type,
+                semaphore=semaphore,
+                progress_callback=progress_callback
+            )
+            for batch in batches
+        ])
+
+        for batch, result in zip(batches, batch_vectors):
+            if not result:
+                return None
+
+            for idx, vector in zip(batch, result):
+                vectors[idx] = vector
+
+        return vectors
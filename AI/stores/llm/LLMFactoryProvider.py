@@ -1,12 +1,41 @@
+import httpx
+from groq import AsyncGroq
+
 from .LLMEnums import LLMEnums
 
 from .providers import  OpenAIProvider, GoogleProvider
+from .EmbeddingPipeline import EmbeddingPipeline
+from .RateLimiter import TokenBucketRateLimiter
+from .EmbeddingCache import EmbeddingCache
 
 
 class LLMFactoryProvider:
 
-    def __init__(self, config: dict):
+    def __init__(self, config: dict, embedding_cache: EmbeddingCache = None,
+                 http_client: httpx.AsyncClient = None):
         self.config = config
+        self.embedding_cache = embedding_cache
+        self.http_client = http_client
+
+    def create_http_client(self):
+        '''
+        One keep-alive connection pool shared by every LLM client the factory creates afterwards,
+        it has to be closed on shutdown
+        '''
+        self.http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=self.config.HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=self.config.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=self.config.HTTP_KEEPALIVE_EXPIRY,
+            ),
+            timeout=httpx.Timeout(
+                self.config.HTTP_TIMEOUT,
+                connect=self.config.HTTP_CONNECT_TIMEOUT
+            ),
+            follow_redirects=True,
+        )
+
+        return self.http_client
 
     def create_provider(self, provider: str):
 
@@ -17,6 +46,10 @@ class LLMFactoryProvider:
                 default_max_input_characters=self.config.DEFAULT_INPUT_MAX_CHARACTERS,
                 default_max_output_tokens=self.config.DEFAULT_MAX_NEW_TOKENS,
                 default_temperature=self.config.DEFAULT_TEMPERATURE,
+                embedding_batch_size=self.config.EMBEDDING_BATCH_SIZE,
+                embedding_batch_max_tokens=self.config.EMBEDDING_BATCH_MAX_TOKENS,
+                embedding_cache=self.embedding_cache,
+                http_client=self.http_client,
             )
 
         elif provider == LLMEnums.GOOGLE.value:
@@ -25,5 +58,33 @@ class LLMFactoryProvider:
                 default_max_input_characters=self.config.DEFAULT_INPUT_MAX_CHARACTERS,
                 default_max_output_tokens=self.config.DEFAULT_MAX_NEW_TOKENS,
                 default_temperature=self.config.DEFAULT_TEMPERATURE,
+                embedding_batch_size=self.config.EMBEDDING_BATCH_SIZE,
+                embedding_batch_max_tokens=self.config.EMBEDDING_BATCH_MAX_TOKENS,
+                embedding_cache=self.embedding_cache,
+                http_client=self.http_client,
             )
         return None
+
+    def create_summary_client(self):
+        return AsyncGroq(
+            api_key=self.config.GROQ_API_KEY,
+            http_client=self.http_client
+        )
+
+    def create_embedding_pipeline(self, provider: str, embedding_model):
+
+        if provider == LLMEnums.OPENAI.value:
+            requests_per_minute = self.config.OPENAI_EMBEDDING_REQUESTS_PER_MINUTE
+        elif provider == LLMEnums.GOOGLE.value:
+            requests_per_minute = self.config.GOOGLE_EMBEDDING_REQUESTS_PER_MINUTE
+        else:
+            return None
+
+        return EmbeddingPipeline(
+            embedding_model=embedding_model,
+            rate_limiter=TokenBucketRateLimiter(
+                requests_per_minute=requests_per_minute
+            ),
+            max_concurrency=self.config.EMBEDDING_MAX_CONCURRENCY,
+            max_retries=self.config.EMBEDDING_MAX_RETRIES,
+        )
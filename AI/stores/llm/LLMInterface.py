@@ -12,16 +12,35 @@ class LLMInterface(ABC):
         pass
 
     @abstractmethod
-    def generate_text(self, prompt: str,
-                      chat_history: list = [],
-                      max_new_tokens: int = None,
-                      temperature: float = None):
+    async def generate_text(self, prompt: str,
+                            chat_history: list = [],
+                            max_new_tokens: int = None,
+                            temperature: float = None):
         pass
 
     @abstractmethod
-    def get_embedding(self, text: str, document_type: str = None):
+    async def generate_text_stream(self, prompt: str,
+                                   chat_history: list = [],
+                                   max_new_tokens: int = None,
+                                   temperature: float = None):
+        pass
+
+    @abstractmethod
+    async def get_embedding(self, text: str, document_type: str = None):
+        pass
+
+    @abstractmethod
+    async def embed_batch(self, texts: list, document_type: str = None):
+        pass
+
+    @abstractmethod
+    async def get_cached_embeddings(self, texts: list, document_type: str = None):
         pass
 
     @abstractmethod
     def construct_prompt(self, prompt: str, role: str):
         pass
+
+    @abstractmethod
+    def process_text(self, text: str):
+        pass
@@ -0,0 +1,107 @@
+import asyncio
+import random
+import time
+from logging import getLogger
+
+
+def is_rate_limit_error(error: Exception):
+    '''
+    Both SDKs raise their own exception types, so we look at the HTTP status they carry:
+    OpenAI errors expose `status_code` and google-genai errors expose `code`.
+    '''
+    status = getattr(error, 'status_code', None) or getattr(error, 'code', None)
+    return status == 429
+
+
+def get_retry_after(error: Exception):
+    response = getattr(error, 'response', None)
+    headers = getattr(response, 'headers', None)
+
+    if not headers:
+        return None
+
+    try:
+        return float(headers.get('retry-after'))
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucketRateLimiter:
+    '''
+    Token bucket limiter for provider requests.
+    The refill rate starts at the configured requests per minute, is halved every time the provider
+    answers with 429 and then recovers additively with every successful request (AIMD).
+    '''
+
+    def __init__(self, requests_per_minute: int, burst: int = None,
+                 min_requests_per_minute: int = 1):
+
+        self.max_rate = requests_per_minute / 60.0
+        self.min_rate = min_requests_per_minute / 60.0
+        self.rate = self.max_rate
+
+        self.capacity = burst if burst else max(1, requests_per_minute // 10)
+        self.tokens = float(self.capacity)
+
+        self.updated_at = time.monotonic()
+        self.blocked_until = 0.0
+
+        self.lock = asyncio.Lock()
+
+        self.logger = getLogger(__name__)
+
+    def refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens +
+                          (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def get_wait_time(self):
+        '''
+        Takes a token and returns 0 when one is available, otherwise returns how long to wait for the next one
+        '''
+        now = time.monotonic()
+
+        if now < self.blocked_until:
+            return self.blocked_until - now
+
+        self.refill()
+
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0
+
+        return (1 - self.tokens) / self.rate
+
+    async def acquire(self):
+        # The lock is released while sleeping so penalize() and the other callers are never queued behind a wait
+        while True:
+            async with self.lock:
+                wait_time = self.get_wait_time()
+
+            if wait_time <= 0:
+                return
+
+            await asyncio.sleep(wait_time)
+
+    def penalize(self, retry_after: float = None):
+        self.rate = max(self.min_rate, self.rate / 2)
+        self.tokens = 0.0
+
+        if retry_after:
+            self.blocked_until = max(
+                self.blocked_until, time.monotonic() + retry_after)
+
+        self.logger.warning(
+            f"Rate limited by provider, lowering rate to {self.rate * 60:.0f} requests/minute")
+
+    def reward(self):
+        if self.rate < self.max_rate:
+            self.rate = min(self.max_rate, self.rate + self.max_rate / 20)
+
+    def get_backoff_delay(self, attempt: int, retry_after: float = None,
+                          base_delay: float = 1.0, max_delay: float = 60.0):
+        if retry_after:
+            return retry_after
+        # Full jitter so concurrent workers don't retry in lockstep
+        return random.uniform(0, min(max_delay, base_delay * 2 ** attempt))
@@ -1 +1,3 @@
 from .LLMFactoryProvider import LLMFactoryProvider
+from .EmbeddingPipeline import EmbeddingPipeline
+from .EmbeddingCache import EmbeddingCache
@@ -1,7 +1,12 @@
+import asyncio
+import httpx
 from google import genai
+from google.genai import types
 
 from ..LLMInterface import LLMInterface
 from ..LLMEnums import GoogleEnums, DocumentTypeEnums
+from ..utils import pack_embedding_batches
+from ..EmbeddingCache import EmbeddingCache
 from logging import getLogger
 
 
@@ -10,7 +15,11 @@ class GoogleProvider(LLMInterface):
     def __init__(self, api_key: str,
                  default_max_input_characters: int = 1000,
                  default_max_output_tokens: int = 1000,
-                 default_temperature: float = 0.1):
+                 default_temperature: float = 0.1,
+                 embedding_batch_size: int = 100,
+                 embedding_batch_max_tokens: int = None,
+                 embedding_cache: EmbeddingCache = None,
+                 http_client: httpx.AsyncClient = None):
 
         self.api_key = api_key
 
@@ -18,13 +27,20 @@ class GoogleProvider(LLMInterface):
         self.default_max_output_tokens = default_max_output_tokens
         self.default_temperature = default_temperature
 
+        self.embedding_batch_size = embedding_batch_size
+        self.embedding_batch_max_tokens = embedding_batch_max_tokens
+
+        self.embedding_cache = embedding_cache
+
         self.generation_model_id = None
 
         self.embedding_model_id = None
         self.embedding_size = None
 
         self.client = genai.Client(
-            api_key=self.api_key
+            api_key=self.api_key,
+            http_options=types.HttpOptions(
+                httpx_async_client=http_client) if http_client else None
         )
 
         self.enums = GoogleEnums
@@ -38,10 +54,10 @@ class GoogleProvider(LLMInterface):
         self.embedding_model_id = embedding_model_id
         self.embedding_size = embedding_size
 
-    def generate_text(self, prompt: str,
-                      chat_history: list = [],
-                      max_new_tokens: int = None,
-                      temperature: float = None):
+    async def generate_text(self, prompt: str,
+                            chat_history: list = [],
+                            max_new_tokens: int = None,
+                            temperature: float = None):
 
         if not self.client:
             self.logger.error("Gemini client not initialized")
@@ -61,7 +77,7 @@ class GoogleProvider(LLMInterface):
         max_new_tokens = max_new_tokens if max_new_tokens else self.default_max_output_tokens
         temperature = temperature if temperature else self.default_temperature
 
-        response = self.client.models.generate_content(
+        response = await self.client.aio.models.generate_content(
             model=self.generation_model_id,
             contents=chat_history,
             # config={
@@ -76,7 +92,36 @@ class GoogleProvider(LLMInterface):
 
         return response.text
 
-    def get_embedding(self, text: str, document_type: str = None):
+    async def generate_text_stream(self, prompt: str,
+                                   chat_history: list = [],
+                                   max_new_tokens: int = None,
+                                   temperature: float = None):
+
+        if not self.client:
+            self.logger.error("Gemini client not initialized")
+            return
+
+        if not self.generation_model_id:
+            self.logger.error("Model ID not set")
+            return
+
+        chat_history.append(
+            self.construct_prompt(
+                prompt=prompt,
+                role=GoogleEnums.USER.value
+            )
+        )
+
+        stream = await self.client.aio.models.generate_content_stream(
+            model=self.generation_model_id,
+            contents=chat_history,
+        )
+
+        async for chunk in stream:
+            if chunk and chunk.text:
+                yield chunk.text
+
+    async def get_embedding(self, text: str, document_type: str = None):
 
         if not self.client:
             self.logger.error("Google client not initialized")
@@ -88,9 +133,17 @@ class GoogleProvider(LLMInterface):
 
         input_type = GoogleEnums.DOCUMENT.value if document_type == DocumentTypeEnums.DOCUMENT.value else GoogleEnums.QUERY.value
 
-        response = self.client.models.embed_content(
+        text = self.process_text(text)
+
+        cached_vector = (await self.get_cached_embeddings(
+            texts=[text], document_type=document_type))[0]
+
+        if cached_vector:
+            return cached_vector
+
+        response = await self.client.aio.models.embed_content(
             model=self.embedding_model_id,
-            contents=self.process_text(text),
+            contents=text,
             config={
                 'task_type': input_type
             }
@@ -100,8 +153,84 @@ class GoogleProvider(LLMInterface):
             self.logger.error("Error in Google Embedding response")
             return None
 
+        await self.cache_embeddings(
+            texts=[text], vectors=[response.embeddings[0].values], document_type=document_type)
+
         return response.embeddings[0].values
 
+    async def embed_batch(self, texts: list, document_type: str = None):
+
+        if not self.client:
+            self.logger.error("Google client not initialized")
+            return None
+
+        if not self.embedding_model_id:
+            self.logger.error("Embedding model ID not set")
+            return None
+
+        input_type = GoogleEnums.DOCUMENT.value if document_type == DocumentTypeEnums.DOCUMENT.value else GoogleEnums.QUERY.value
+
+        processed_texts = [self.process_text(text) for text in texts]
+
+        vectors = await self.get_cached_embeddings(
+            texts=processed_texts, document_type=document_type)
+
+        missing = [idx for idx, vector in enumerate(vectors) if vector is None]
+
+        for missing_batch in pack_embedding_batches(
+            texts=[processed_texts[idx] for idx in missing],
+            max_batch_size=self.embedding_batch_size,
+            max_batch_tokens=self.embedding_batch_max_tokens
+        ):
+            batch = [missing[idx] for idx in missing_batch]
+
+            response = await self.client.aio.models.embed_content(
+                model=self.embedding_model_id,
+                contents=[processed_texts[idx] for idx in batch],
+                config={
+                    'task_type': input_type
+                }
+            )
+
+            if not response or not response.embeddings or len(response.embeddings) != len(batch):
+                self.logger.error("Error in Google batch Embedding response")
+                return None
+
+            for idx, embedding in zip(batch, response.embeddings):
+                vectors[idx] = embedding.values
+
+        await self.cache_embeddings(
+            texts=[processed_texts[idx] for idx in missing],
+            vectors=[vectors[idx] for idx in missing],
+            document_type=document_type
+        )
+
+        return vectors
+
+    async def get_cached_embeddings(self, texts: list, document_type: str = None):
+        if not self.embedding_cache:
+            return [None] * len(texts)
+
+        # SQLite reads and writes stay off the event loop
+        return await asyncio.to_thread(
+            self.embedding_cache.get_many,
+            model_id=self.embedding_model_id,
+            document_type=document_type,
+            texts=texts
+        )
+
+    async def cache_embeddings(self, texts: list, vectors: list, document_type: str = None):
+        if not self.embedding_cache or not texts:
+            return
+
+        await asyncio.to_thread(
+            self.embedding_cache.set_many,
+            model_id=self.embedding_model_id,
+            document_type=document_type,
+            texts=texts,
+            vectors=vectors
+        )
+
     def construct_prompt(self, prompt, role):
         return '\n'.join(
             [
@@ -1,6 +1,10 @@
-from openai import OpenAI
+import asyncio
+import httpx
+from openai import AsyncOpenAI
 from ..LLMInterface import LLMInterface
 from ..LLMEnums import LLMEnums, OpenAIEnums
+from ..utils import pack_embedding_batches
+from ..EmbeddingCache import EmbeddingCache
 from logging import getLogger
 
 
@@ -9,7 +13,11 @@ class OpenAIProvider(LLMInterface):
     def __init__(self, api_key: str, base_url: str = None,
                  default_max_input_characters: int = 1000,
                  default_max_output_tokens: int = 1000,
-                 default_temperature: float = 0.1):
+                 default_temperature: float = 0.1,
+                 embedding_batch_size: int = 100,
+                 embedding_batch_max_tokens: int = None,
+                 embedding_cache: EmbeddingCache = None,
+                 http_client: httpx.AsyncClient = None):
 
         self.api_key = api_key
         self.base_url = base_url
@@ -18,15 +26,21 @@ class OpenAIProvider(LLMInterface):
         self.default_max_output_tokens = default_max_output_tokens
         self.default_temperature = default_temperature
 
+        self.embedding_batch_size = embedding_batch_size
+        self.embedding_batch_max_tokens = embedding_batch_max_tokens
+
+        self.embedding_cache = embedding_cache
+
         self.generation_model_id = None
 
         self.embedding_model_id = None
         self.embedding_size = None
 
-        self.client = OpenAI(
+        self.client = AsyncOpenAI(
             api_key=self.api_key,
             base_url=self.base_url if self.base_url and len(
-                self.base_url) else None
+                self.base_url) else None,
+            http_client=http_client
         )
 
         self.enums = OpenAIEnums
@@ -40,10 +54,10 @@ class OpenAIProvider(LLMInterface):
         self.embedding_model_id = embedding_model_id
         self.embedding_size = embedding_size
 
-    def generate_text(self, prompt: str,
-                      chat_history: list = [],
-                      max_new_tokens: int = None,
-                      temperature: float = None):
+    async def generate_text(self, prompt: str,
+                            chat_history: list = [],
+                            max_new_tokens: int = None,
+                            temperature: float = None):
 
         if not self.client:
             self.logger.error("OpenAI client not initialized")
@@ -63,7 +77,7 @@ class OpenAIProvider(LLMInterface):
         max_new_tokens = max_new_tokens if max_new_tokens else self.default_max_output_tokens
         temperature = temperature if temperature else self.default_temperature
 
-        response = self.client.chat.completions.create(
+        response = await self.client.chat.completions.create(
             model=self.generation_model_id,
             messages=chat_history,
             # max_tokens=max_new_tokens,
@@ -76,7 +90,40 @@ class OpenAIProvider(LLMInterface):
 
         return response.choices[0].message.content
 
-    def get_embedding(self, text: str, document_type: str = None):
+    async def generate_text_stream(self, prompt: str,
+                                   chat_history: list = [],
+                                   max_new_tokens: int = None,
+                                   temperature: float = None):
+
+        if not self.client:
+            self.logger.error("OpenAI client not initialized")
+            return
+
+        if not self.generation_model_id:
+            self.logger.error("Model ID not set")
+            return
+
+        chat_history.append(
+            self.construct_prompt(
+                prompt=prompt,
+                role=OpenAIEnums.USER.value
+            )
+        )
+
+        temperature = temperature if temperature else self.default_temperature
+
+        stream = await self.client.chat.completions.create(
+            model=self.generation_model_id,
+            messages=chat_history,
+            temperature=temperature,
+            stream=True
+        )
+
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+    async def get_embedding(self, text: str, document_type: str = None):
         if not self.client:
             self.logger.error("OpenAI client not initialized")
             return None
@@ -85,15 +132,95 @@ class OpenAIProvider(LLMInterface):
             self.logger.error("Embedding model ID not set")
             return None
 
-        response = self.client.embeddings.create(
+        text = self.process_text(text)
+
+        cached_vector = (await self.get_cached_embeddings(
+            texts=[text], document_type=document_type))[0]
+
+        if cached_vector:
+            return cached_vector
+
+        response = await self.client.embeddings.create(
             model=self.embedding_model_id,
-            input=self.process_text(text)
+            input=text
         )
         if not response or not response.data or len(response.data) == 0 or not response.data[0].embedding:
             self.logger.error("Error in OpenAI Embedding response")
             return None
+
+        await self.cache_embeddings(
+            texts=[text], vectors=[response.data[0].embedding], document_type=document_type)
+
         return response.data[0].embedding
 
+    async def embed_batch(self, texts: list, document_type: str = None):
+        if not self.client:
+            self.logger.error("OpenAI client not initialized")
+            return None
+
+        if not self.embedding_model_id:
+            self.logger.error("Embedding model ID not set")
+            return None
+
+        processed_texts = [self.process_text(text) for text in texts]
+
+        vectors = await self.get_cached_embeddings(
+            texts=processed_texts, document_type=document_type)
+
+        missing = [idx for idx, vector in enumerate(vectors) if vector is None]
+
+        for missing_batch in pack_embedding_batches(
+            texts=[processed_texts[idx] for idx in missing],
+            max_batch_size=self.embedding_batch_size,
+            max_batch_tokens=self.embedding_batch_max_tokens
+        ):
+            batch = [missing[idx] for idx in missing_batch]
+
+            response = await self.client.embeddings.create(
+                model=self.embedding_model_id,
+                input=[processed_texts[idx] for idx in batch]
+            )
+
+            if not response or not response.data or len(response.data) != len(batch):
+                self.logger.error("Error in OpenAI batch Embedding response")
+                return None
+
+            # The API echoes the position of every input, don't rely on the list order
+            for record in response.data:
+                vectors[batch[record.index]] = record.embedding
+
+        await self.cache_embeddings(
+            texts=[processed_texts[idx] for idx in missing],
+            vectors=[vectors[idx] for idx in missing],
+            document_type=document_type
+        )
+
+        return vectors
+
+    async def get_cached_embeddings(self, texts: list, document_type: str = None):
+        if not self.embedding_cache:
+            return [None] * len(texts)
+
+        # SQLite reads and writes stay off the event loop
+        return await asyncio.to_thread(
+            self.embedding_cache.get_many,
+            model_id=self.embedding_model_id,
+            document_type=document_type,
+            texts=texts
+        )
+
+    async def cache_embeddings(self, texts: list, vectors: list, document_type: str = None):
+        if not self.embedding_cache or not texts:
+            return
+
+        await asyncio.to_thread(
+            self.embedding_cache.set_many,
+            model_id=self.embedding_model_id,
+            document_type=document_type,
+            texts=texts,
+            vectors=vectors
+        )
+
     def construct_prompt(self, prompt: str, role: str):
         return {
             'role': role,
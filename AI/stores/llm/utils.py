@@ -0,0 +1,37 @@
+from typing import List
+
+
+def estimate_tokens(text: str, chars_per_token: int = 4):
+    '''
+    Cheap token estimate used for packing embedding requests.
+    Both OpenAI and Gemini average around 4 characters per token for English text.
+    '''
+    return max(1, len(text) // chars_per_token)
+
+
+def pack_embedding_batches(texts: List[str], max_batch_size: int,
+                           max_batch_tokens: int = None) -> List[List[int]]:
+    '''
+    Groups the indices of `texts` into consecutive batches that respect both the
+    number of inputs per request and the estimated number of tokens per request.
+    The order of the indices is preserved so the results can be stitched back together.
+    '''
+    batches, current_batch, current_tokens = [], [], 0
+
+    for idx, text in enumerate(texts):
+        tokens = estimate_tokens(text)
+
+        batch_full = len(current_batch) >= max_batch_size
+        tokens_full = max_batch_tokens and current_tokens + tokens > max_batch_tokens
+
+        if current_batch and (batch_full or tokens_full):
+            batches.append(current_batch)
+            current_batch, current_tokens = [], 0
+
+        current_batch.append(idx)
+        current_tokens += tokens
+
+    if current_batch:
+        batches.append(current_batch)
+
+    return batches
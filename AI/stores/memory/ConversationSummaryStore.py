@@ -0,0 +1,76 @@
+import os
+import sqlite3
+import threading
+import time
+from logging import getLogger
+
+
+class ConversationSummaryStore:
+    '''
+    Rolling conversation summaries keyed by chat id.
+    Every entry holds the summary and the id of the last message it covers, so a turn only has to
+    fold the messages that came after it. Entries are kept in a SQLite file.
+    '''
+
+    def __init__(self, db_path: str):
+
+        self.db_path = os.path.join(db_path, 'summaries.sqlite3')
+
+        self.lock = threading.Lock()
+
+        self.connection = sqlite3.connect(
+            self.db_path, check_same_thread=False)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        # last_message_id has no declared type so integer and text ids come back as they were stored
+        self.connection.execute(
+            'CREATE TABLE IF NOT EXISTS summaries ('
+            'chat_id TEXT PRIMARY KEY, summary TEXT NOT NULL, last_message_id, updated_at REAL NOT NULL)'
+        )
+        self.connection.commit()
+
+        self.logger = getLogger(__name__)
+
+    def get(self, chat_id: str):
+        '''
+        Returns (summary, last_message_id), or None if the chat has not been summarized yet
+        '''
+        with self.lock:
+            try:
+                row = self.connection.execute(
+                    'SELECT summary, last_message_id FROM summaries WHERE chat_id = ?',
+                    (str(chat_id),)
+                ).fetchone()
+            except sqlite3.Error as e:
+                self.logger.error(f'Error reading conversation summary: {e}')
+                return None
+
+        return tuple(row) if row else None
+
+    def set(self, chat_id: str, summary: str, last_message_id):
+
+        if not isinstance(last_message_id, (int, str)):
+            last_message_id = str(last_message_id)
+
+        with self.lock:
+            try:
+                self.connection.execute(
+                    'INSERT OR REPLACE INTO summaries (chat_id, summary, last_message_id, updated_at) '
+                    'VALUES (?, ?, ?, ?)',
+                    (str(chat_id), summary, last_message_id, time.time())
+                )
+                self.connection.commit()
+            except sqlite3.Error as e:
+                self.logger.error(f'Error writing conversation summary: {e}')
+
+    def delete(self, chat_id: str):
+        with self.lock:
+            try:
+                self.connection.execute(
+                    'DELETE FROM summaries WHERE chat_id = ?', (str(chat_id),))
+                self.connection.commit()
+            except sqlite3.Error as e:
+                self.logger.error(f'Error deleting conversation summary: {e}')
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
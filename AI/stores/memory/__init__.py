@@ -0,0 +1 @@
+from .ConversationSummaryStore import ConversationSummaryStore
@@ -0,0 +1,189 @@
+import re
+import threading
+import time
+import uuid
+from logging import getLogger
+
+from .VectorDBInterface import VectorDBInterface
+from helpers import get_eviction_count
+
+
+class SemanticResponseCache:
+    '''
+    Caches generated answers by the embedding of the question they answer, in a dedicated collection.
+    A lookup hits when a stored question of the same scope is at least `similarity_threshold` similar.
+    Answers that used chat-specific documents are scoped to their chat, the rest are shared by every chat.
+    The scope doesn't cover the conversation, so questions that refer back to it (see is_context_dependent)
+    must not be looked up or stored.
+    Entries expire after `ttl` seconds and the least recently hit ones are evicted past `max_entries`.
+    '''
+
+    GLOBAL_SCOPE = 'global'
+
+    # Words that point back at the conversation, like "explain that more" or "give me an example"
+    CONTEXT_WORDS = {
+        'it', 'its', 'this', 'that', 'these', 'those', 'they', 'them', 'their', 'he', 'she', 'him', 'her',
+        'above', 'previous', 'earlier', 'again', 'more', 'another', 'example', 'same', 'else',
+        'continue', 'elaborate', 'also',
+    }
+    MIN_QUERY_WORDS = 3
+
+    def __init__(self, vectordb_client: VectorDBInterface, collection_name: str,
+                 embedding_dim: int, similarity_threshold: float = 0.95,
+                 ttl: int = 86400, max_entries: int = 10000):
+
+        self.vectordb_client = vectordb_client
+        self.collection_name = collection_name
+        self.embedding_dim = embedding_dim
+        self.similarity_threshold = similarity_threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+
+        # Hits are tracked in memory to avoid a vector db write per hit, eviction falls back to created_at
+        self.last_hits = {}
+
+        # Lookups and stores run on the blocking executor threads
+        self.lock = threading.RLock()
+
+        self.lookups = 0
+        self.hits = 0
+        self.expired = 0
+        self.stored = 0
+        self.evicted = 0
+
+        self.logger = getLogger(__name__)
+
+        _ = self.vectordb_client.create_collection(
+            collection_name=self.collection_name,
+            embedding_dim=self.embedding_dim
+        )
+
+        self.entries = len(self.vectordb_client.get_all_payloads(
+            collection_name=self.collection_name))
+
+    def build_scope(self, chat_id: str, has_chat_documents: bool):
+        return f'chat:{chat_id}' if has_chat_documents else self.GLOBAL_SCOPE
+
+    def is_context_dependent(self, query: str):
+        words = re.findall(r"[a-z]+", (query or '').lower())
+        return len(words) < self.MIN_QUERY_WORDS or any(word in self.CONTEXT_WORDS for word in words)
+
+    def is_expired(self, payload: dict, now: float):
+        return now - payload.get('created_at', 0) > self.ttl
+
+    def lookup(self, vector: list, scope: str):
+
+        if not vector:
+            return None
+
+        with self.lock:
+            self.lookups += 1
+
+        try:
+            results = self.vectordb_client.search_by_vector(
+                vector=vector,
+                collection_name=self.collection_name,
+                top_k=1,
+                filters={'scope': scope}
+            )
+        except Exception as e:
+            self.logger.error(f'Error searching the semantic cache: {e}')
+            return None
+
+        if not results or results[0].score < self.similarity_threshold:
+            return None
+
+        entry = results[0]
+        now = time.time()
+
+        if self.is_expired(entry.payload, now):
+            with self.lock:
+                self.expired += 1
+            self.remove([entry.id])
+            return None
+
+        with self.lock:
+            self.hits += 1
+            self.last_hits[entry.id] = now
+
+        return entry.payload.get('answer')
+
+    def store(self, query: str, vector: list, scope: str, answer: str):
+
+        if not vector or not answer:
+            return False
+
+        entry_id = str(uuid.uuid4())
+
+        stored = self.vectordb_client.insert_batch(
+            collection_name=self.collection_name,
+            vectors=[vector],
+            texts=[query],
+            metadata=[scope],
+            vector_ids=[entry_id],
+            payloads=[{
+                'scope': scope,
+                'answer': answer,
+                'created_at': time.time(),
+            }]
+        )
+
+        if not stored:
+            return False
+
+        with self.lock:
+            self.stored += 1
+            self.entries += 1
+
+            if self.entries > self.max_entries:
+                self.evict()
+
+        return True
+
+    def remove(self, entry_ids: list):
+        if not self.vectordb_client.delete_by_ids(
+                collection_name=self.collection_name, vector_ids=entry_ids):
+            return
+
+        with self.lock:
+            for entry_id in entry_ids:
+                self.last_hits.pop(entry_id, None)
+
+            self.entries = max(0, self.entries - len(entry_ids))
+
+    def evict(self):
+        payloads = self.vectordb_client.get_all_payloads(
+            collection_name=self.collection_name)
+        now = time.time()
+
+        expired = [entry_id for entry_id, payload in payloads.items()
+                   if self.is_expired(payload, now)]
+        live = sorted(
+            [entry_id for entry_id, payload in payloads.items()
+             if not self.is_expired(payload, now)],
+            key=lambda entry_id: self.last_hits.get(
+                entry_id, payloads[entry_id].get('created_at', 0))
+        )
+
+        overflow = get_eviction_count(
+            entries=len(live), max_entries=self.max_entries)
+        evicted = expired + live[:overflow]
+
+        self.entries = len(payloads)
+        self.remove(evicted)
+
+        self.expired += len(expired)
+        self.evicted += overflow
+
+    def get_metrics(self):
+        with self.lock:
+            return {
+                'entries': self.entries,
+                'lookups': self.lookups,
+                'hits': self.hits,
+                'misses': self.lookups - self.hits,
+                'hit_rate': round(self.hits / self.lookups, 4) if self.lookups else 0.0,
+                'expired': self.expired,
+                'stored': self.stored,
+                'evicted': self.evicted,
+            }
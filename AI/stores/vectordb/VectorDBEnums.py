@@ -4,6 +4,8 @@ from enum import Enum
 class VectorDBEnums(Enum):
 
     QDRANT = 'QDRANT'
+    QDRANT_SERVER = 'QDRANT_SERVER'
+    NUMPY = 'NUMPY'
 
 
 class DistanceTypeEnums(Enum):
@@ -12,4 +14,8 @@ class DistanceTypeEnums(Enum):
     DOT = 'dot'
 
 
+class QuantizationTypeEnum(Enum):
 
+    NONE = 'none'
+    SCALAR = 'scalar'
+    BINARY = 'binary'
@@ -1,5 +1,6 @@
 from .VectorDBEnums import VectorDBEnums
-from .providers import QdrantProvider
+from .VectorDBRouter import VectorDBRouter
+from .providers import QdrantProvider, NumpyProvider
 from controllers import BaseController
 
 
@@ -16,6 +17,50 @@ class VectorDBFactoryProvider():
                     self.config.VECTOR_DB_PATH
                 ),
                 distance_method=self.config.VECTOR_DB_DISTANCE_METHOD,
+                storage_profiles=self.config.VECTOR_DB_STORAGE_PROFILES,
+                collection_profiles=self.config.VECTOR_DB_COLLECTION_PROFILES,
+            )
+
+        if provider == VectorDBEnums.QDRANT_SERVER.value:
+            return QdrantProvider(
+                db_path=None,
+                distance_method=self.config.VECTOR_DB_DISTANCE_METHOD,
+                url=self.config.QDRANT_URL,
+                api_key=self.config.QDRANT_API_KEY,
+                prefer_grpc=self.config.QDRANT_PREFER_GRPC,
+                grpc_port=self.config.QDRANT_GRPC_PORT,
+                timeout=self.config.QDRANT_TIMEOUT,
+                storage_profiles=self.config.VECTOR_DB_STORAGE_PROFILES,
+                collection_profiles=self.config.VECTOR_DB_COLLECTION_PROFILES,
+            )
+
+        if provider == VectorDBEnums.NUMPY.value:
+            return NumpyProvider(
+                db_path=BaseController().get_db_path(
+                    self.config.VECTOR_DB_MEMORY_PATH
+                ) if self.config.VECTOR_DB_MEMORY_PERSIST else None,
+                distance_method=self.config.VECTOR_DB_DISTANCE_METHOD,
+                save_interval=self.config.VECTOR_DB_MEMORY_SAVE_INTERVAL,
             )
 
         return None
+
+    def create_routed_provider(self, provider: str):
+        '''
+        Same as create_provider, except that the collections in VECTOR_DB_MEMORY_COLLECTIONS
+        are served by the in-memory NumPy index
+        '''
+        default_provider = self.create_provider(provider=provider)
+
+        if (
+            default_provider is None or
+            provider == VectorDBEnums.NUMPY.value or
+            not self.config.VECTOR_DB_MEMORY_COLLECTIONS
+        ):
+            return default_provider
+
+        return VectorDBRouter(
+            default_provider=default_provider,
+            memory_provider=self.create_provider(provider=VectorDBEnums.NUMPY.value),
+            memory_collections=self.config.VECTOR_DB_MEMORY_COLLECTIONS,
+        )
@@ -43,9 +43,36 @@ class VectorDBInterface(ABC):
 
     @abstractmethod
     def insert_batch(self, collection_name: str, vectors: list,
-                     texts: list, metadata: list = None, vector_ids: list = None, batch_size: int = 80):
+                     texts: list, metadata: list = None, vector_ids: list = None,
+                     payloads: list = None, batch_size: int = 80):
         pass
 
     @abstractmethod
-    def search_by_vector(self, vector: list, collection_name: str, top_k: int) -> List[RetrievedDocument]:
+    def get_all_payloads(self, collection_name: str) -> dict:
+        pass
+
+    @abstractmethod
+    def delete_by_ids(self, collection_name: str, vector_ids: list):
+        pass
+
+    @abstractmethod
+    def delete_by_filter(self, collection_name: str, filters: dict):
+        pass
+
+    @abstractmethod
+    def create_payload_index(self, collection_name: str, field_name: str):
+        pass
+
+    @abstractmethod
+    def scroll_points(self, collection_name: str, batch_size: int = 256):
+        pass
+
+    @abstractmethod
+    def search_by_vector(self, vector: list, collection_name: str, top_k: int,
+                         filters: dict = None) -> List[RetrievedDocument]:
+        pass
+
+    @abstractmethod
+    def search_batch_by_vectors(self, vectors: list, collection_name: str, top_k: int,
+                                filters: dict = None) -> List[List[RetrievedDocument]]:
         pass
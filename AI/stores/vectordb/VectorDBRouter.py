@@ -0,0 +1,91 @@
+from .VectorDBInterface import VectorDBInterface
+
+
+class VectorDBRouter(VectorDBInterface):
+    '''
+    Serves the collections listed in `memory_collections` from `memory_provider`
+    and every other collection from `default_provider`.
+    '''
+
+    def __init__(self, default_provider: VectorDBInterface, memory_provider: VectorDBInterface,
+                 memory_collections: list):
+
+        self.default_provider = default_provider
+        self.memory_provider = memory_provider
+        self.memory_collections = set(memory_collections)
+
+    def get_provider(self, collection_name: str):
+        if collection_name in self.memory_collections:
+            return self.memory_provider
+        return self.default_provider
+
+    def connect(self):
+        self.default_provider.connect()
+        self.memory_provider.connect()
+
+    def disconnect(self):
+        self.default_provider.disconnect()
+        self.memory_provider.disconnect()
+
+    def is_collection_exist(self, collection_name: str):
+        return self.get_provider(collection_name).is_collection_exist(collection_name=collection_name)
+
+    def list_collections(self):
+        return {
+            'default': self.default_provider.list_collections(),
+            'memory': self.memory_provider.list_collections(),
+        }
+
+    def get_collection_info(self, collection_name: str):
+        return self.get_provider(collection_name).get_collection_info(collection_name=collection_name)
+
+    def create_collection(self, collection_name: str,
+                          embedding_dim: int,
+                          do_reset: bool = False):
+        return self.get_provider(collection_name).create_collection(
+            collection_name=collection_name, embedding_dim=embedding_dim, do_reset=do_reset)
+
+    def delete_collection(self, collection_name: str):
+        return self.get_provider(collection_name).delete_collection(collection_name=collection_name)
+
+    def insert_one(self, collection_name: str, vector: list,
+                   text: str, metadata: str = None, vector_id: str = None):
+        return self.get_provider(collection_name).insert_one(
+            collection_name=collection_name, vector=vector, text=text,
+            metadata=metadata, vector_id=vector_id)
+
+    def insert_batch(self, collection_name: str, vectors: list,
+                     texts: list, metadata: list = None, vector_ids: list = None,
+                     payloads: list = None, batch_size: int = 80):
+        return self.get_provider(collection_name).insert_batch(
+            collection_name=collection_name, vectors=vectors, texts=texts, metadata=metadata,
+            vector_ids=vector_ids, payloads=payloads, batch_size=batch_size)
+
+    def get_all_payloads(self, collection_name: str):
+        return self.get_provider(collection_name).get_all_payloads(collection_name=collection_name)
+
+    def delete_by_ids(self, collection_name: str, vector_ids: list):
+        return self.get_provider(collection_name).delete_by_ids(
+            collection_name=collection_name, vector_ids=vector_ids)
+
+    def delete_by_filter(self, collection_name: str, filters: dict):
+        return self.get_provider(collection_name).delete_by_filter(
+            collection_name=collection_name, filters=filters)
+
+    def create_payload_index(self, collection_name: str, field_name: str):
+        return self.get_provider(collection_name).create_payload_index(
+            collection_name=collection_name, field_name=field_name)
+
+    def scroll_points(self, collection_name: str, batch_size: int = 256):
+        return self.get_provider(collection_name).scroll_points(
+            collection_name=collection_name, batch_size=batch_size)
+
+    def search_by_vector(self, vector: list, collection_name: str, top_k: int,
+                         filters: dict = None):
+        return self.get_provider(collection_name).search_by_vector(
+            vector=vector, collection_name=collection_name, top_k=top_k, filters=filters)
+
+    def search_batch_by_vectors(self, vectors: list, collection_name: str, top_k: int,
+                                filters: dict = None):
+        return self.get_provider(collection_name).search_batch_by_vectors(
+            vectors=vectors, collection_name=collection_name, top_k=top_k, filters=filters)
@@ -1 +1,3 @@
 from .VectorDBFactoryProvider import VectorDBFactoryProvider
+from .SemanticResponseCache import SemanticResponseCache
+from .VectorDBRouter import VectorDBRouter
@@ -0,0 +1,470 @@
+from ..VectorDBInterface import VectorDBInterface
+from ..VectorDBEnums import DistanceTypeEnums
+from logging import getLogger
+from types import SimpleNamespace
+import numpy as np
+import threading
+import json
+import time
+import os
+
+
+from models import RetrievedDocument
+
+
+class NumpyProvider(VectorDBInterface):
+    '''
+    Exact in-memory vector index for small, read-mostly collections like the courses.
+    Every collection is a float32 matrix (rows are normalized for the cosine distance),
+    searched with a single matrix-vector product and argpartition.
+    Inserts are appended in place to a buffer that doubles when full, deletes and upserts only mark the
+    old rows as deleted, and the matrix is compacted once a quarter of its rows are deleted.
+    Rows are written before the matrix view that exposes them is swapped in, so searches never see a half-written row.
+    With a db_path, collections are saved as .npy files that are memory-mapped on connect. A collection is saved
+    by the first write `save_interval` seconds after its last save and on flush/disconnect, not on every write.
+    '''
+
+    MIN_CAPACITY = 64
+
+    def __init__(self, db_path: str, distance_method: str, save_interval: float = 30):
+
+        self.db_path = db_path
+        self.save_interval = save_interval
+
+        self.normalize = distance_method == DistanceTypeEnums.COSINE.value
+
+        self.collections = {}
+        self.lock = threading.Lock()
+
+        self.logger = getLogger(__name__)
+
+    def get_file_paths(self, collection_name: str):
+        return (
+            os.path.join(self.db_path, f'{collection_name}.npy'),
+            os.path.join(self.db_path, f'{collection_name}.json'),
+        )
+
+    def build_collection(self, matrix: np.ndarray, ids: list, payloads: list, embedding_dim: int):
+        # `matrix` is the published view of the first len(ids) rows of `buffer`
+        return SimpleNamespace(
+            buffer=matrix,
+            matrix=matrix,
+            deleted=np.zeros(len(ids), dtype=bool),
+            deleted_count=0,
+            ids=ids,
+            payloads=payloads,
+            rows={point_id: row for row, point_id in enumerate(ids)},
+            embedding_dim=embedding_dim,
+            dirty=False,
+            saved_at=time.monotonic(),
+        )
+
+    def connect(self):
+        if not self.db_path:
+            return
+
+        for file_name in sorted(os.listdir(self.db_path)):
+            if not file_name.endswith('.json'):
+                continue
+
+            collection_name = file_name[:-len('.json')]
+            matrix_path, meta_path = self.get_file_paths(collection_name)
+
+            try:
+                with open(meta_path, encoding='utf-8') as f:
+                    meta = json.load(f)
+
+                matrix = np.load(matrix_path, mmap_mode='r')
+            except (OSError, ValueError) as e:
+                self.logger.error(
+                    f'Error loading collection {collection_name}: {e}')
+                continue
+
+            self.collections[collection_name] = self.build_collection(
+                matrix=matrix,
+                ids=meta['ids'],
+                payloads=meta['payloads'],
+                embedding_dim=meta['embedding_dim'],
+            )
+
+    def disconnect(self):
+        self.flush()
+        self.collections = {}
+
+    def flush(self):
+        '''
+        Saves the collections that changed since they were last saved
+        '''
+        with self.lock:
+            for collection_name, collection in self.collections.items():
+                if collection.dirty:
+                    self.save(collection_name)
+
+    def mark_dirty(self, collection_name: str):
+        collection = self.collections[collection_name]
+        collection.dirty = True
+
+        if time.monotonic() - collection.saved_at >= self.save_interval:
+            self.save(collection_name)
+
+    def get_live_rows(self, collection):
+        return np.flatnonzero(~collection.deleted[:len(collection.ids)])
+
+    def save(self, collection_name: str):
+        if not self.db_path:
+            return
+
+        collection = self.collections.get(collection_name)
+        matrix_path, meta_path = self.get_file_paths(collection_name)
+
+        if collection is None:
+            for path in (matrix_path, meta_path):
+                if os.path.exists(path):
+                    os.remove(path)
+            return
+
+        live_rows = self.get_live_rows(collection)
+
+        # Written next to the old files and renamed, so a crash never leaves a truncated collection behind.
+        # The temporary files are per process since every worker keeps its own copy of the collections
+        suffix = f'.{os.getpid()}.tmp'
+
+        with open(f'{matrix_path}{suffix}', 'wb') as f:
+            np.save(f, np.asarray(collection.matrix)[live_rows])
+        with open(f'{meta_path}{suffix}', 'w', encoding='utf-8') as f:
+            json.dump({
+                'ids': [collection.ids[row] for row in live_rows],
+                'payloads': [collection.payloads[row] for row in live_rows],
+                'embedding_dim': collection.embedding_dim,
+            }, f)
+
+        os.replace(f'{matrix_path}{suffix}', matrix_path)
+        os.replace(f'{meta_path}{suffix}', meta_path)
+
+        collection.dirty = False
+        collection.saved_at = time.monotonic()
+
+    def is_collection_exist(self, collection_name: str):
+        return collection_name in self.collections
+
+    def list_collections(self):
+        return sorted(self.collections)
+
+    def get_collection_info(self, collection_name: str):
+        collection = self.collections.get(collection_name)
+
+        if collection is None:
+            return None
+
+        return {
+            'points_count': len(collection.rows),
+            'embedding_dim': collection.embedding_dim,
+            'normalized': self.normalize,
+            'memory_mapped': isinstance(collection.buffer, np.memmap),
+        }
+
+    def delete_collection(self, collection_name: str):
+        if self.is_collection_exist(collection_name=collection_name):
+            with self.lock:
+                del self.collections[collection_name]
+                self.save(collection_name)
+            return True
+
+    def create_collection(self, collection_name: str,
+                          embedding_dim: int,
+                          do_reset: bool = False):
+
+        if do_reset:
+            _ = self.delete_collection(collection_name=collection_name)
+
+        if not self.is_collection_exist(collection_name=collection_name):
+            with self.lock:
+                self.collections[collection_name] = self.build_collection(
+                    matrix=np.empty((0, embedding_dim), dtype=np.float32),
+                    ids=[],
+                    payloads=[],
+                    embedding_dim=embedding_dim,
+                )
+                self.save(collection_name)
+            return True
+
+        return False
+
+    def to_matrix(self, vectors: list):
+        matrix = np.asarray(vectors, dtype=np.float32)
+
+        if matrix.ndim == 1:
+            matrix = matrix.reshape(1, -1)
+
+        if self.normalize:
+            norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+            matrix = matrix / np.where(norms == 0, 1, norms)
+
+        return np.ascontiguousarray(matrix, dtype=np.float32)
+
+    def reserve(self, collection, extra_rows: int):
+        '''
+        Makes room for `extra_rows` more rows, a memory-mapped matrix is copied to memory on its first write
+        '''
+        size = len(collection.ids)
+        capacity = collection.buffer.shape[0]
+
+        if size + extra_rows <= capacity and collection.buffer.flags.writeable and \
+                not isinstance(collection.buffer, np.memmap):
+            return
+
+        capacity = max(self.MIN_CAPACITY, 2 * capacity, size + extra_rows)
+
+        buffer = np.empty((capacity, collection.embedding_dim), dtype=np.float32)
+        buffer[:size] = collection.matrix
+
+        deleted = np.zeros(capacity, dtype=bool)
+        deleted[:size] = collection.deleted[:size]
+
+        collection.buffer = buffer
+        collection.deleted = deleted
+
+    def delete_rows(self, collection_name: str, rows: list):
+        collection = self.collections[collection_name]
+
+        collection.deleted[rows] = True
+        collection.deleted_count += len(rows)
+
+        # Compacting is linear in the collection size, doing it once a quarter of the rows are gone keeps it amortized
+        if collection.deleted_count > max(self.MIN_CAPACITY, len(collection.ids) // 4):
+            live_rows = self.get_live_rows(collection)
+
+            self.collections[collection_name] = self.build_collection(
+                matrix=np.ascontiguousarray(np.asarray(collection.matrix)[live_rows]),
+                ids=[collection.ids[row] for row in live_rows],
+                payloads=[collection.payloads[row] for row in live_rows],
+                embedding_dim=collection.embedding_dim,
+            )
+            self.collections[collection_name].dirty = collection.dirty
+            self.collections[collection_name].saved_at = collection.saved_at
+
+    def insert_one(self, collection_name: str, vector: list,
+                   text: str, metadata: str = None, vector_id: str = None):
+
+        return self.insert_batch(
+            collection_name=collection_name,
+            vectors=[vector],
+            texts=[text],
+            metadata=[metadata],
+            vector_ids=[vector_id] if vector_id is not None else None
+        )
+
+    def insert_batch(self, collection_name: str, vectors: list,
+                     texts: list, metadata: list = None, vector_ids: list = None,
+                     payloads: list = None, batch_size: int = 80):
+
+        if not self.is_collection_exist(collection_name=collection_name):
+            self.logger.error(
+                f'Cannot insert record to non-existing collection: {collection_name}')
+            return None
+
+        if not metadata:
+            metadata = [None] * len(vectors)
+
+        if not vector_ids:
+            vector_ids = list(range(0, len(texts)))
+
+        if not payloads:
+            payloads = [{}] * len(vectors)
+
+        try:
+            new_rows = self.to_matrix(vectors)
+        except ValueError as e:
+            self.logger.error(f'Error inserting batch: {e}')
+            return False
+
+        with self.lock:
+            collection = self.collections[collection_name]
+
+            if new_rows.shape[1] != collection.embedding_dim:
+                self.logger.error(
+                    f'Error inserting batch: expected vectors of size {collection.embedding_dim}, got {new_rows.shape[1]}')
+                return False
+
+            # Existing ids are overwritten like a Qdrant upsert, the last occurrence wins
+            incoming = {point_id: idx for idx, point_id in enumerate(vector_ids)}
+            new_idx = list(incoming.values())
+            replaced_rows = [collection.rows[point_id] for point_id in incoming
+                             if point_id in collection.rows]
+
+            self.reserve(collection, len(new_idx))
+
+            size = len(collection.ids)
+            collection.buffer[size:size + len(new_idx)] = new_rows[new_idx]
+
+            for row, idx in enumerate(new_idx, start=size):
+                collection.ids.append(vector_ids[idx])
+                collection.payloads.append({
+                    **payloads[idx],
+                    "text": texts[idx],
+                    "metadata": metadata[idx]
+                })
+                collection.rows[vector_ids[idx]] = row
+
+            collection.matrix = collection.buffer[:len(collection.ids)]
+
+            if replaced_rows:
+                self.delete_rows(collection_name, replaced_rows)
+
+            self.mark_dirty(collection_name)
+
+        return True
+
+    def get_all_payloads(self, collection_name: str):
+        collection = self.collections.get(collection_name)
+
+        if collection is None:
+            return {}
+
+        return {collection.ids[row]: collection.payloads[row]
+                for row in self.get_live_rows(collection)}
+
+    def delete_by_ids(self, collection_name: str, vector_ids: list):
+
+        if not vector_ids or not self.is_collection_exist(collection_name=collection_name):
+            return False
+
+        with self.lock:
+            collection = self.collections[collection_name]
+
+            rows = [collection.rows.pop(point_id) for point_id in set(vector_ids)
+                    if point_id in collection.rows]
+
+            if rows:
+                self.delete_rows(collection_name, rows)
+                self.mark_dirty(collection_name)
+
+        return True
+
+    def delete_by_filter(self, collection_name: str, filters: dict):
+        collection = self.collections.get(collection_name)
+
+        if not filters or collection is None:
+            return False
+
+        vector_ids = [collection.ids[row]
+                      for row in self.get_candidate_rows(collection, filters)]
+
+        if not vector_ids:
+            return True
+
+        return self.delete_by_ids(collection_name=collection_name, vector_ids=vector_ids)
+
+    def create_payload_index(self, collection_name: str, field_name: str):
+        # Filters are evaluated on the payloads in memory, there is nothing to index
+        return self.is_collection_exist(collection_name=collection_name)
+
+    def scroll_points(self, collection_name: str, batch_size: int = 256):
+        collection = self.collections.get(collection_name)
+
+        if collection is None:
+            return
+
+        live_rows = self.get_live_rows(collection)
+
+        for start in range(0, len(live_rows), batch_size):
+            yield [
+                (collection.ids[row], np.asarray(collection.matrix[row]).tolist(), collection.payloads[row])
+                for row in live_rows[start:start + batch_size]
+            ]
+
+    def get_candidate_rows(self, collection, filters: dict = None, size: int = None):
+        if not filters:
+            return None
+
+        size = len(collection.ids) if size is None else size
+
+        return np.asarray([
+            row for row, payload in enumerate(collection.payloads[:size])
+            if not collection.deleted[row] and all(payload.get(key) == value for key, value in filters.items())
+        ], dtype=np.int64)
+
+    def get_top_k(self, scores: np.ndarray, top_k: int):
+        '''
+        Indices of the top_k highest scores of every row, best first
+        '''
+        k = min(top_k, scores.shape[1])
+        if k <= 0:
+            return np.empty((scores.shape[0], 0), dtype=np.int64)
+
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        order = np.argsort(-np.take_along_axis(scores, top, axis=1), axis=1)
+
+        return np.take_along_axis(top, order, axis=1)
+
+    def search(self, vectors: list, collection_name: str, top_k: int, filters: dict = None):
+        collection = self.collections.get(collection_name)
+
+        if collection is None:
+            return [[] for _ in vectors]
+
+        # One read of the published view, rows appended after it are ignored by this search
+        matrix = collection.matrix
+        size = matrix.shape[0]
+        candidate_rows = self.get_candidate_rows(collection, filters, size=size)
+
+        if candidate_rows is not None:
+            matrix = np.asarray(matrix)[candidate_rows]
+
+        scores = self.to_matrix(vectors) @ np.asarray(matrix).T
+
+        if candidate_rows is None and collection.deleted_count:
+            scores[:, collection.deleted[:size]] = -np.inf
+
+        top = self.get_top_k(scores, top_k)
+
+        results = []
+        for query, rows in enumerate(top):
+            documents = []
+            for row in rows:
+                if scores[query, row] == -np.inf:
+                    break
+                point = int(candidate_rows[row]) if candidate_rows is not None else int(row)
+                payload = collection.payloads[point]
+                documents.append(RetrievedDocument(
+                    **{
+                        'score': float(scores[query, row]),
+                        'text': payload['text'],
+                        'metadata': payload['metadata'],
+                        'id': collection.ids[point],
+                        'payload': payload,
+                    }
+                ))
+            results.append(documents)
+
+        return results
+
+    def search_by_vector(self, vector: list, collection_name: str, top_k: int,
+                         filters: dict = None):
+
+        results = self.search(
+            vectors=[vector],
+            collection_name=collection_name,
+            top_k=top_k,
+            filters=filters
+        )[0]
+
+        if not results or len(results) == 0:
+            return None
+
+        return results
+
+    def search_batch_by_vectors(self, vectors: list, collection_name: str, top_k: int,
+                                filters: dict = None):
+        '''
+        Scores every vector against the collection in one matrix product, returns one list of documents per vector
+        '''
+        if not vectors:
+            return []
+
+        return self.search(
+            vectors=vectors,
+            collection_name=collection_name,
+            top_k=top_k,
+            filters=filters
+        )
@@ -1,21 +1,52 @@
 from ..VectorDBInterface import VectorDBInterface
-from ..VectorDBEnums import DistanceTypeEnums
+from ..VectorDBEnums import DistanceTypeEnums, QuantizationTypeEnum
 from qdrant_client import QdrantClient
-from qdrant_client.models import Distance, VectorParams, Record
+from qdrant_client.models import Distance, VectorParams, Record, PointIdsList, Filter, FieldCondition, MatchValue, SearchRequest
+from qdrant_client.models import HnswConfigDiff, ScalarQuantization, ScalarQuantizationConfig, ScalarType
+from qdrant_client.models import BinaryQuantization, BinaryQuantizationConfig, SearchParams, QuantizationSearchParams
+from qdrant_client.models import FilterSelector, KeywordIndexParams
 from logging import getLogger
+import fnmatch
 
 
 from models import RetrievedDocument
 
 
 class QdrantProvider(VectorDBInterface):
-
-    def __init__(self, db_path: str, distance_method: str):
+    '''
+    Qdrant in embedded local mode when `url` is empty, otherwise a client of a Qdrant server
+    (over gRPC with `prefer_grpc`). The embedded mode holds a file lock and searches without an index,
+    so running more than one worker requires the server.
+    Collections are created with the storage profile their name maps to in `collection_profiles`
+    (fnmatch patterns, first match wins), see get_storage_profile for the profile keys.
+    The embedded mode accepts the profiles but keeps full vectors in memory.
+    '''
+
+    def __init__(self, db_path: str, distance_method: str,
+                 url: str = None, api_key: str = None,
+                 prefer_grpc: bool = False, grpc_port: int = 6334, timeout: int = None,
+                 storage_profiles: dict = None, collection_profiles: dict = None):
 
         self.client = None
 
         self.db_path = db_path
 
+        self.url = url
+        self.api_key = api_key
+        self.prefer_grpc = prefer_grpc
+        self.grpc_port = grpc_port
+        self.timeout = timeout
+
+        self.storage_profiles = storage_profiles or {}
+        self.collection_profiles = collection_profiles or {}
+
+        for profile_name in set(self.collection_profiles.values()):
+            if profile_name not in self.storage_profiles:
+                raise ValueError(f'Unknown storage profile: {profile_name}')
+
+        for profile in self.storage_profiles.values():
+            _ = self.build_quantization_config(profile)
+
         self.distance_method = None
 
         if distance_method == DistanceTypeEnums.COSINE.value:
@@ -25,10 +56,85 @@ class QdrantProvider(VectorDBInterface):
 
         self.logger = getLogger(__name__)
 
+    def get_storage_profile(self, collection_name: str):
+        '''
+        Returns the storage profile of the collection, a dict with the optional keys:
+        - quantization: none | scalar (int8, 4x smaller) | binary (32x smaller)
+        - quantile, quantization_always_ram: the scalar quantile and whether the quantized vectors stay in RAM
+        - rescore, oversampling: re-rank `oversampling * top_k` quantized candidates with the original vectors
+        - on_disk, on_disk_payload: keep the original vectors / the payloads on disk
+        - hnsw_m, hnsw_ef_construct, hnsw_ef: the HNSW graph degree, build and search beam sizes
+        '''
+        for pattern, profile_name in self.collection_profiles.items():
+            if fnmatch.fnmatchcase(collection_name, pattern):
+                return self.storage_profiles[profile_name]
+
+        return {}
+
+    def build_quantization_config(self, profile: dict):
+        quantization = profile.get('quantization') or QuantizationTypeEnum.NONE.value
+        always_ram = profile.get('quantization_always_ram', True)
+
+        if quantization == QuantizationTypeEnum.NONE.value:
+            return None
+
+        if quantization == QuantizationTypeEnum.SCALAR.value:
+            return ScalarQuantization(
+                scalar=ScalarQuantizationConfig(
+                    type=ScalarType.INT8,
+                    quantile=profile.get('quantile'),
+                    always_ram=always_ram
+                )
+            )
+
+        if quantization == QuantizationTypeEnum.BINARY.value:
+            return BinaryQuantization(
+                binary=BinaryQuantizationConfig(always_ram=always_ram)
+            )
+
+        raise ValueError(
+            f'Unknown quantization type: {quantization}, expected one of {[q.value for q in QuantizationTypeEnum]}')
+
+    def build_hnsw_config(self, profile: dict):
+        hnsw_config = {
+            key: profile[name]
+            for key, name in (('m', 'hnsw_m'), ('ef_construct', 'hnsw_ef_construct'))
+            if profile.get(name) is not None
+        }
+
+        return HnswConfigDiff(**hnsw_config) if hnsw_config else None
+
+    def build_search_params(self, collection_name: str):
+        profile = self.get_storage_profile(collection_name)
+        is_quantized = (profile.get('quantization') or QuantizationTypeEnum.NONE.value) != QuantizationTypeEnum.NONE.value
+
+        if not is_quantized and profile.get('hnsw_ef') is None:
+            return None
+
+        return SearchParams(
+            hnsw_ef=profile.get('hnsw_ef'),
+            quantization=QuantizationSearchParams(
+                rescore=profile.get('rescore', True),
+                oversampling=profile.get('oversampling')
+            ) if is_quantized else None
+        )
+
     def connect(self):
+        if self.url:
+            self.client = QdrantClient(
+                url=self.url,
+                api_key=self.api_key or None,
+                prefer_grpc=self.prefer_grpc,
+                grpc_port=self.grpc_port,
+                timeout=self.timeout
+            )
+            return
+
         self.client = QdrantClient(path=self.db_path)
 
     def disconnect(self):
+        if self.client is not None:
+            self.client.close()
         self.client = None
 
     def is_collection_exist(self, collection_name: str):
@@ -52,12 +158,18 @@ class QdrantProvider(VectorDBInterface):
             _ = self.delete_collection(collection_name=collection_name)
 
         if not self.is_collection_exist(collection_name=collection_name):
+            profile = self.get_storage_profile(collection_name)
+
             _ = self.client.create_collection(
                 collection_name=collection_name,
                 vectors_config=VectorParams(
                     size=embedding_dim,
-                    distance=self.distance_method
+                    distance=self.distance_method,
+                    on_disk=profile.get('on_disk')
                 ),
+                on_disk_payload=profile.get('on_disk_payload'),
+                hnsw_config=self.build_hnsw_config(profile),
+                quantization_config=self.build_quantization_config(profile),
             )
             return True
 
@@ -90,7 +202,8 @@ class QdrantProvider(VectorDBInterface):
         return True
 
     def insert_batch(self, collection_name: str, vectors: list,
-                     texts: list, metadata: list = None, vector_ids: list = None, batch_size: int = 80):
+                     texts: list, metadata: list = None, vector_ids: list = None,
+                     payloads: list = None, batch_size: int = 80):
 
         if not self.is_collection_exist(collection_name=collection_name):
             self.logger.error(
@@ -103,12 +216,16 @@ class QdrantProvider(VectorDBInterface):
         if not vector_ids:
             vector_ids = list(range(0, len(texts)))
 
+        if not payloads:
+            payloads = [{}] * len(vectors)
+
         for i in range(0, len(vectors), batch_size):
 
             vector_batch = vectors[i:i+batch_size]
             text_batch = texts[i:i+batch_size]
             metadata_batch = metadata[i:i+batch_size]
             vector_id_batch = vector_ids[i:i+batch_size]
+            payload_batch = payloads[i:i+batch_size]
             try:
                 _ = self.client.upload_records(
                     collection_name=collection_name,
@@ -117,6 +234,7 @@ class QdrantProvider(VectorDBInterface):
                             id=vector_id_batch[idx],
                             vector=vector_batch[idx],
                             payload={
+                                **payload_batch[idx],
                                 "text": text_batch[idx],
                                 "metadata": metadata_batch[idx]
                             }
@@ -128,25 +246,166 @@ class QdrantProvider(VectorDBInterface):
                 self.logger.error(f'Error inserting batch: {e}')
                 return False
 
-            return True
+        return True
+
+    def get_all_payloads(self, collection_name: str, batch_size: int = 256):
+
+        if not self.is_collection_exist(collection_name=collection_name):
+            return {}
+
+        payloads = {}
+        offset = None
+
+        while True:
+            records, offset = self.client.scroll(
+                collection_name=collection_name,
+                limit=batch_size,
+                offset=offset,
+                with_payload=True,
+                with_vectors=False
+            )
 
-    def search_by_vector(self, vector: list, collection_name: str, top_k: int):
+            for record in records:
+                payloads[record.id] = record.payload
+
+            if offset is None:
+                return payloads
+
+    def delete_by_ids(self, collection_name: str, vector_ids: list):
+
+        if not vector_ids or not self.is_collection_exist(collection_name=collection_name):
+            return False
+
+        try:
+            _ = self.client.delete(
+                collection_name=collection_name,
+                points_selector=PointIdsList(points=vector_ids)
+            )
+        except Exception as e:
+            self.logger.error(f'Error deleting records: {e}')
+            return False
+
+        return True
+
+    def delete_by_filter(self, collection_name: str, filters: dict):
+
+        if not filters or not self.is_collection_exist(collection_name=collection_name):
+            return False
+
+        try:
+            _ = self.client.delete(
+                collection_name=collection_name,
+                points_selector=FilterSelector(filter=self.build_filter(filters))
+            )
+        except Exception as e:
+            self.logger.error(f'Error deleting records: {e}')
+            return False
+
+        return True
+
+    def create_payload_index(self, collection_name: str, field_name: str):
+        '''
+        Indexes a keyword payload field that splits the collection by tenant, like the chat id
+        '''
+        try:
+            _ = self.client.create_payload_index(
+                collection_name=collection_name,
+                field_name=field_name,
+                field_schema=KeywordIndexParams(type='keyword', is_tenant=True)
+            )
+        except Exception as e:
+            self.logger.error(f'Error creating payload index on {field_name}: {e}')
+            return False
+
+        return True
+
+    def scroll_points(self, collection_name: str, batch_size: int = 256):
+        '''
+        Yields the (id, vector, payload) points of the collection, `batch_size` at a time
+        '''
+        if not self.is_collection_exist(collection_name=collection_name):
+            return
+
+        offset = None
+
+        while True:
+            records, offset = self.client.scroll(
+                collection_name=collection_name,
+                limit=batch_size,
+                offset=offset,
+                with_payload=True,
+                with_vectors=True
+            )
+
+            if records:
+                yield [(record.id, record.vector, record.payload) for record in records]
+
+            if offset is None:
+                return
+
+    def build_filter(self, filters: dict = None):
+        if not filters:
+            return None
+
+        return Filter(
+            must=[
+                FieldCondition(key=key, match=MatchValue(value=value))
+                for key, value in filters.items()
+            ]
+        )
+
+    def search_by_vector(self, vector: list, collection_name: str, top_k: int,
+                         filters: dict = None):
 
         results = self.client.search(
             collection_name=collection_name,
             query_vector=vector,
+            query_filter=self.build_filter(filters),
+            search_params=self.build_search_params(collection_name),
             limit=top_k
         )
 
         if not results or len(results) == 0:
             return None
 
+        return self.to_retrieved_documents(results)
+
+    def search_batch_by_vectors(self, vectors: list, collection_name: str, top_k: int,
+                                filters: dict = None):
+        '''
+        Searches for every vector in a single request, returns one list of documents per vector
+        '''
+        if not vectors:
+            return []
+
+        query_filter = self.build_filter(filters)
+        search_params = self.build_search_params(collection_name)
+
+        batch_results = self.client.search_batch(
+            collection_name=collection_name,
+            requests=[
+                SearchRequest(
+                    vector=vector,
+                    filter=query_filter,
+                    params=search_params,
+                    limit=top_k,
+                    with_payload=True
+                )
+                for vector in vectors
+            ]
+        )
+
+        return [self.to_retrieved_documents(results) for results in batch_results]
+
+    def to_retrieved_documents(self, results: list):
         return [
             RetrievedDocument(
                 **{
                     'score': result.score,
                     'text': result.payload['text'],
                     'metadata': result.payload['metadata'],
+                    'id': result.id,
+                    'payload': result.payload,
                 }
             )
             for result in results
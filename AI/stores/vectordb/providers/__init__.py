@@ -1 +1,2 @@
 from .QdrantProvider import QdrantProvider
+from .NumpyProvider import NumpyProvider
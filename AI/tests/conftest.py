@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The service imports its packages relative to the AI directory, the way main.py runs
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,106 @@
+import asyncio
+
+from stores.agents.CrewResponseCache import CrewResponseCache
+
+
+def build_counting_run(result, delay: float = 0.05):
+    calls = []
+
+    async def run():
+        calls.append(1)
+        await asyncio.sleep(delay)
+        return result
+
+    return run, calls
+
+
+def test_concurrent_identical_requests_share_one_run():
+    cache = CrewResponseCache(model_id='model', temperature=0.2)
+    run, calls = build_counting_run({'tags': ['python']})
+
+    async def request_twice():
+        return await asyncio.gather(
+            cache.get_or_run('quiz_tags', {'prompt': 'loops'}, run),
+            cache.get_or_run('quiz_tags', {'prompt': 'loops'}, run),
+        )
+
+    results = asyncio.run(request_twice())
+
+    assert results == [{'tags': ['python']}] * 2
+    assert len(calls) == 1
+    assert cache.get_metrics()['quiz_tags']['deduplicated'] == 1
+    assert cache.in_flight == {}
+
+
+def test_the_result_is_cached_for_later_requests():
+    cache = CrewResponseCache(model_id='model', temperature=0.2)
+    run, calls = build_counting_run({'tags': ['python']}, delay=0)
+
+    asyncio.run(cache.get_or_run('quiz_tags', {'prompt': 'loops'}, run))
+    asyncio.run(cache.get_or_run('quiz_tags', {'prompt': 'loops'}, run))
+    asyncio.run(cache.get_or_run('quiz_tags', {'prompt': 'arrays'}, run))
+
+    assert len(calls) == 2
+    assert cache.get_metrics()['quiz_tags']['hits'] == 1
+
+
+def test_a_cancelled_waiter_does_not_cancel_the_shared_run():
+    cache = CrewResponseCache(model_id='model', temperature=0.2)
+    run, calls = build_counting_run('quiz')
+
+    async def cancel_one_waiter():
+        first = asyncio.ensure_future(cache.get_or_run('quiz', {'topic': 'sql'}, run))
+        second = asyncio.ensure_future(cache.get_or_run('quiz', {'topic': 'sql'}, run))
+        await asyncio.sleep(0.01)
+
+        first.cancel()
+        return await second
+
+    assert asyncio.run(cancel_one_waiter()) == 'quiz'
+    assert len(calls) == 1
+
+
+def test_empty_results_are_not_cached():
+    cache = CrewResponseCache(model_id='model', temperature=0.2)
+    run, calls = build_counting_run(None, delay=0)
+
+    asyncio.run(cache.get_or_run('quiz', {'topic': 'sql'}, run))
+    asyncio.run(cache.get_or_run('quiz', {'topic': 'sql'}, run))
+
+    assert len(calls) == 2
+
+
+def test_disabled_or_zero_ttl_always_runs():
+    run, calls = build_counting_run('quiz', delay=0)
+
+    disabled = CrewResponseCache(model_id='model', temperature=0.2, enabled=False)
+    no_ttl = CrewResponseCache(model_id='model', temperature=0.2, endpoint_ttls={'quiz': 0})
+
+    for cache in (disabled, disabled, no_ttl, no_ttl):
+        asyncio.run(cache.get_or_run('quiz', {'topic': 'sql'}, run))
+
+    assert len(calls) == 4
+
+
+def test_the_key_depends_on_the_model_settings():
+    inputs = {'b': 1, 'a': [1, 2]}
+
+    cache = CrewResponseCache(model_id='model', temperature=0.2)
+
+    assert cache.build_key('quiz', inputs) == cache.build_key('quiz', {'a': [1, 2], 'b': 1})
+    assert cache.build_key('quiz', inputs) != cache.build_key('quiz_tags', inputs)
+    assert cache.build_key('quiz', inputs) != \
+        CrewResponseCache(model_id='model', temperature=0.7).build_key('quiz', inputs)
+
+
+def test_responses_persist_in_sqlite(tmp_path):
+    cache = CrewResponseCache(model_id='model', temperature=0.2, db_path=str(tmp_path))
+    run, calls = build_counting_run({'questions': [1, 2]}, delay=0)
+
+    asyncio.run(cache.get_or_run('quiz', {'topic': 'sql'}, run))
+    cache.close()
+
+    reopened = CrewResponseCache(model_id='model', temperature=0.2, db_path=str(tmp_path))
+    assert asyncio.run(reopened.get_or_run('quiz', {'topic': 'sql'}, run)) == {'questions': [1, 2]}
+    assert len(calls) == 1
+    reopened.close()
@@ -0,0 +1,61 @@
+import asyncio
+
+from stores.llm import EmbeddingPipeline
+from stores.llm.RateLimiter import TokenBucketRateLimiter
+
+
+class FakeEmbeddingModel:
+    embedding_batch_size = 2
+    embedding_batch_max_tokens = 1000
+
+    def __init__(self, cached: dict):
+        self.cached = cached
+        self.batches = []
+
+    def process_text(self, text: str):
+        return text.strip()
+
+    async def get_cached_embeddings(self, texts: list, document_type: str = None):
+        return [self.cached.get(text) for text in texts]
+
+    async def embed_batch(self, texts: list, document_type: str = None):
+        self.batches.append(texts)
+        return [[float(len(text))] for text in texts]
+
+
+class CountingRateLimiter(TokenBucketRateLimiter):
+
+    def __init__(self):
+        super().__init__(requests_per_minute=6000)
+        self.acquired = 0
+
+    async def acquire(self):
+        self.acquired += 1
+        await super().acquire()
+
+
+def test_cached_texts_skip_the_provider_and_the_rate_limiter():
+    model = FakeEmbeddingModel(cached={'cached one': [0.0], 'cached two': [0.5]})
+    limiter = CountingRateLimiter()
+    progress = []
+
+    vectors = asyncio.run(EmbeddingPipeline(model, limiter).embed(
+        texts=['cached one', ' a ', 'cached two', 'bb', 'ccc'],
+        progress_callback=progress.append
+    ))
+
+    assert vectors == [[0.0], [1.0], [0.5], [2.0], [3.0]]
+    assert model.batches == [['a', 'bb'], ['ccc']]
+    assert limiter.acquired == 2
+    assert progress[0] == 2 and sum(progress) == 5
+
+
+def test_fully_cached_texts_make_no_request():
+    model = FakeEmbeddingModel(cached={'a': [1.0]})
+    limiter = CountingRateLimiter()
+
+    vectors = asyncio.run(EmbeddingPipeline(model, limiter).embed(texts=['a', 'a']))
+
+    assert vectors == [[1.0], [1.0]]
+    assert model.batches == []
+    assert limiter.acquired == 0
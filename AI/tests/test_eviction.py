@@ -0,0 +1,16 @@
+from helpers import get_eviction_count
+
+
+def test_nothing_is_evicted_below_the_low_watermark():
+    assert get_eviction_count(entries=0, max_entries=100) == 0
+    assert get_eviction_count(entries=90, max_entries=100) == 0
+
+
+def test_evicts_down_to_the_low_watermark():
+    assert get_eviction_count(entries=101, max_entries=100) == 11
+    assert get_eviction_count(entries=150, max_entries=100) == 60
+
+
+def test_custom_low_watermark():
+    assert get_eviction_count(entries=101, max_entries=100, low_watermark=1.0) == 1
+    assert get_eviction_count(entries=101, max_entries=100, low_watermark=0.5) == 51
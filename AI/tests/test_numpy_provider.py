@@ -0,0 +1,126 @@
+import numpy as np
+
+from stores.vectordb.providers import NumpyProvider
+
+
+COLLECTION_NAME = 'collection_courses'
+
+
+def build_provider(db_path=None, **kwargs):
+    provider = NumpyProvider(db_path=db_path, distance_method='cosine', **kwargs)
+    provider.connect()
+    provider.create_collection(collection_name=COLLECTION_NAME, embedding_dim=4)
+    return provider
+
+
+def insert(provider, vectors, vector_ids, metadata='course'):
+    return provider.insert_batch(
+        collection_name=COLLECTION_NAME,
+        vectors=vectors,
+        texts=[str(vector_id) for vector_id in vector_ids],
+        metadata=[metadata] * len(vectors),
+        vector_ids=vector_ids,
+    )
+
+
+def search_ids(provider, vector, top_k, filters=None):
+    documents = provider.search_by_vector(
+        vector=vector, collection_name=COLLECTION_NAME, top_k=top_k, filters=filters) or []
+    return [document.id for document in documents]
+
+
+def test_top_k_matches_an_exact_search():
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((200, 4))
+    query = rng.standard_normal(4)
+
+    provider = build_provider()
+    insert(provider, vectors.tolist(), list(range(200)))
+
+    normalized = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    expected = list(np.argsort(-(normalized @ query))[:5])
+
+    assert search_ids(provider, query.tolist(), top_k=5) == expected
+
+    documents = provider.search_by_vector(
+        vector=query.tolist(), collection_name=COLLECTION_NAME, top_k=5)
+    scores = [document.score for document in documents]
+    assert scores == sorted(scores, reverse=True)
+    assert scores[0] <= 1.0001
+
+
+def test_top_k_is_capped_by_the_collection_size():
+    provider = build_provider()
+    insert(provider, np.eye(4)[:3].tolist(), ['a', 'b', 'c'])
+
+    assert len(search_ids(provider, [1, 0, 0, 0], top_k=10)) == 3
+    assert provider.search_batch_by_vectors(
+        vectors=[[1, 0, 0, 0], [0, 1, 0, 0]], collection_name=COLLECTION_NAME, top_k=1)[1][0].id == 'b'
+
+
+def test_deleted_points_are_never_returned():
+    provider = build_provider()
+    insert(provider, np.eye(4).tolist(), ['a', 'b', 'c', 'd'])
+
+    assert provider.delete_by_ids(collection_name=COLLECTION_NAME, vector_ids=['a', 'missing'])
+
+    found = search_ids(provider, [1, 0.1, 0, 0], top_k=4)
+    assert found[0] == 'b' and sorted(found) == ['b', 'c', 'd']
+    assert 'a' not in provider.get_all_payloads(collection_name=COLLECTION_NAME)
+    assert provider.get_collection_info(collection_name=COLLECTION_NAME)['points_count'] == 3
+
+
+def test_inserting_an_existing_id_replaces_the_point():
+    provider = build_provider()
+    insert(provider, np.eye(4).tolist(), ['a', 'b', 'c', 'd'])
+    insert(provider, [[0, 0, 0, 1]], ['a'], metadata='updated')
+
+    assert search_ids(provider, [1, 0, 0, 0], top_k=1) != ['a']
+    assert sorted(search_ids(provider, [0, 0, 0, 1], top_k=2)) == ['a', 'd']
+    assert provider.get_all_payloads(collection_name=COLLECTION_NAME)['a']['metadata'] == 'updated'
+    assert provider.get_collection_info(collection_name=COLLECTION_NAME)['points_count'] == 4
+
+
+def test_filters_and_delete_by_filter():
+    provider = build_provider()
+    insert(provider, np.eye(4)[:2].tolist(), ['a', 'b'], metadata='python')
+    insert(provider, np.eye(4)[2:].tolist(), ['c', 'd'], metadata='sql')
+
+    assert search_ids(provider, [1, 0, 0, 0], top_k=4, filters={'metadata': 'sql'}) in (['c', 'd'], ['d', 'c'])
+
+    assert provider.delete_by_filter(collection_name=COLLECTION_NAME, filters={'metadata': 'python'})
+    assert sorted(provider.get_all_payloads(collection_name=COLLECTION_NAME)) == ['c', 'd']
+
+
+def test_many_deletes_compact_the_matrix():
+    provider = build_provider()
+    insert(provider, np.random.default_rng(1).standard_normal((400, 4)).tolist(), list(range(400)))
+
+    provider.delete_by_ids(collection_name=COLLECTION_NAME, vector_ids=list(range(300)))
+
+    collection = provider.collections[COLLECTION_NAME]
+    assert len(collection.ids) == 100
+    assert collection.deleted_count == 0
+    assert len(search_ids(provider, [1, 0, 0, 0], top_k=400)) == 100
+
+
+def test_writes_are_saved_on_disconnect(tmp_path):
+    provider = build_provider(db_path=str(tmp_path), save_interval=3600)
+    insert(provider, np.eye(4).tolist(), ['a', 'b', 'c', 'd'])
+    provider.delete_by_ids(collection_name=COLLECTION_NAME, vector_ids=['d'])
+
+    # Within the save interval nothing but the empty collection is on disk yet
+    assert np.load(tmp_path / f'{COLLECTION_NAME}.npy').shape == (0, 4)
+
+    provider.disconnect()
+
+    reopened = NumpyProvider(db_path=str(tmp_path), distance_method='cosine')
+    reopened.connect()
+
+    assert reopened.get_collection_info(collection_name=COLLECTION_NAME)['memory_mapped']
+    assert sorted(reopened.get_all_payloads(collection_name=COLLECTION_NAME)) == ['a', 'b', 'c']
+    assert search_ids(reopened, [0, 1, 0, 0], top_k=1) == ['b']
+
+    # The memory-mapped matrix is copied on the first write
+    insert(reopened, [[0, 0, 0, 1]], ['e'])
+    assert search_ids(reopened, [0, 0, 0, 1], top_k=1) == ['e']
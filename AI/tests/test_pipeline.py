@@ -0,0 +1,104 @@
+import asyncio
+
+import pytest
+
+from helpers.pipeline import StagePipeline
+
+
+def test_stages_receive_the_inputs_and_their_dependencies():
+    async def query(question, **kwargs):
+        return question.upper()
+
+    async def vector(query, **kwargs):
+        return len(query)
+
+    async def answer(question, query, vector, **kwargs):
+        return f'{question}|{query}|{vector}'
+
+    pipeline = StagePipeline() \
+        .add_stage('query', query) \
+        .add_stage('vector', vector, depends_on=['query']) \
+        .add_stage('answer', answer, depends_on=['query', 'vector'])
+
+    results, timings = asyncio.run(pipeline.run(question='hi'))
+
+    assert results == {'query': 'HI', 'vector': 2, 'answer': 'hi|HI|2'}
+    assert set(timings) == {'query', 'vector', 'answer'}
+    assert pipeline.get_metrics()['answer']['count'] == 1
+
+
+def test_independent_stages_run_concurrently():
+    order = []
+
+    async def slow():
+        order.append('slow started')
+        await asyncio.sleep(0.05)
+        order.append('slow done')
+
+    async def fast():
+        order.append('fast started')
+        order.append('fast done')
+
+    pipeline = StagePipeline().add_stage('slow', slow).add_stage('fast', fast)
+    asyncio.run(pipeline.run())
+
+    assert order.index('fast done') < order.index('slow done')
+
+
+def test_undeclared_dependencies_are_rejected():
+    async def stage():
+        return None
+
+    with pytest.raises(ValueError, match='undeclared'):
+        StagePipeline().add_stage('answer', stage, depends_on=['query'])
+
+
+def test_a_failing_stage_cancels_the_others():
+    cancelled = []
+
+    async def failing():
+        raise RuntimeError('boom')
+
+    async def slow():
+        try:
+            await asyncio.sleep(1)
+        except asyncio.CancelledError:
+            cancelled.append('slow')
+            raise
+
+    async def run():
+        pipeline = StagePipeline().add_stage('slow', slow).add_stage('failing', failing)
+        with pytest.raises(RuntimeError, match='boom'):
+            await pipeline.run()
+        await asyncio.sleep(0)
+
+    asyncio.run(run())
+
+    assert cancelled == ['slow']
+
+
+def test_a_short_circuit_result_ends_the_run():
+    async def cached_answer():
+        return 'cached'
+
+    async def generation():
+        await asyncio.sleep(1)
+        return 'generated'
+
+    async def miss():
+        return None
+
+    pipeline = StagePipeline() \
+        .add_stage('cached_answer', cached_answer, short_circuit=True) \
+        .add_stage('generation', generation)
+
+    results, _ = asyncio.run(asyncio.wait_for(pipeline.run(), timeout=0.5))
+    assert results == {'cached_answer': 'cached', 'generation': None}
+
+    # An empty result doesn't short-circuit
+    pipeline = StagePipeline() \
+        .add_stage('cached_answer', miss, short_circuit=True) \
+        .add_stage('query', cached_answer)
+
+    results, _ = asyncio.run(pipeline.run())
+    assert results == {'cached_answer': None, 'query': 'cached'}
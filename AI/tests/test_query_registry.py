@@ -0,0 +1,55 @@
+import json
+
+import pytest
+
+from controllers.utils.read_queries import QueryRegistry
+
+
+def write_queries(tmp_path, data):
+    file_path = tmp_path / 'queries.json'
+    file_path.write_text(json.dumps(data), encoding='utf-8')
+    return str(file_path)
+
+
+def test_shipped_queries_are_valid():
+    registry = QueryRegistry()
+
+    assert registry.get_group('chat')
+    assert registry.get_group('courses')
+
+
+def test_templates_are_grouped_by_database(tmp_path):
+    registry = QueryRegistry(write_queries(tmp_path, {
+        'chat': {'get_chat': 'SELECT * FROM chats WHERE id = $1 AND owner = $2'},
+        'courses': {'get_courses': 'SELECT * FROM courses'},
+    }))
+
+    assert list(registry.get_group('chat')) == ['get_chat']
+    assert registry.get_group('unknown') == {}
+    assert registry.get_template_by_name('get_courses') == 'SELECT * FROM courses'
+    assert registry.get_template_by_name('missing') is None
+
+
+def test_a_placeholder_can_be_repeated(tmp_path):
+    registry = QueryRegistry(write_queries(tmp_path, {
+        'chat': {'search': 'SELECT * FROM chats WHERE title = $1 OR body = $1'},
+    }))
+
+    assert registry.get_template_by_name('search')
+
+
+@pytest.mark.parametrize('query, message', [
+    ('SELECT * FROM chats WHERE id = %s', '$n placeholders'),
+    ('SELECT * FROM chats WHERE id = $2', 'non-contiguous'),
+    ('SELECT * FROM chats WHERE id = $1 AND owner = $3', 'non-contiguous'),
+    ('   ', 'is empty'),
+])
+def test_invalid_templates_are_rejected(tmp_path, query, message):
+    with pytest.raises(ValueError, match=message.replace('$', r'\$')):
+        QueryRegistry(write_queries(tmp_path, {'chat': {'bad': query}}))
+
+
+@pytest.mark.parametrize('data', [{}, {'chat': {}}, ['SELECT 1']])
+def test_empty_registries_are_rejected(tmp_path, data):
+    with pytest.raises(ValueError):
+        QueryRegistry(write_queries(tmp_path, data))
@@ -0,0 +1,65 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+from stores.llm.RateLimiter import TokenBucketRateLimiter, is_rate_limit_error, get_retry_after
+
+
+def test_penalize_halves_the_rate_down_to_the_minimum():
+    limiter = TokenBucketRateLimiter(requests_per_minute=120, min_requests_per_minute=30)
+
+    limiter.penalize()
+    assert limiter.rate == 1.0
+    assert limiter.tokens == 0
+
+    limiter.penalize()
+    limiter.penalize()
+    assert limiter.rate == 0.5
+
+
+def test_reward_recovers_additively_up_to_the_configured_rate():
+    limiter = TokenBucketRateLimiter(requests_per_minute=120)
+    limiter.penalize()
+
+    limiter.reward()
+    assert limiter.rate == 1.0 + 2.0 / 20
+
+    for _ in range(100):
+        limiter.reward()
+    assert limiter.rate == limiter.max_rate
+
+
+def test_penalize_blocks_for_retry_after():
+    limiter = TokenBucketRateLimiter(requests_per_minute=60)
+
+    limiter.penalize(retry_after=5)
+
+    assert limiter.blocked_until > time.monotonic() + 4
+    assert limiter.get_backoff_delay(attempt=3, retry_after=5) == 5
+
+
+def test_acquire_spends_the_burst_then_waits_for_a_refill():
+    limiter = TokenBucketRateLimiter(requests_per_minute=600, burst=2)
+
+    async def acquire_three():
+        started_at = time.monotonic()
+        await asyncio.gather(*[limiter.acquire() for _ in range(3)])
+        return time.monotonic() - started_at
+
+    elapsed = asyncio.run(acquire_three())
+
+    # 10 requests per second, the third one waits for a tenth of a second
+    assert 0.05 < elapsed < 0.5
+
+
+def test_rate_limit_errors_are_detected_from_either_sdk():
+    openai_error = SimpleNamespace(
+        status_code=429, response=SimpleNamespace(headers={'retry-after': '3'}))
+    google_error = SimpleNamespace(code=429)
+
+    assert is_rate_limit_error(openai_error)
+    assert is_rate_limit_error(google_error)
+    assert not is_rate_limit_error(SimpleNamespace(status_code=500))
+
+    assert get_retry_after(openai_error) == 3.0
+    assert get_retry_after(google_error) is None
@@ -0,0 +1,21 @@
+import json
+
+from routes.data import format_sse_event
+
+
+def test_data_only_event():
+    assert format_sse_event({'token': 'Hi'}) == 'data: {"token": "Hi"}\n\n'
+
+
+def test_named_event():
+    frame = format_sse_event({'answer': 'done'}, event='end')
+
+    assert frame == 'event: end\ndata: {"answer": "done"}\n\n'
+
+
+def test_newlines_stay_inside_one_data_line():
+    frame = format_sse_event({'token': 'line one\nline two'})
+
+    lines = frame.rstrip('\n').split('\n')
+    assert len(lines) == 1
+    assert json.loads(lines[0][len('data: '):]) == {'token': 'line one\nline two'}